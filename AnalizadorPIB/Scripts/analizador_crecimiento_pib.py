@@ -1,3 +1,4 @@
+import functools
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
@@ -5,6 +6,25 @@ import seaborn as sns
 from datetime import datetime
 from sklearn.linear_model import LinearRegression
 
+try:
+    from Scripts.cargador_datos import cargar_dataset
+    from Scripts.transformacion_pib import pib_gasto_a_formato_largo
+except ImportError:  # Ejecutado directamente como script
+    from cargador_datos import cargar_dataset
+    from transformacion_pib import pib_gasto_a_formato_largo
+
+
+def memoizado(metodo):
+    """
+    Guarda el resultado del método en la caché del analizador. Se recalcula
+    solo si cambian los datasets cargados (ver _memoizar).
+    """
+    @functools.wraps(metodo)
+    def envoltorio(self):
+        return self._memoizar(metodo.__name__, lambda: metodo(self))
+    return envoltorio
+
+
 class AnalizadorCrecimientoPIB_Final:
     """
     Versión final específicamente adaptada a la estructura real de los datasets
@@ -16,13 +36,45 @@ class AnalizadorCrecimientoPIB_Final:
         self.datos_tasa_crecimiento = None
         self.datos_incidencia = None
 
+        # Series derivadas (tabla larga, crecimientos, resumen...) ya calculadas
+        self._cache = {}
+        self._cache_fuentes = None
+        self._generacion = 0
+
+    def _fuentes(self):
+        return (self.datos_pib_gasto, self.datos_imae,
+                self.datos_tasa_crecimiento, self.datos_incidencia)
+
+    def _memoizar(self, clave, calcular):
+        """
+        Devuelve el valor guardado para `clave` o lo calcula. La caché se
+        vacía si alguno de los datasets se ha sustituido por otro objeto o si
+        se ha llamado a invalidar_cache() desde que se llenó. Los resultados
+        se comparten entre llamadas: no modificarlos, hacer .copy().
+        """
+        fuentes = self._fuentes()
+        if (self._cache_fuentes is None or self._cache_fuentes[0] != self._generacion or
+                any(a is not b for a, b in zip(self._cache_fuentes[1], fuentes))):
+            self._cache = {}
+            self._cache_fuentes = (self._generacion, fuentes)
+        if clave not in self._cache:
+            self._cache[clave] = calcular()
+        return self._cache[clave]
+
+    def invalidar_cache(self):
+        """Descarta las series derivadas (p. ej. tras modificar un dataset en sitio)"""
+        self._generacion += 1
+        self._cache = {}
+
     def cargar_datos(self):
         """Carga todos los datasets"""
+        self.invalidar_cache()
         try:
-            self.datos_pib_gasto = pd.read_csv('Datasets/pib_gasto_2018.csv', encoding='utf-8')
-            self.datos_imae = pd.read_csv('Datasets/imae_2018.csv', encoding='utf-8')
-            self.datos_tasa_crecimiento = pd.read_csv('Datasets/Tasa de crecimiento.csv', encoding='utf-8')
-            self.datos_incidencia = pd.read_csv('Datasets/INCIDENCIA POR COMPONENTE.csv', encoding='utf-8')
+            # Compartidos con los demás analizadores (ver cargador_datos.py)
+            self.datos_pib_gasto = cargar_dataset('pib_gasto')
+            self.datos_imae = cargar_dataset('imae')
+            self.datos_tasa_crecimiento = cargar_dataset('tasa_crecimiento')
+            self.datos_incidencia = cargar_dataset('incidencia')
 
             print("Todos los datasets cargados exitosamente")
             return True
@@ -30,66 +82,27 @@ class AnalizadorCrecimientoPIB_Final:
             print(f"Error al cargar: {e}")
             return False
 
+    @memoizado
     def procesar_pib_gasto(self):
         """
         Procesa el dataset complejo de PIB por componentes de gasto
-        Estructura: Cada año tiene 4 columnas (trimestres: E-M, E-J, E-S, E-D)
+        Estructura: Cada año tiene 4 columnas (trimestres: E-M, E-J, E-S, E-D);
+        los años y trimestres se deducen de la cabecera (ver transformacion_pib.py)
         """
         if self.datos_pib_gasto is None:
             return None
 
-        datos = self.datos_pib_gasto.copy()
-
-        # Eliminar filas vacías
-        datos = datos.dropna(subset=['COMPONENTES'])
-        datos = datos[datos['COMPONENTES'].str.strip() != '']
-
-        # Mapeo de años y sus columnas correspondientes
-        años_config = {
-            '2018': [1, 2, 3, 4],    # Columnas 1-4: 2018 E-M, E-J, E-S, E-D
-            '2019': [5, 6, 7, 8],    # Columnas 5-8: 2019
-            '2020': [9, 10, 11, 12], # Columnas 9-12: 2020
-            '2021': [13, 14, 15, 16], # Columnas 13-16: 2021
-            '2022': [17, 18, 19, 20], # Columnas 17-20: 2022
-            '2023': [21, 22, 23, 24], # Columnas 21-24: 2023
-            '2024': [25, 26, 27, 28], # Columnas 25-28: 2024
-            '2025': [29, 30, 31, 32]  # Columnas 29-32: 2025
-        }
-
-        trimestres = ['E-M', 'E-J', 'E-S', 'E-D']
-        datos_largos = []
-
-        for _, fila in datos.iterrows():
-            componente = fila['COMPONENTES']
-
-            for año, indices in años_config.items():
-                for i, idx in enumerate(indices):
-                    if idx < len(fila):
-                        valor = fila.iloc[idx]
-                        if pd.notna(valor) and str(valor).strip() != '':
-                            try:
-                                datos_largos.append({
-                                    'Año': int(año),
-                                    'Trimestre': i + 1,
-                                    'Trimestre_Texto': trimestres[i],
-                                    'Componente': componente,
-                                    'Valor_Indice': float(valor)
-                                })
-                            except (ValueError, TypeError):
-                                continue
-
-        df_resultado = pd.DataFrame(datos_largos)
-
         # Filtrar solo componentes relevantes
         componentes_relevantes = [
             'Consumo Final', 'Consumo Privado', 'Consumo Público',
             'Formación Bruta de Capital Fijo', 'Exportaciones', 'Importaciones',
             'Producto Interno Bruto'
         ]
-        df_resultado = df_resultado[df_resultado['Componente'].isin(componentes_relevantes)]
+        df_resultado = pib_gasto_a_formato_largo(self.datos_pib_gasto, componentes=componentes_relevantes)
 
         return df_resultado.sort_values(['Año', 'Trimestre'])
 
+    @memoizado
     def calcular_crecimiento_anual_pib(self):
         """Calcula crecimiento anual del PIB desde datos de componentes"""
         datos_pib = self.procesar_pib_gasto()
@@ -109,6 +122,7 @@ class AnalizadorCrecimientoPIB_Final:
 
         return pib_total.dropna(subset=['Crecimiento_Anual_%'])
 
+    @memoizado
     def calcular_crecimiento_trimestral_pib(self):
         """Calcula crecimiento trimestral del PIB"""
         datos_pib = self.procesar_pib_gasto()
@@ -127,6 +141,7 @@ class AnalizadorCrecimientoPIB_Final:
 
         return pib_total.dropna(subset=['Crecimiento_Trimestral_%'])
 
+    @memoizado
     def analizar_imae_crecimiento(self):
         """Analiza crecimiento usando IMAE (datos mensuales confiables)"""
         if self.datos_imae is None:
@@ -163,6 +178,7 @@ class AnalizadorCrecimientoPIB_Final:
             'mensual': datos
         }
 
+    @memoizado
     def analizar_tasas_historicas(self):
         """Analiza tasas de crecimiento históricas"""
         if self.datos_tasa_crecimiento is None:
@@ -191,6 +207,7 @@ class AnalizadorCrecimientoPIB_Final:
             'estadisticas': stats
         }
 
+    @memoizado
     def generar_tabla_resumen_completa(self):
         """Genera tabla resumen unificando todas las fuentes"""
         resumen_data = []
@@ -5,6 +5,15 @@ import seaborn as sns
 from datetime import datetime
 from sklearn.linear_model import LinearRegression
 
+try:
+    from Scripts.cargador_datos import cargar_dataset
+    from Scripts.transformacion_pib import pib_gasto_a_formato_largo
+    from Scripts.indices_precios import FRECUENCIAS, indice_precios, validar_periodos
+except ImportError:  # Ejecutado directamente como script
+    from cargador_datos import cargar_dataset
+    from transformacion_pib import pib_gasto_a_formato_largo
+    from indices_precios import FRECUENCIAS, indice_precios, validar_periodos
+
 class AnalizadorInflacionPIBReal:
 
     def __init__(self):
@@ -34,60 +43,29 @@ class AnalizadorInflacionPIBReal:
             return None
 
         try:
-            # Procesar la estructura compleja del dataset
-            datos = datos_pib_gasto.copy()
-
             # Encontrar la fila del PIB total
-            fila_pib = datos[datos['COMPONENTES'] == 'Producto Interno Bruto']
-            if len(fila_pib) == 0:
+            es_pib = datos_pib_gasto['COMPONENTES'] == 'Producto Interno Bruto'
+            if not es_pib.any():
                 print("No se encontro 'Producto Interno Bruto' en los datos")
                 return None
 
-            fila_pib = fila_pib.iloc[0]
-
-            # Mapeo de anos y sus columnas
-            anos_config = {
-                2018: [1, 2, 3, 4],    # Columnas 1-4: 2018
-                2019: [5, 6, 7, 8],    # Columnas 5-8: 2019
-                2020: [9, 10, 11, 12], # Columnas 9-12: 2020
-                2021: [13, 14, 15, 16], # Columnas 13-16: 2021
-                2022: [17, 18, 19, 20], # Columnas 17-20: 2022
-                2023: [21, 22, 23, 24], # Columnas 21-24: 2023
-                2024: [25, 26, 27, 28], # Columnas 25-28: 2024
-                2025: [29, 30, 31, 32]  # Columnas 29-32: 2025
-            }
-
-            pib_data = []
-            trimestres = ['E-M', 'E-J', 'E-S', 'E-D']
-
-            for ano, indices in anos_config.items():
-                for i, idx in enumerate(indices):
-                    if idx < len(fila_pib):
-                        valor = fila_pib.iloc[idx]
-                        if pd.notna(valor) and str(valor).strip() != '':
-                            try:
-                                # Convertir a numerico - estos son indices base 2018
-                                valor_indice = float(valor)
-
-                                # Convertir indice a valor nominal aproximado
-                                pib_nominal = valor_indice * 10000  # Factor de escala
-
-                                pib_data.append({
-                                    'Ano': ano,
-                                    'Trimestre': i + 1,
-                                    'Trimestre_Texto': trimestres[i],
-                                    'PIB_Nominal_Millones': pib_nominal,
-                                    'Indice_Base_2018': valor_indice
-                                })
-                            except (ValueError, TypeError) as e:
-                                print(f"Error procesando valor: {valor}, error: {e}")
-                                continue
-
-            if not pib_data:
+            # Solo la primera fila del PIB; la subcabecera se conserva para leer los trimestres
+            primera_fila_pib = es_pib & (es_pib.cumsum() == 1)
+            datos = datos_pib_gasto[primera_fila_pib | datos_pib_gasto['COMPONENTES'].isna()]
+            pib_data = pib_gasto_a_formato_largo(datos)
+
+            if pib_data.empty:
                 print("No se pudieron extraer datos del PIB")
                 return None
 
-            df_resultado = pd.DataFrame(pib_data)
+            # Estos son indices base 2018; se convierten a un valor nominal aproximado
+            df_resultado = pd.DataFrame({
+                'Ano': pib_data['Año'],
+                'Trimestre': pib_data['Trimestre'],
+                'Trimestre_Texto': pib_data['Trimestre_Texto'],
+                'PIB_Nominal_Millones': pib_data['Valor_Indice'] * 10000,  # Factor de escala
+                'Indice_Base_2018': pib_data['Valor_Indice'],
+            })
             print(f"Datos de PIB nominal extraidos: {len(df_resultado)} registros")
             return df_resultado.sort_values(['Ano', 'Trimestre'])
 
@@ -95,75 +73,106 @@ class AnalizadorInflacionPIBReal:
             print(f"Error procesando datos del PIB: {e}")
             return None
 
-    def calcular_pib_real(self, ano_base=2018):
+    def calcular_pib_real(self, ano_base=2018, frecuencia='anual'):
         """
         Calcula el PIB real ajustado por inflacion
+
+        ano_base puede ser un ano o una lista de anos. El primero da las
+        columnas Indice_Precios y PIB_Real_Millones; con varios se anade
+        ademas Indice_Precios_<ano> y PIB_Real_Millones_<ano> por cada uno.
+
+        Con frecuencia='trimestral' no se promedian los trimestres del PIB:
+        datos_inflacion debe traer Ano, Trimestre e Inflacion_Anual_%
+        (interanual de cada trimestre) y los crecimientos son interanuales.
+        Los periodos combinados deben ser consecutivos y los anos base estar
+        completos (los cuatro trimestres).
         """
         if self.datos_pib_nominal is None or self.datos_inflacion is None:
             print("Faltan datos para calcular PIB real")
             return None
 
+        if frecuencia not in ('anual', 'trimestral'):
+            print(f"Frecuencia no soportada para el PIB: {frecuencia}")
+            return None
+
         try:
-            # Consolidar datos anuales del PIB nominal (promedio de trimestres)
-            pib_anual = self.datos_pib_nominal.groupby('Ano').agg({
-                'PIB_Nominal_Millones': 'mean',
-                'Indice_Base_2018': 'mean'
-            }).reset_index()
+            anos_base = list(ano_base) if isinstance(ano_base, (list, tuple)) else [ano_base]
+            claves = ['Ano'] if frecuencia == 'anual' else ['Ano', 'Trimestre']
+
+            if frecuencia == 'anual':
+                # Consolidar datos anuales del PIB nominal (promedio de trimestres)
+                pib_periodo = self.datos_pib_nominal.groupby('Ano').agg({
+                    'PIB_Nominal_Millones': 'mean',
+                    'Indice_Base_2018': 'mean'
+                }).reset_index()
+            else:
+                pib_periodo = self.datos_pib_nominal[claves + ['PIB_Nominal_Millones', 'Indice_Base_2018']]
 
-            print(f"Anos con datos de PIB: {list(pib_anual['Ano'])}")
-            print(f"Anos con datos de inflacion: {list(self.datos_inflacion['Ano'])}")
+            print(f"Anos con datos de PIB: {pib_periodo['Ano'].drop_duplicates().tolist()}")
+            print(f"Anos con datos de inflacion: {self.datos_inflacion['Ano'].drop_duplicates().tolist()}")
 
             # Combinar con datos de inflacion
-            datos_combinados = pd.merge(pib_anual, self.datos_inflacion, on='Ano', how='inner')
+            datos_combinados = pd.merge(pib_periodo, self.datos_inflacion, on=claves, how='inner')
 
             if datos_combinados.empty:
                 print("No hay anos coincidentes entre PIB e inflacion")
                 return None
 
-            print(f"Anos combinados exitosamente: {list(datos_combinados['Ano'])}")
-
-            # Ordenar por ano
-            datos_combinados = datos_combinados.sort_values('Ano').reset_index(drop=True)
-
-            # Calcular indice de precios (ano base = 100)
-            datos_combinados['Indice_Precios'] = 100.0
-
-            # Encontrar posicion del ano base
-            base_mask = datos_combinados['Ano'] == ano_base
+            print(f"Anos combinados exitosamente: {datos_combinados['Ano'].drop_duplicates().tolist()}")
 
-            if not base_mask.any():
-                print(f"Ano base {ano_base} no encontrado, usando {datos_combinados['Ano'].iloc[0]}")
-                ano_base = datos_combinados['Ano'].iloc[0]
-                base_mask = datos_combinados['Ano'] == ano_base
+            # Ordenar por periodo
+            datos_combinados = datos_combinados.sort_values(claves).reset_index(drop=True)
 
-            base_idx = datos_combinados[base_mask].index[0]
+            # Un periodo sin PIB o sin inflacion rompe las cadenas del indice y
+            # las tasas interanuales: se rechaza en vez de comparar filas erroneas
+            periodos = datos_combinados['Trimestre'] if frecuencia == 'trimestral' else None
+            validar_periodos(datos_combinados['Ano'], periodos, frecuencia)
 
-            # Calcular indice de precios hacia adelante (anos posteriores al base)
-            for i in range(base_idx + 1, len(datos_combinados)):
-                inflacion = datos_combinados.loc[i, 'Inflacion_Anual_%']
-                indice_anterior = datos_combinados.loc[i-1, 'Indice_Precios']
-                datos_combinados.loc[i, 'Indice_Precios'] = indice_anterior * (1 + inflacion/100)
-
-            # Calcular indice de precios hacia atras (anos anteriores al base)
-            for i in range(base_idx - 1, -1, -1):
-                inflacion_siguiente = datos_combinados.loc[i+1, 'Inflacion_Anual_%']
-                indice_siguiente = datos_combinados.loc[i+1, 'Indice_Precios']
-                datos_combinados.loc[i, 'Indice_Precios'] = indice_siguiente / (1 + inflacion_siguiente/100)
+            # Solo sirven de base los anos con todos sus periodos
+            periodos_por_ano = datos_combinados['Ano'].value_counts()
+            anos_completos = periodos_por_ano.index[periodos_por_ano == FRECUENCIAS[frecuencia]].sort_values()
+            if anos_completos.empty:
+                print("No hay ningun ano completo para usar como base")
+                return None
+            if anos_base[0] not in anos_completos:
+                print(f"Ano base {anos_base[0]} no encontrado o incompleto, usando {anos_completos[0]}")
+                anos_base[0] = anos_completos[0]
+            for ano in anos_base[1:]:
+                if ano not in anos_completos:
+                    print(f"Ano base {ano} no encontrado o incompleto, se omite")
+            anos_base = list(dict.fromkeys(ano for ano in anos_base if ano in anos_completos))
+
+            # Indice de precios (ano base = 100) encadenando las tasas de inflacion;
+            # cada trimestre se encadena con el mismo trimestre del ano anterior
+            indices = indice_precios(
+                datos_combinados['Inflacion_Anual_%'], datos_combinados['Ano'], anos_base, frecuencia,
+                periodos=periodos
+            )
+            datos_combinados['Indice_Precios'] = indices[anos_base[0]].to_numpy()
 
             # Calcular PIB real (PIB nominal ajustado por inflacion)
             datos_combinados['PIB_Real_Millones'] = (
                 datos_combinados['PIB_Nominal_Millones'] * 100 / datos_combinados['Indice_Precios']
             )
 
-            # Calcular tasas de crecimiento
-            datos_combinados['Crecimiento_Nominal_%'] = datos_combinados['PIB_Nominal_Millones'].pct_change() * 100
-            datos_combinados['Crecimiento_Real_%'] = datos_combinados['PIB_Real_Millones'].pct_change() * 100
+            if len(anos_base) > 1:
+                for ano in anos_base:
+                    datos_combinados[f'Indice_Precios_{ano}'] = indices[ano].to_numpy()
+                    datos_combinados[f'PIB_Real_Millones_{ano}'] = (
+                        datos_combinados['PIB_Nominal_Millones'] * 100 / indices[ano].to_numpy()
+                    )
+
+            # Calcular tasas de crecimiento (respecto al mismo periodo del ano anterior)
+            rezago = FRECUENCIAS[frecuencia]
+            datos_combinados['Crecimiento_Nominal_%'] = datos_combinados['PIB_Nominal_Millones'].pct_change(periods=rezago) * 100
+            datos_combinados['Crecimiento_Real_%'] = datos_combinados['PIB_Real_Millones'].pct_change(periods=rezago) * 100
             datos_combinados['Brecha_Inflacionaria'] = (
                 datos_combinados['Crecimiento_Nominal_%'] - datos_combinados['Crecimiento_Real_%']
             )
 
             self.pib_real_calculado = datos_combinados
-            print(f"PIB real calculado exitosamente para {len(datos_combinados)} anos")
+            unidad = 'anos' if frecuencia == 'anual' else 'periodos'
+            print(f"PIB real calculado exitosamente para {len(datos_combinados)} {unidad}")
             return datos_combinados
 
         except Exception as e:
@@ -332,10 +341,10 @@ class AnalizadorPIBCompleto:
     def cargar_datos(self):
         """Carga todos los datasets"""
         try:
-            self.datos_pib_gasto = pd.read_csv('../Datasets/pib_gasto_2018.csv', encoding='utf-8')
-            self.datos_imae = pd.read_csv('../Datasets/imae_2018.csv', encoding='utf-8')
-            self.datos_tasa_crecimiento = pd.read_csv('../Datasets/Tasa de crecimiento.csv', encoding='utf-8')
-            self.datos_incidencia = pd.read_csv('../Datasets/INCIDENCIA POR COMPONENTE.csv', encoding='utf-8')
+            self.datos_pib_gasto = cargar_dataset('pib_gasto')
+            self.datos_imae = cargar_dataset('imae')
+            self.datos_tasa_crecimiento = cargar_dataset('tasa_crecimiento')
+            self.datos_incidencia = cargar_dataset('incidencia')
 
             print("Todos los datasets cargados exitosamente")
             return True
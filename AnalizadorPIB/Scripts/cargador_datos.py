@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Sin pyarrow no hay caché en disco: se parsea el CSV
+    feather = None
+
+# Carpeta de los CSV del BCRD, independiente del directorio de trabajo
+DIRECTORIO_DATOS = Path(__file__).resolve().parent.parent / 'Datasets'
+
+DATASETS = {
+    'pib_gasto': 'pib_gasto_2018.csv',
+    'imae': 'imae_2018.csv',
+    'tasa_crecimiento': 'Tasa de crecimiento.csv',
+    'incidencia': 'INCIDENCIA POR COMPONENTE.csv',
+}
+
+# Subir al cambiar normalizar_tipos para que no se usen cachés antiguas
+VERSION_CACHE = 1
+
+# DataFrames ya cargados en este proceso, compartidos por todos los analizadores
+_cargados = {}
+_lock = threading.Lock()
+
+
+def normalizar_tipos(datos):
+    """
+    Quita los espacios de los textos y pasa a número las columnas de texto
+    cuyos valores son todos numéricos. Las columnas con alguna etiqueta
+    (como la subcabecera 'E-M' del PIB por el gasto) se quedan como texto.
+    """
+    for columna in datos.columns:
+        serie = datos[columna]
+        if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+            continue
+
+        texto = serie.str.strip()
+        numeros = pd.to_numeric(texto, errors='coerce')
+        datos[columna] = numeros if numeros.notna().sum() == texto.notna().sum() else texto
+    return datos
+
+
+def _leer_csv(ruta):
+    return normalizar_tipos(pd.read_csv(ruta, encoding='utf-8'))
+
+
+def _leer_indice(directorio_cache):
+    try:
+        with open(directorio_cache / 'indice.json', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_atomico(destino, escribir):
+    """Escribe en un temporal y lo renombra, para no dejar ficheros a medias"""
+    temporal = destino.with_name(destino.name + '.tmp')
+    escribir(temporal)
+    os.replace(temporal, destino)
+
+
+def _leer_con_cache(ruta, estado):
+    """
+    Devuelve el CSV desde la caché Feather de Datasets/.cache, o lo parsea y
+    guarda la caché. La caché se identifica por el hash del contenido; el
+    índice recuerda el mtime y tamaño con que se calculó cada hash para no
+    releer el CSV si no ha cambiado.
+    """
+    if feather is None:
+        return _leer_csv(ruta)
+
+    directorio_cache = ruta.parent / '.cache'
+    indice = _leer_indice(directorio_cache)
+    entrada = indice.get(ruta.name, {})
+    al_dia = entrada.get('mtime_ns') == estado.st_mtime_ns and entrada.get('tamano') == estado.st_size
+    huella = entrada['hash'] if al_dia else hashlib.sha256(ruta.read_bytes()).hexdigest()[:16]
+
+    cache = directorio_cache / f"{ruta.stem}-{huella}-v{VERSION_CACHE}.feather"
+    datos = None
+    if cache.exists():
+        try:
+            # Sin compresión: pyarrow lee el fichero mapeado en memoria
+            datos = feather.read_table(cache, memory_map=True).to_pandas()
+        except Exception as e:
+            print(f"Cache de {ruta.name} ilegible, se vuelve a leer el CSV: {e}")
+
+    if datos is not None and al_dia:
+        return datos
+
+    parseado = datos is None
+    if parseado:
+        datos = _leer_csv(ruta)
+
+    try:
+        if parseado:
+            directorio_cache.mkdir(exist_ok=True)
+            for anterior in directorio_cache.glob(f"{ruta.stem}-*.feather"):
+                anterior.unlink()
+            _escribir_atomico(cache, lambda destino: feather.write_feather(datos, destino, compression='uncompressed'))
+
+        # CSV nuevo, modificado o solo tocado (mismo hash): se anota su mtime
+        indice[ruta.name] = {'mtime_ns': estado.st_mtime_ns, 'tamano': estado.st_size, 'hash': huella}
+        _escribir_atomico(
+            directorio_cache / 'indice.json',
+            lambda destino: destino.write_text(json.dumps(indice, indent=2), encoding='utf-8')
+        )
+    except Exception as e:
+        print(f"No se pudo guardar la cache de {ruta.name}: {e}")
+    return datos
+
+
+def cargar_dataset(nombre, directorio=None):
+    """
+    Carga uno de los DATASETS. El CSV se parsea una sola vez: las llamadas
+    siguientes devuelven el mismo DataFrame mientras el fichero no cambie, y
+    entre ejecuciones se lee la caché Feather. El DataFrame es compartido, así
+    que no hay que modificarlo: usar .copy() antes.
+    """
+    ruta = Path(directorio or DIRECTORIO_DATOS) / DATASETS[nombre]
+
+    with _lock:
+        estado = ruta.stat()
+        clave = (estado.st_mtime_ns, estado.st_size)
+        if ruta in _cargados and _cargados[ruta][0] == clave:
+            return _cargados[ruta][1]
+
+        datos = _leer_con_cache(ruta, estado)
+        _cargados[ruta] = (clave, datos)
+        return datos
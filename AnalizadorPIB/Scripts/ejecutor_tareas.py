@@ -0,0 +1,155 @@
+import io
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TareaCancelada(Exception):
+    """La tarea se ha cancelado desde la interfaz"""
+
+
+class Tarea:
+    """
+    Lo que ve el trabajo que se ejecuta en segundo plano: sirve para avisar
+    del progreso y para comprobar si se ha pedido cancelar. Tk no se puede
+    tocar desde el hilo de trabajo, así que los avisos van a una cola que el
+    ejecutor vacía desde el hilo de Tk.
+    """
+
+    def __init__(self, titulo):
+        self.titulo = titulo
+        self.avisos = queue.Queue()
+        self._cancelada = threading.Event()
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        self._cancelada.set()
+
+    def comprobar(self):
+        """Lanza TareaCancelada si se ha pedido cancelar"""
+        if self.cancelada:
+            raise TareaCancelada(self.titulo)
+
+    def avanzar(self, mensaje, porcentaje=None):
+        """Punto de cancelación: anuncia el paso siguiente (porcentaje 0-100 o None)"""
+        self.comprobar()
+        self.avisos.put(('progreso', mensaje, porcentaje))
+
+    def informar(self, mensaje):
+        """Texto para el panel de salida"""
+        self.avisos.put(('mensaje', mensaje))
+
+
+class SalidaDelHilo(io.TextIOBase):
+    """
+    Sustituto de sys.stdout que solo desvía lo que escribe el hilo que lo
+    crea; lo que impriman otros hilos (el de Tk) sigue yendo a `original`.
+    sys.stdout es global al proceso, así que redirect_stdout por sí solo
+    capturaría también la salida de la interfaz.
+    """
+
+    def __init__(self, destino, original):
+        self.destino = destino
+        self.original = original
+        self._hilo = threading.get_ident()
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        if threading.get_ident() == self._hilo:
+            return self.destino.write(texto)
+        if self.original is None:  # pythonw: sin consola
+            return len(texto)
+        return self.original.write(texto)
+
+    def flush(self):
+        if self.original is not None:
+            self.original.flush()
+
+
+class EjecutorTareas:
+    """
+    Ejecuta de una en una las tareas pesadas (pandas, construcción de
+    figuras) en un hilo aparte y devuelve los resultados al hilo de Tk
+    revisando cada `intervalo_ms` con root.after. La cancelación es
+    cooperativa: el trabajo se detiene en el siguiente tarea.avanzar() y su
+    resultado se descarta.
+    """
+
+    def __init__(self, root, intervalo_ms=100):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.tarea = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='analisis')
+
+    @property
+    def ocupado(self):
+        return self.tarea is not None
+
+    def ejecutar(self, titulo, trabajo, al_terminar=None, al_error=None, al_cancelar=None,
+                 al_mensaje=None, al_progreso=None):
+        """
+        Lanza trabajo(tarea) en segundo plano. Los callbacks se llaman en el
+        hilo de Tk: al_mensaje(texto) y al_progreso(texto, porcentaje)
+        mientras dura, y al final uno de al_terminar(resultado),
+        al_error(excepcion) o al_cancelar(resultado o None).
+        Devuelve la Tarea, o None si ya hay una en curso.
+        """
+        if self.ocupado:
+            return None
+
+        tarea = Tarea(titulo)
+        self.tarea = tarea
+        futuro = self._pool.submit(trabajo, tarea)
+        callbacks = (al_terminar, al_error, al_cancelar, al_mensaje, al_progreso)
+        self.root.after(self.intervalo_ms, self._revisar, tarea, futuro, callbacks)
+        return tarea
+
+    def informar(self, mensaje):
+        """Encola un mensaje de la tarea en curso (desde el hilo de trabajo)"""
+        if self.tarea is not None:
+            self.tarea.informar(mensaje)
+
+    def cancelar(self):
+        if self.tarea is not None:
+            self.tarea.cancelar()
+
+    def cerrar(self):
+        """Cancela lo que haya en curso y no acepta más tareas (al cerrar la ventana)"""
+        self.cancelar()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _revisar(self, tarea, futuro, callbacks):
+        al_terminar, al_error, al_cancelar, al_mensaje, al_progreso = callbacks
+
+        # Se mira antes de vaciar la cola para no perder los últimos avisos
+        terminado = futuro.done()
+        while True:
+            try:
+                aviso = tarea.avisos.get_nowait()
+            except queue.Empty:
+                break
+            if aviso[0] == 'mensaje':
+                if al_mensaje:
+                    al_mensaje(aviso[1])
+            elif al_progreso:
+                al_progreso(aviso[1], aviso[2])
+
+        if not terminado:
+            self.root.after(self.intervalo_ms, self._revisar, tarea, futuro, callbacks)
+            return
+
+        self.tarea = None
+        error = futuro.exception()
+        if tarea.cancelada or isinstance(error, TareaCancelada):
+            if al_cancelar:
+                al_cancelar(None if error else futuro.result())
+        elif error is not None:
+            if al_error:
+                al_error(error)
+        elif al_terminar:
+            al_terminar(futuro.result())
@@ -0,0 +1,103 @@
+import pandas as pd
+import numpy as np
+
+# Periodos por año de cada frecuencia admitida
+FRECUENCIAS = {'anual': 1, 'trimestral': 4, 'mensual': 12}
+
+
+def factores_acumulados(tasas_pct, rezago=1):
+    """
+    Producto acumulado de (1 + tasa/100). Con rezago > 1 cada tasa compara
+    un periodo con el de `rezago` posiciones antes (tasas interanuales de
+    datos trimestrales o mensuales), así que hay una cadena por trimestre o
+    por mes y cada una se acumula por separado.
+
+    La tasa de los primeros `rezago` periodos no se usa: no hay periodo
+    anterior con el que compararlos.
+    """
+    factores = 1 + np.asarray(tasas_pct, dtype=float) / 100
+    factores[:rezago] = 1.0
+    if rezago == 1:
+        return np.cumprod(factores)
+
+    # Una columna por cadena: se rellena la última fila para poder hacer reshape
+    n = len(factores)
+    matriz = np.append(factores, np.ones(-n % rezago)).reshape(-1, rezago)
+    return np.cumprod(matriz, axis=0).ravel()[:n]
+
+
+def validar_periodos(anos, periodos=None, frecuencia='anual'):
+    """
+    Comprueba que la serie recorre la rejilla año x periodo (trimestre o mes,
+    1, 2, ...) en orden y sin huecos, como suponen el encadenamiento y las
+    tasas interanuales. Devuelve los periodos como array (todo 1 en frecuencia
+    anual) o lanza ValueError indicando los periodos que faltan.
+    """
+    por_ano = FRECUENCIAS[frecuencia]
+    anos = np.asarray(anos)
+    if por_ano == 1:
+        periodos = np.ones(len(anos), dtype=int)
+    elif periodos is None:
+        raise ValueError(f"Frecuencia {frecuencia}: hace falta el periodo (trimestre o mes) de cada fila")
+    else:
+        periodos = np.asarray(periodos, dtype=int)
+
+    posicion = (anos - anos.min()) * por_ano + (periodos - 1)
+    if np.array_equal(posicion, np.arange(posicion[0], posicion[0] + len(posicion))):
+        return periodos
+
+    if np.any(np.diff(posicion) <= 0):
+        raise ValueError("La serie debe estar ordenada por periodo y sin repetidos")
+    faltan = np.setdiff1d(np.arange(posicion[0], posicion[-1] + 1), posicion)
+    formato = {'anual': '{}', 'trimestral': '{}T{}', 'mensual': '{}-{:02d}'}[frecuencia]
+    etiquetas = [formato.format(anos.min() + p // por_ano, p % por_ano + 1) for p in faltan]
+    raise ValueError(f"La serie tiene huecos, faltan los periodos: {', '.join(etiquetas)}")
+
+
+def indice_precios(tasas_pct, anos, anos_base, frecuencia='anual', interanual=True, valor_base=100.0,
+                   periodos=None):
+    """
+    Índice de precios a partir de tasas de inflación (%), una columna por año
+    base. `anos` es el año de cada fila y `periodos` su trimestre o mes
+    (1, 2, ...; no se usa en frecuencia anual). La serie debe estar ordenada
+    y sin huecos (ver validar_periodos), y cada año base debe tener todos
+    sus periodos; si no, se lanza ValueError.
+
+    - interanual=True: cada tasa compara con el mismo periodo del año
+      anterior y el índice vale `valor_base` en cada periodo del año base.
+    - interanual=False: cada tasa compara con el periodo anterior y el índice
+      promedia `valor_base` en el año base.
+
+    En frecuencia anual las dos opciones coinciden. Cambiar de año base solo
+    divide por otra referencia, así que rebasar a varios años cuesta lo mismo
+    que a uno.
+    """
+    if frecuencia not in FRECUENCIAS:
+        raise ValueError(f"Frecuencia no soportada: {frecuencia}")
+
+    por_ano = FRECUENCIAS[frecuencia]
+    anos = np.asarray(anos)
+    periodos = validar_periodos(anos, periodos, frecuencia)
+
+    # Serie continua: las filas de una misma cadena están a `rezago` posiciones
+    rezago = por_ano if interanual else 1
+    nivel = factores_acumulados(tasas_pct, rezago)
+
+    indices = {}
+    for ano_base in anos_base:
+        en_base = anos == ano_base
+        if not en_base.any():
+            raise ValueError(f"El ano base {ano_base} no esta en la serie")
+        if en_base.sum() < por_ano:
+            raise ValueError(f"El ano base {ano_base} no tiene todos sus periodos")
+
+        if rezago == 1:
+            referencia = nivel[en_base].mean()
+        else:
+            # Valor de cada cadena (trimestre o mes) en el año base
+            referencia = np.full(por_ano + 1, np.nan)
+            referencia[periodos[en_base]] = nivel[en_base]
+            referencia = referencia[periodos]
+        indices[ano_base] = valor_base * nivel / referencia
+
+    return pd.DataFrame(indices)
@@ -0,0 +1,81 @@
+import pandas as pd
+import numpy as np
+
+# Etiquetas de los trimestres acumulados del dataset (enero-marzo, enero-junio...)
+TRIMESTRES = ['E-M', 'E-J', 'E-S', 'E-D']
+
+
+def inferir_periodos(datos, columna_componente='COMPONENTES'):
+    """
+    Deduce de la cabecera qué columnas son de cada año y trimestre.
+
+    En el CSV del PIB por el gasto solo la primera columna de cada año lleva
+    el año ('2018', '2021 (p)'...); las siguientes salen como 'Unnamed: N'.
+    El año se arrastra hacia la derecha y el trimestre es la posición de la
+    columna dentro de su año. Los textos de los trimestres se leen de la
+    fila de subcabecera (la que no tiene componente) si existe.
+
+    Devuelve un DataFrame con Posicion, Año, Trimestre y Trimestre_Texto.
+    """
+    nombres = pd.Series(datos.columns.astype(str))
+    años = nombres.str.extract(r'((?:19|20)\d{2})', expand=False)
+    años[nombres.str.startswith('Unnamed') | (nombres == columna_componente)] = np.nan
+    # Las columnas anteriores al primer año (componente, notas...) quedan fuera
+    años = años.ffill()
+
+    posiciones = np.flatnonzero(años.notna().to_numpy())
+    años = años.iloc[posiciones].astype(int).to_numpy()
+    # Posición dentro del año: distancia a la primera columna de ese año
+    inicio_año = np.r_[True, años[1:] != años[:-1]]
+    primera = np.maximum.accumulate(np.where(inicio_año, np.arange(len(años)), 0))
+    trimestres = np.arange(len(años)) - primera + 1
+
+    dentro = trimestres <= len(TRIMESTRES)
+    posiciones, años, trimestres = posiciones[dentro], años[dentro], trimestres[dentro]
+
+    textos = np.array(TRIMESTRES, dtype=object)[trimestres - 1]
+    if columna_componente in datos:
+        sin_componente = np.flatnonzero(datos[columna_componente].isna().to_numpy())
+        if len(sin_componente):
+            etiquetas = datos.iloc[sin_componente[0], posiciones].astype(str).str.strip().to_numpy()
+            textos = np.where(np.isin(etiquetas, TRIMESTRES), etiquetas, textos)
+
+    return pd.DataFrame({
+        'Posicion': posiciones,
+        'Año': años,
+        'Trimestre': trimestres,
+        'Trimestre_Texto': textos,
+    })
+
+
+def pib_gasto_a_formato_largo(datos, componentes=None, columna_componente='COMPONENTES'):
+    """
+    Pasa el dataset del PIB por componentes de gasto (una fila por
+    componente, una columna por trimestre) a formato largo: una fila por
+    componente y trimestre con Año, Trimestre, Trimestre_Texto, Componente y
+    Valor_Indice. Las celdas vacías o no numéricas se descartan.
+
+    Se hace en una sola pasada con NumPy sobre la matriz de valores, así que
+    añadir años o componentes no cambia el código.
+    """
+    # La subcabecera con los trimestres se lee antes de quitar las filas sin componente
+    periodos = inferir_periodos(datos, columna_componente)
+
+    nombres = datos[columna_componente]
+    validas = nombres.notna() & (nombres.astype(str).str.strip() != '')
+    if componentes is not None:
+        validas &= nombres.isin(componentes)
+    filas_validas = np.flatnonzero(validas.to_numpy())
+
+    bloque = datos.iloc[filas_validas, periodos['Posicion'].to_numpy()].to_numpy(dtype=object)
+    valores = pd.to_numeric(pd.Series(bloque.ravel()), errors='coerce').to_numpy(dtype=float).reshape(bloque.shape)
+
+    # Índices (fila, columna) de las celdas con valor, en orden de lectura
+    filas, columnas = np.nonzero(~np.isnan(valores))
+    return pd.DataFrame({
+        'Año': periodos['Año'].to_numpy()[columnas],
+        'Trimestre': periodos['Trimestre'].to_numpy()[columnas],
+        'Trimestre_Texto': periodos['Trimestre_Texto'].to_numpy()[columnas],
+        'Componente': nombres.to_numpy()[filas_validas][filas],
+        'Valor_Indice': valores[filas, columnas],
+    })
@@ -1,4 +1,8 @@
 import pandas as pd
+import matplotlib
+# Las figuras se construyen en el hilo de análisis: pyplot no debe crear
+# ventanas Tk; se incrustan después con FigureCanvasTkAgg
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
@@ -8,13 +12,16 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkinter.scrolledtext import ScrolledText
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import contextlib
 import io
 import sys
 import os
+import threading
 
 # Importa tus clases ya creadas
 from Scripts.analizador_crecimiento_pib import AnalizadorCrecimientoPIB_Final
 from Scripts.analizador_inflacion_pibreal import AnalizadorInflacionPIBReal, AnalizadorPIBCompleto
+from Scripts.ejecutor_tareas import EjecutorTareas, SalidaDelHilo
 
 
 class InterfazAnalisisPIB:
@@ -31,6 +38,10 @@ class InterfazAnalisisPIB:
         self.analizador_completo = AnalizadorPIBCompleto()
         self.analizador_inflacion = AnalizadorInflacionPIBReal()
 
+        # Hilo para los análisis pesados (ver Scripts/ejecutor_tareas.py)
+        self.ejecutor = EjecutorTareas(root)
+        self.root.protocol("WM_DELETE_WINDOW", self.salir)
+
         # Variables para controlar el estado
         self.datos_cargados = False
         self.figura_actual = None
@@ -61,6 +72,15 @@ class InterfazAnalisisPIB:
         self.label_estado = ttk.Label(self.frame_controles_superior, text="Estado: Esperando carga de datos...",
                                      foreground="red", font=("Segoe UI", 9, "bold"))
         self.label_estado.pack(side="left", padx=(0, 20))
+
+        # Progreso del análisis en segundo plano
+        self.barra_progreso = ttk.Progressbar(self.frame_controles_superior, length=160, maximum=100)
+        self.barra_progreso.pack(side="left", padx=(0, 5))
+        self.label_progreso = ttk.Label(self.frame_controles_superior, text="")
+        self.label_progreso.pack(side="left", padx=(0, 5))
+        self.boton_cancelar = ttk.Button(self.frame_controles_superior, text=" Cancelar",
+                                         command=self.cancelar_tarea, state="disabled")
+        self.boton_cancelar.pack(side="left")
         
         # Controles permanentes
         frame_botones_permanentes = ttk.Frame(self.frame_controles_superior)
@@ -71,7 +91,7 @@ class InterfazAnalisisPIB:
         ttk.Button(frame_botones_permanentes, text=" Limpiar Todo",
                   command=self.limpiar_todo).pack(side="left", padx=5)
         ttk.Button(frame_botones_permanentes, text=" Salir",
-                  command=self.root.destroy).pack(side="left", padx=5)
+                  command=self.salir).pack(side="left", padx=5)
 
         # === CONTENEDOR PRINCIPAL (sidebar + área visualización) ===
         self.frame_contenedor = ttk.Frame(self.frame_principal)
@@ -85,6 +105,7 @@ class InterfazAnalisisPIB:
         # Panel de controles (sin cambios)
         frame_controles = ttk.LabelFrame(frame_izq, text=" Controles de Análisis", padding=10)
         frame_controles.pack(fill="x", pady=(0, 10))
+        self.frame_controles = frame_controles
 
         # Sección de carga de datos
         ttk.Label(frame_controles, text="Carga de Datos:", font=("Segoe UI", 9, "bold")).pack(anchor="w", pady=(0, 5))
@@ -189,28 +210,29 @@ class InterfazAnalisisPIB:
 
     def cargar_datos(self):
         """Carga todos los datasets automáticamente"""
-        try:
-            self.mostrar_mensaje("Cargando datos de República Dominicana...")
+        self.mostrar_mensaje("Cargando datos de República Dominicana...")
 
+        def trabajo(tarea):
+            tarea.avanzar("Leyendo datasets")
             # Cargar datos para crecimiento
-            if self.analizador_crecimiento.cargar_datos():
-                self.datos_cargados = True
-                self.label_estado.config(text="Estado: Datos cargados correctamente", foreground="green")
-                self.mostrar_mensaje(" Todos los datasets cargados exitosamente para análisis de crecimiento")
+            return self.analizador_crecimiento.cargar_datos()
 
-                # Mostrar información sobre los datos cargados
-                self.mostrar_info_datos_cargados()
-            else:
+        def al_terminar(cargados):
+            if not cargados:
                 self.mostrar_mensaje(" Error al cargar datos de crecimiento")
                 return
 
+            self.datos_cargados = True
+            self.label_estado.config(text="Estado: Datos cargados correctamente", foreground="green")
+            self.mostrar_mensaje(" Todos los datasets cargados exitosamente para análisis de crecimiento")
+
+            # Mostrar información sobre los datos cargados
+            self.mostrar_info_datos_cargados()
+
             messagebox.showinfo("Datos cargados",
                                 "Todos los datos de República Dominicana fueron cargados correctamente.")
 
-        except Exception as e:
-            error_msg = f"Error al cargar datos:\n{str(e)}"
-            self.mostrar_mensaje(f" {error_msg}")
-            messagebox.showerror("Error al cargar", error_msg)
+        self._en_segundo_plano("Carga de datos", trabajo, al_terminar)
 
     def cargar_csv_manual(self):
         """Permite seleccionar archivos CSV manualmente"""
@@ -232,6 +254,9 @@ class InterfazAnalisisPIB:
                 # Actualizar datos del PIB Corriente
                 self.actualizar_pib_corriente()
 
+                # Las series derivadas calculadas con los datos anteriores ya no valen
+                self.analizador_crecimiento.invalidar_cache()
+
                 messagebox.showinfo(
                     "Éxito",
                     f"Se cargaron {len(archivos)} archivos correctamente.\n"
@@ -550,35 +575,29 @@ class InterfazAnalisisPIB:
             messagebox.showwarning("Datos no cargados", "Por favor, cargue los datos primero.")
             return
 
-        try:
-            self.mostrar_mensaje("Iniciando análisis de inflación para República Dominicana...")
-            self.cargar_datos_inflacion_estimados()
-
-            datos_pib_nominal = self.analizador_inflacion.extraer_pib_nominal_desde_datos(
-                self.analizador_crecimiento.datos_pib_gasto
-            )
+        self.mostrar_mensaje("Iniciando análisis de inflación para República Dominicana...")
+        self._ejecutar_con_redireccion(
+            self.analizador_inflacion.generar_reporte_inflacion,
+            self.visualizar_inflacion_adaptado,
+            "Análisis de Inflación y PIB Real - República Dominicana",
+            preparar=self._preparar_pib_real
+        )
 
-            if datos_pib_nominal is not None:
-                self.analizador_inflacion.datos_pib_nominal = datos_pib_nominal
-                self.mostrar_mensaje(" Datos de PIB nominal extraídos correctamente")
+    def _preparar_pib_real(self):
+        """Carga la inflación estimada y calcula el PIB real (en el hilo de análisis)"""
+        self.cargar_datos_inflacion_estimados()
 
-                pib_real = self.analizador_inflacion.calcular_pib_real(ano_base=2018)
+        datos_pib_nominal = self.analizador_inflacion.extraer_pib_nominal_desde_datos(
+            self.analizador_crecimiento.datos_pib_gasto
+        )
+        if datos_pib_nominal is None:
+            raise ValueError("No se pudieron extraer datos del PIB nominal")
 
-                if pib_real is not None:
-                    self._ejecutar_con_redireccion(
-                        self.analizador_inflacion.generar_reporte_inflacion,
-                        self.visualizar_inflacion_adaptado,
-                        "Análisis de Inflación y PIB Real - República Dominicana"
-                    )
-                else:
-                    messagebox.showerror("Error", "No se pudo calcular el PIB real")
-            else:
-                messagebox.showerror("Error", "No se pudieron extraer datos del PIB nominal")
+        self.analizador_inflacion.datos_pib_nominal = datos_pib_nominal
+        self.mostrar_mensaje(" Datos de PIB nominal extraídos correctamente")
 
-        except Exception as e:
-            error_msg = f"Error en análisis de inflación:\n{str(e)}"
-            self.mostrar_mensaje(f" {error_msg}")
-            messagebox.showerror("Error", error_msg)
+        if self.analizador_inflacion.calcular_pib_real(ano_base=2018) is None:
+            raise ValueError("No se pudo calcular el PIB real")
 
     def visualizar_inflacion_adaptado(self):
         """Visualización adaptada para inflación"""
@@ -646,7 +665,12 @@ class InterfazAnalisisPIB:
             return
 
         self.limpiar_grafico()
-        self._redirigir_salida(self.analizador_crecimiento.generar_reporte_analisis)
+
+        def trabajo(tarea):
+            tarea.avanzar("Generando reporte")
+            self._redirigir_salida(self.analizador_crecimiento.generar_reporte_analisis)
+
+        self._en_segundo_plano("Reporte de crecimiento", trabajo)
 
     def generar_reporte_inflacion(self):
         """Genera solo el reporte de inflación sin gráficos"""
@@ -655,57 +679,135 @@ class InterfazAnalisisPIB:
             return
 
         self.limpiar_grafico()
-        try:
-            self.cargar_datos_inflacion_estimados()
-            datos_pib_nominal = self.analizador_inflacion.extraer_pib_nominal_desde_datos(
-                self.analizador_crecimiento.datos_pib_gasto
-            )
-            if datos_pib_nominal is not None:
-                self.analizador_inflacion.datos_pib_nominal = datos_pib_nominal
-                self.analizador_inflacion.calcular_pib_real(ano_base=2018)
-                self._redirigir_salida(self.analizador_inflacion.generar_reporte_inflacion)
-            else:
-                messagebox.showerror("Error", "No se pudieron extraer datos del PIB nominal")
-        except Exception as e:
-            self.mostrar_mensaje(f" Error generando reporte de inflación: {str(e)}")
 
-    def _ejecutar_con_redireccion(self, funcion_texto, funcion_grafico, titulo):
-        """Función auxiliar para ejecutar análisis con redirección de salida"""
+        def trabajo(tarea):
+            tarea.avanzar("Calculando PIB real", 10)
+            self._preparar_pib_real()
+            tarea.avanzar("Generando reporte", 60)
+            self._redirigir_salida(self.analizador_inflacion.generar_reporte_inflacion)
+
+        self._en_segundo_plano("Reporte de inflación", trabajo)
+
+    def _ejecutar_con_redireccion(self, funcion_texto, funcion_grafico, titulo, preparar=None):
+        """
+        Ejecuta un análisis en segundo plano: `preparar` (si se indica), el
+        reporte de texto y el gráfico, que se incrusta al terminar.
+        """
         self.limpiar_grafico()
-        self.mostrar_mensaje(f"\n EJECUTANDO: {titulo}")
-        self.mostrar_mensaje("=" * 60)
 
-        self._redirigir_salida(funcion_texto)
+        def trabajo(tarea):
+            if preparar is not None:
+                tarea.avanzar("Preparando datos", 5)
+                preparar()
 
-        try:
+            tarea.avanzar("Generando reporte", 20)
+            self.mostrar_mensaje(f"\n EJECUTANDO: {titulo}")
+            self.mostrar_mensaje("=" * 60)
+            self._redirigir_salida(funcion_texto)
+
+            tarea.avanzar("Construyendo gráfico", 60)
             fig = funcion_grafico()
+            if fig is not None and hasattr(fig, 'suptitle'):
+                fig.suptitle(titulo, fontsize=12, fontweight='bold', y=0.98)
+
+            tarea.avanzar("Dibujando gráfico", 90)
+            return fig
+
+        def al_terminar(fig):
             if fig is not None:
-                if hasattr(fig, 'suptitle'):
-                    fig.suptitle(titulo, fontsize=12, fontweight='bold', y=0.98)
                 self.mostrar_grafico(fig)
                 self.mostrar_mensaje(f" Gráfico de {titulo} generado correctamente")
             else:
                 self.mostrar_mensaje("⚠ No se pudo generar el gráfico")
-        except Exception as e:
-            error_msg = f"Error generando gráfico: {str(e)}"
+
+        self._en_segundo_plano(titulo, trabajo, al_terminar)
+
+    # ======================
+    # EJECUCIÓN EN SEGUNDO PLANO
+    # ======================
+
+    def _en_segundo_plano(self, titulo, trabajo, al_terminar=None):
+        """
+        Ejecuta trabajo(tarea) en el hilo de análisis sin bloquear la interfaz.
+        al_terminar(resultado) se llama en el hilo de Tk; si se cancela, el
+        resultado se descarta.
+        """
+        if self.ejecutor.ocupado:
+            messagebox.showinfo("Análisis en curso", "Espere a que termine el análisis actual o cancélelo.")
+            return
+
+        self._activar_controles(False)
+        self._progreso_tarea(titulo, None)
+
+        def terminar(resultado):
+            try:
+                if al_terminar is not None:
+                    al_terminar(resultado)
+            finally:
+                self._fin_tarea()
+
+        def cancelar(resultado):
+            self._fin_tarea()
+            if resultado is not None and hasattr(resultado, 'suptitle'):
+                plt.close(resultado)
+            self.mostrar_mensaje(f" {titulo}: cancelado")
+
+        def error(e):
+            self._fin_tarea()
+            error_msg = f"Error en {titulo}:\n{str(e)}"
             self.mostrar_mensaje(f" {error_msg}")
-            messagebox.showwarning("Visualización", error_msg)
+            messagebox.showerror("Error", error_msg)
+
+        self.ejecutor.ejecutar(titulo, trabajo, al_terminar=terminar, al_error=error, al_cancelar=cancelar,
+                               al_mensaje=self.mostrar_mensaje, al_progreso=self._progreso_tarea)
+
+    def _progreso_tarea(self, mensaje, porcentaje):
+        """Actualiza la barra de progreso (porcentaje None: sin estimación)"""
+        if porcentaje is None:
+            self.barra_progreso.config(mode="indeterminate")
+            self.barra_progreso.start(15)
+        else:
+            self.barra_progreso.stop()
+            self.barra_progreso.config(mode="determinate", value=porcentaje)
+        self.label_progreso.config(text=mensaje)
+
+    def _fin_tarea(self):
+        self.barra_progreso.stop()
+        self.barra_progreso.config(mode="determinate", value=0)
+        self.label_progreso.config(text="")
+        self._activar_controles(True)
+
+    def _activar_controles(self, activos):
+        """Mientras hay un análisis en curso solo se puede cancelarlo"""
+        for widget in self.frame_controles.winfo_children():
+            if isinstance(widget, ttk.Button):
+                widget.state(["!disabled"] if activos else ["disabled"])
+        self.boton_cancelar.state(["disabled"] if activos else ["!disabled"])
+
+    def cancelar_tarea(self):
+        """Pide parar el análisis en curso; se detiene en su siguiente paso"""
+        if self.ejecutor.ocupado:
+            self.ejecutor.cancelar()
+            self.label_progreso.config(text="Cancelando...")
+
+    def salir(self):
+        self.ejecutor.cerrar()
+        self.root.destroy()
 
     def _redirigir_salida(self, funcion):
-        """Redirige la salida estándar al widget de texto"""
+        """
+        Ejecuta funcion() mostrando en el widget de texto lo que imprime. Solo
+        se captura la salida de este hilo (el de análisis). Los errores se
+        propagan para que el ejecutor los muestre con al_error.
+        """
         buffer = io.StringIO()
-        sys_stdout_original = sys.stdout
-        sys.stdout = buffer
-
         try:
-            funcion()
-        except Exception as e:
-            self.mostrar_mensaje(f" Error durante la ejecución: {str(e)}")
+            with contextlib.redirect_stdout(SalidaDelHilo(buffer, sys.stdout)):
+                funcion()
         finally:
-            sys.stdout = sys_stdout_original
-
-        texto_resultado = buffer.getvalue()
-        self.mostrar_mensaje(texto_resultado)
+            texto_resultado = buffer.getvalue()
+            if texto_resultado:
+                self.mostrar_mensaje(texto_resultado)
 
     def mostrar_grafico(self, figura):
         """Muestra una figura matplotlib en el panel de gráficos"""
@@ -718,9 +820,14 @@ class InterfazAnalisisPIB:
 
     def mostrar_mensaje(self, mensaje):
         """Muestra un mensaje en el panel de salida"""
+        if threading.current_thread() is not threading.main_thread():
+            # Desde el hilo de análisis: Tk no es thread-safe, lo muestra el ejecutor
+            self.ejecutor.informar(mensaje)
+            return
+
         self.text_output.insert(tk.END, mensaje + "\n")
         self.text_output.see(tk.END)
-        self.root.update()
+        self.root.update_idletasks()
 
     def limpiar_todo(self):
         """Limpia tanto el texto como los gráficos"""
@@ -0,0 +1,35 @@
+"""unique finding per url and vulnerability type
+
+Revision ID: 4e7a9d2c6b15
+Revises: 8c3b1f2a4d01
+Create Date: 2026-10-18 09:31:05.552917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7a9d2c6b15'
+down_revision: Union[str, Sequence[str], None] = '8c3b1f2a4d01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Elimina duplicados previos conservando el hallazgo más antiguo
+    op.execute(
+        "DELETE FROM findings WHERE id NOT IN ("
+        "SELECT MIN(id) FROM findings GROUP BY url, vulnerability_type)"
+    )
+    with op.batch_alter_table('findings') as batch_op:
+        batch_op.create_unique_constraint('uq_findings_url_type', ['url', 'vulnerability_type'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('findings') as batch_op:
+        batch_op.drop_constraint('uq_findings_url_type', type_='unique')
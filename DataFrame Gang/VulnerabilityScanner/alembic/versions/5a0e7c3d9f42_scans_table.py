@@ -0,0 +1,178 @@
+"""scans table and per-scan partitioning of findings
+
+Revision ID: 5a0e7c3d9f42
+Revises: d2f84c61e9b3
+Create Date: 2026-10-18 11:58:33.417290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0e7c3d9f42'
+down_revision: Union[str, Sequence[str], None] = 'd2f84c61e9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_HOST = """
+    CASE WHEN instr(substr({url}, instr({url}, '://') + 3), '/') > 0
+         THEN substr(substr({url}, instr({url}, '://') + 3), 1,
+                     instr(substr({url}, instr({url}, '://') + 3), '/') - 1)
+         ELSE substr({url}, instr({url}, '://') + 3)
+    END
+"""
+
+POSTGRES_HOST = "split_part(split_part({url}, '://', 2), '/', 1)"
+
+
+def _drop_summary_triggers(dialect):
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS trg_finding_summary_insert")
+        op.execute("DROP TRIGGER IF EXISTS trg_finding_summary_delete")
+    elif dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS trg_finding_summary ON findings")
+        op.execute("DROP FUNCTION IF EXISTS finding_summary_sync()")
+
+
+def _create_summary_triggers(dialect, with_scan):
+    host = SQLITE_HOST if dialect == 'sqlite' else POSTGRES_HOST
+    if with_scan:
+        columns = "scan_id, severity, vulnerability_type, host"
+        new_key = "COALESCE(NEW.scan_id, 0), NEW.severity, NEW.vulnerability_type, " + host.format(url='NEW.url')
+        old_match = "scan_id = COALESCE(OLD.scan_id, 0) AND "
+    else:
+        columns = "severity, vulnerability_type, host"
+        new_key = "NEW.severity, NEW.vulnerability_type, " + host.format(url='NEW.url')
+        old_match = ""
+    old_match += (
+        "severity = OLD.severity AND vulnerability_type = OLD.vulnerability_type "
+        f"AND host = {host.format(url='OLD.url')}"
+    )
+
+    if dialect == 'sqlite':
+        op.execute(f"""
+            CREATE TRIGGER trg_finding_summary_insert
+            AFTER INSERT ON findings
+            BEGIN
+                INSERT INTO finding_summary ({columns}, total)
+                VALUES ({new_key}, 1)
+                ON CONFLICT ({columns}) DO UPDATE SET total = total + 1;
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_finding_summary_delete
+            AFTER DELETE ON findings
+            BEGIN
+                UPDATE finding_summary SET total = total - 1 WHERE {old_match};
+                DELETE FROM finding_summary WHERE total <= 0;
+            END
+        """)
+    elif dialect == 'postgresql':
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION finding_summary_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO finding_summary ({columns}, total)
+                    VALUES ({new_key}, 1)
+                    ON CONFLICT ({columns})
+                    DO UPDATE SET total = finding_summary.total + 1;
+                    RETURN NEW;
+                END IF;
+
+                UPDATE finding_summary SET total = total - 1 WHERE {old_match};
+                DELETE FROM finding_summary WHERE total <= 0;
+                RETURN OLD;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER trg_finding_summary
+            AFTER INSERT OR DELETE ON findings
+            FOR EACH ROW EXECUTE FUNCTION finding_summary_sync()
+        """)
+
+
+def _rebuild_summary(dialect, with_scan):
+    host = SQLITE_HOST if dialect == 'sqlite' else POSTGRES_HOST
+    op.drop_table('finding_summary')
+
+    columns = [
+        sa.Column('severity', sa.String(), nullable=False),
+        sa.Column('vulnerability_type', sa.String(), nullable=False),
+        sa.Column('host', sa.String(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+    ]
+    key = ['severity', 'vulnerability_type', 'host']
+    if with_scan:
+        columns.insert(0, sa.Column('scan_id', sa.Integer(), nullable=False))
+        key.insert(0, 'scan_id')
+    op.create_table('finding_summary', *columns, sa.PrimaryKeyConstraint(*key))
+
+    select_key = "severity, vulnerability_type, " + host.format(url='url')
+    if with_scan:
+        select_key = "COALESCE(scan_id, 0), " + select_key
+    op.execute(
+        f"INSERT INTO finding_summary ({', '.join(key)}, total) "
+        f"SELECT {select_key}, COUNT(*) FROM findings GROUP BY {', '.join(str(i + 1) for i in range(len(key)))}"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.create_table(
+        'scans',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('target', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('settings', sa.JSON(), nullable=True),
+        sa.Column('stats', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_scans_id', 'scans', ['id'], unique=False)
+    op.create_index('ix_scans_target', 'scans', ['target'], unique=False)
+
+    # En SQLite el batch recrea la tabla y se pierden sus triggers
+    _drop_summary_triggers(dialect)
+
+    with op.batch_alter_table('findings') as batch_op:
+        batch_op.add_column(sa.Column('scan_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_findings_scan_id', 'scans', ['scan_id'], ['id'], ondelete='CASCADE')
+        batch_op.drop_constraint('uq_findings_url_type', type_='unique')
+        batch_op.create_unique_constraint('uq_findings_scan_url_type', ['scan_id', 'url', 'vulnerability_type'])
+        batch_op.create_index('ix_findings_scan_id_id', ['scan_id', 'id'], unique=False)
+
+    _rebuild_summary(dialect, with_scan=True)
+    _create_summary_triggers(dialect, with_scan=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    _drop_summary_triggers(dialect)
+
+    # Vuelve a la unicidad global: se conserva el hallazgo más antiguo
+    op.execute(
+        "DELETE FROM findings WHERE id NOT IN ("
+        "SELECT MIN(id) FROM findings GROUP BY url, vulnerability_type)"
+    )
+    with op.batch_alter_table('findings') as batch_op:
+        batch_op.drop_index('ix_findings_scan_id_id')
+        batch_op.drop_constraint('uq_findings_scan_url_type', type_='unique')
+        batch_op.create_unique_constraint('uq_findings_url_type', ['url', 'vulnerability_type'])
+        batch_op.drop_constraint('fk_findings_scan_id', type_='foreignkey')
+        batch_op.drop_column('scan_id')
+
+    _rebuild_summary(dialect, with_scan=False)
+    _create_summary_triggers(dialect, with_scan=False)
+
+    op.drop_index('ix_scans_target', table_name='scans')
+    op.drop_index('ix_scans_id', table_name='scans')
+    op.drop_table('scans')
@@ -0,0 +1,48 @@
+"""create findings table
+
+Revision ID: 8c3b1f2a4d01
+Revises: 
+Create Date: 2026-10-18 09:12:40.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3b1f2a4d01'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las bases existentes ya tienen la tabla (creada por create_all en el dashboard)
+    if sa.inspect(op.get_bind()).has_table('findings'):
+        return
+
+    op.create_table(
+        'findings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('http_status', sa.Integer(), nullable=True),
+        sa.Column('vulnerability_type', sa.String(), nullable=False),
+        sa.Column('severity', sa.String(), nullable=False),
+        sa.Column('details', sa.String(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_findings_id', 'findings', ['id'], unique=False)
+    op.create_index('ix_findings_url', 'findings', ['url'], unique=False)
+    op.create_index('ix_findings_vulnerability_type', 'findings', ['vulnerability_type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_findings_vulnerability_type', table_name='findings')
+    op.drop_index('ix_findings_url', table_name='findings')
+    op.drop_index('ix_findings_id', table_name='findings')
+    op.drop_table('findings')
@@ -0,0 +1,30 @@
+"""composite indexes for findings keyset pagination
+
+Revision ID: b91d5e0f3a27
+Revises: 4e7a9d2c6b15
+Create Date: 2026-10-18 11:04:52.730166
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b91d5e0f3a27'
+down_revision: Union[str, Sequence[str], None] = '4e7a9d2c6b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_findings_severity_id', 'findings', ['severity', 'id'], unique=False)
+    op.create_index('ix_findings_type_id', 'findings', ['vulnerability_type', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_findings_type_id', table_name='findings')
+    op.drop_index('ix_findings_severity_id', table_name='findings')
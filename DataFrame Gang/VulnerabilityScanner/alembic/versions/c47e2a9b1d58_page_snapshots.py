@@ -0,0 +1,52 @@
+"""page snapshots for incremental rescans
+
+Revision ID: c47e2a9b1d58
+Revises: 5a0e7c3d9f42
+Create Date: 2026-10-18 12:41:07.219845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e2a9b1d58'
+down_revision: Union[str, Sequence[str], None] = '5a0e7c3d9f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'page_snapshots',
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('host', sa.String(), nullable=False),
+        sa.Column('scan_id', sa.Integer(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('last_modified', sa.String(), nullable=True),
+        sa.Column('body_hash', sa.String(), nullable=True),
+        sa.Column('links', sa.JSON(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['scan_id'], ['scans.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('url'),
+    )
+    op.create_index('ix_page_snapshots_host', 'page_snapshots', ['host'], unique=False)
+    op.create_index('ix_page_snapshots_scan_id', 'page_snapshots', ['scan_id'], unique=False)
+
+    # Columna nullable: ADD COLUMN directo, sin recrear la tabla (y sin perder
+    # los triggers del resumen en SQLite)
+    op.add_column('findings', sa.Column('page_url', sa.String(), nullable=True))
+    op.create_index('ix_findings_scan_page_url', 'findings', ['scan_id', 'page_url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_findings_scan_page_url', table_name='findings')
+    # DROP COLUMN directo (SQLite >= 3.35) para conservar los triggers
+    op.drop_column('findings', 'page_url')
+    op.drop_index('ix_page_snapshots_scan_id', table_name='page_snapshots')
+    op.drop_index('ix_page_snapshots_host', table_name='page_snapshots')
+    op.drop_table('page_snapshots')
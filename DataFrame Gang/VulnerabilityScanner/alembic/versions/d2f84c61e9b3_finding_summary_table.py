@@ -0,0 +1,111 @@
+"""finding summary table maintained by triggers
+
+Revision ID: d2f84c61e9b3
+Revises: b91d5e0f3a27
+Create Date: 2026-10-18 11:26:18.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f84c61e9b3'
+down_revision: Union[str, Sequence[str], None] = 'b91d5e0f3a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_HOST = """
+    CASE WHEN instr(substr({url}, instr({url}, '://') + 3), '/') > 0
+         THEN substr(substr({url}, instr({url}, '://') + 3), 1,
+                     instr(substr({url}, instr({url}, '://') + 3), '/') - 1)
+         ELSE substr({url}, instr({url}, '://') + 3)
+    END
+"""
+
+POSTGRES_HOST = "split_part(split_part({url}, '://', 2), '/', 1)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'finding_summary',
+        sa.Column('severity', sa.String(), nullable=False),
+        sa.Column('vulnerability_type', sa.String(), nullable=False),
+        sa.Column('host', sa.String(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('severity', 'vulnerability_type', 'host'),
+    )
+
+    dialect = op.get_bind().dialect.name
+    host = SQLITE_HOST if dialect == 'sqlite' else POSTGRES_HOST
+
+    # Rellena el resumen con los hallazgos existentes
+    op.execute(
+        "INSERT INTO finding_summary (severity, vulnerability_type, host, total) "
+        f"SELECT severity, vulnerability_type, {host.format(url='url')}, COUNT(*) "
+        "FROM findings GROUP BY 1, 2, 3"
+    )
+
+    if dialect == 'sqlite':
+        op.execute(f"""
+            CREATE TRIGGER trg_finding_summary_insert
+            AFTER INSERT ON findings
+            BEGIN
+                INSERT INTO finding_summary (severity, vulnerability_type, host, total)
+                VALUES (NEW.severity, NEW.vulnerability_type, {host.format(url='NEW.url')}, 1)
+                ON CONFLICT (severity, vulnerability_type, host) DO UPDATE SET total = total + 1;
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_finding_summary_delete
+            AFTER DELETE ON findings
+            BEGIN
+                UPDATE finding_summary SET total = total - 1
+                WHERE severity = OLD.severity
+                  AND vulnerability_type = OLD.vulnerability_type
+                  AND host = {host.format(url='OLD.url')};
+                DELETE FROM finding_summary WHERE total <= 0;
+            END
+        """)
+    elif dialect == 'postgresql':
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION finding_summary_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO finding_summary (severity, vulnerability_type, host, total)
+                    VALUES (NEW.severity, NEW.vulnerability_type, {host.format(url='NEW.url')}, 1)
+                    ON CONFLICT (severity, vulnerability_type, host)
+                    DO UPDATE SET total = finding_summary.total + 1;
+                    RETURN NEW;
+                END IF;
+
+                UPDATE finding_summary SET total = total - 1
+                WHERE severity = OLD.severity
+                  AND vulnerability_type = OLD.vulnerability_type
+                  AND host = {host.format(url='OLD.url')};
+                DELETE FROM finding_summary WHERE total <= 0;
+                RETURN OLD;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER trg_finding_summary
+            AFTER INSERT OR DELETE ON findings
+            FOR EACH ROW EXECUTE FUNCTION finding_summary_sync()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS trg_finding_summary_insert")
+        op.execute("DROP TRIGGER IF EXISTS trg_finding_summary_delete")
+    elif dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS trg_finding_summary ON findings")
+        op.execute("DROP FUNCTION IF EXISTS finding_summary_sync()")
+    op.drop_table('finding_summary')
@@ -0,0 +1,69 @@
+"""unique findings without scan (COALESCE(scan_id, 0))
+
+Revision ID: e6a1f9c3b742
+Revises: c47e2a9b1d58
+Create Date: 2026-10-18 16:07:21.583194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a1f9c3b742'
+down_revision: Union[str, Sequence[str], None] = 'c47e2a9b1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _batch_findings(dialect):
+    """
+    batch_alter_table sobre findings. En SQLite el batch recrea la tabla y se
+    pierden sus triggers (los del resumen): se guardan antes y se restauran.
+    """
+    triggers = []
+    if dialect == 'sqlite':
+        triggers = op.get_bind().execute(sa.text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'findings'"
+        )).all()
+        for name, _ in triggers:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    return op.batch_alter_table('findings'), [sql for _, sql in triggers]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    # Con scan_id NULL la restricción UNIQUE nunca saltaba: se eliminan los
+    # duplicados sin escaneo conservando el más antiguo (con los triggers aún
+    # activos, para que el resumen se actualice)
+    op.execute(
+        "DELETE FROM findings WHERE scan_id IS NULL AND id NOT IN ("
+        "SELECT MIN(id) FROM findings WHERE scan_id IS NULL GROUP BY url, vulnerability_type)"
+    )
+
+    batch, triggers = _batch_findings(dialect)
+    with batch as batch_op:
+        batch_op.drop_constraint('uq_findings_scan_url_type', type_='unique')
+    for sql in triggers:
+        op.execute(sql)
+
+    op.create_index(
+        'uq_findings_scan_url_type', 'findings',
+        [sa.text('COALESCE(scan_id, 0)'), 'url', 'vulnerability_type'], unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    op.drop_index('uq_findings_scan_url_type', table_name='findings')
+
+    batch, triggers = _batch_findings(dialect)
+    with batch as batch_op:
+        batch_op.create_unique_constraint('uq_findings_scan_url_type', ['scan_id', 'url', 'vulnerability_type'])
+    for sql in triggers:
+        op.execute(sql)
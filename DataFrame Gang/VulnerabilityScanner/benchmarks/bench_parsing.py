@@ -0,0 +1,85 @@
+"""
+Benchmark del análisis HTML del pipeline: páginas/segundo antes y después.
+
+"Antes" reproduce el comportamiento original, donde cada uno de los tres
+checks que leen formularios construía su propio BeautifulSoup con
+html.parser. "Después" usa parse_page(), que analiza la página una sola vez.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_parsing.py --pages 300 --forms 3 --filler 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scanner"))
+
+from scanner_project.parsing import parse_page  # noqa: E402
+
+
+def generar_pagina(n, forms, filler):
+    """Genera una página HTML sintética con formularios y contenido de relleno."""
+    partes = [
+        "<html><head><title>Página %d</title>" % n,
+        '<meta name="generator" content="WordPress 6.4">',
+        "</head><body>",
+    ]
+    for i in range(filler):
+        partes.append(f'<div class="row"><p>Texto de relleno {i}</p><a href="/p/{n}/{i}">enlace</a></div>')
+    for f in range(forms):
+        partes.append(
+            f'<form action="/buscar/{f}" method="post">'
+            f'<input type="text" name="q{f}"><input type="email" name="correo">'
+            f'<input type="hidden" name="pagina" value="{n}">'
+            f'<input type="submit" value="Enviar"></form>'
+        )
+    partes.append("</body></html>")
+    return "".join(partes).encode("utf-8")
+
+
+def analisis_original(body):
+    """Tres pasadas con html.parser, como hacían los checks originales."""
+    for _ in range(3):
+        soup = BeautifulSoup(body, "html.parser")
+        for form in soup.find_all("form"):
+            for inp in form.find_all("input"):
+                inp.get("name")
+
+
+def analisis_compartido(body):
+    page = parse_page(body)
+    for form in page.forms:
+        for inp in form.inputs:
+            inp.name
+
+
+def medir(funcion, paginas):
+    inicio = time.perf_counter()
+    for body in paginas:
+        funcion(body)
+    return len(paginas) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--forms", type=int, default=3)
+    parser.add_argument("--filler", type=int, default=200)
+    args = parser.parse_args()
+
+    paginas = [generar_pagina(n, args.forms, args.filler) for n in range(args.pages)]
+
+    antes = medir(analisis_original, paginas)
+    despues = medir(analisis_compartido, paginas)
+
+    print(f"Páginas: {args.pages}  formularios/página: {args.forms}  bloques de relleno: {args.filler}")
+    print(f"Antes   (3x html.parser): {antes:10.1f} páginas/s")
+    print(f"Después (parse_page):     {despues:10.1f} páginas/s")
+    print(f"Aceleración:              {despues / antes:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Benchmark de extremo a extremo: site_spider + VulnAnalysisPipeline.
+
+Levanta el sitio sintético de mock_target.py en otro proceso, lanza el
+rastreo real de Scrapy contra él (con una base SQLite temporal) y muestra:
+
+- páginas/s y requests de checks activos emitidos,
+- hallazgos/s y hallazgos por tipo frente a los esperados,
+- latencia de escritura en la BD (media y máxima por volcado),
+- pico de memoria del proceso del escáner.
+
+Con --rescan se vuelve a escanear el mismo sitio sobre la misma BD para
+medir el reescaneo incremental (--change-every N modifica una de cada N
+páginas entre los dos escaneos).
+
+Cada rastreo se ejecuta en un proceso aparte: el reactor de Twisted no se
+puede arrancar dos veces en el mismo proceso.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_scan.py --pages 500 --fanout 4 --forms 2 --vuln-every 10
+    python benchmarks/bench_scan.py --pages 500 --rescan --change-every 20
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "scanner"))
+sys.path.insert(0, str(RAIZ / "benchmarks"))
+
+from mock_target import MockTarget, SiteConfig  # noqa: E402
+
+
+def peak_memory_mb():
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def run_crawl(start_url, extra_settings):
+    from scrapy import signals
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "scanner_project.settings")
+    settings = get_project_settings()
+    settings.setdict({
+        "ROBOTSTXT_OBEY": False,
+        "DEPTH_LIMIT": 0,
+        "LOG_LEVEL": "ERROR",
+        "TELNETCONSOLE_ENABLED": False,
+        **extra_settings,
+    }, priority="cmdline")
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler("site_spider")
+    # Última respuesta de una página rastreada (no de un check activo): fin del rastreo pasivo
+    last_page = {}
+
+    def response_received(response, request, spider):
+        if request.callback in (None, spider.parse):
+            last_page["at"] = time.perf_counter()
+
+    crawler.signals.connect(response_received, signal=signals.response_received)
+    process.crawl(crawler, start_url=start_url)
+    start = time.perf_counter()
+    process.start()
+    end = time.perf_counter()
+    return (end - start, last_page.get("at", end) - start, crawler.stats.get_stats(),
+            crawler.spider.scan_id, peak_memory_mb())
+
+
+def run_crawl_in_subprocess(start_url, extra_settings):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_crawl, start_url, extra_settings).result()
+
+
+def report(config, elapsed, passive_elapsed, stats, scan_id, peak_memory):
+    from sqlalchemy import func, select
+    from dashboard.queries import check_timings
+    from database.database import engine
+    from database.models import Finding
+
+    with engine.connect() as conn:
+        by_type = dict(conn.execute(
+            select(Finding.vulnerability_type, func.count())
+            .where(Finding.scan_id == scan_id)
+            .group_by(Finding.vulnerability_type)
+        ).all())
+    total_findings = sum(by_type.values())
+
+    pages = stats.get("item_scraped_count", 0)
+    active = stats.get("active_checks/requests/sqli", 0) + stats.get("active_checks/requests/xss", 0)
+    flushes = stats.get("findings_writer/flushes", 0)
+    flush_seconds = stats.get("findings_writer/flush_seconds", 0.0)
+
+    print(f"\nTiempo total:               {elapsed:.2f} s")
+    print(f"Páginas rastreadas:         {pages} ({pages / elapsed:.1f} páginas/s)")
+    print(f"Páginas casi duplicadas:    {stats.get('dedup/near_duplicate_pages', 0)} (sin analizar)")
+    print(f"Páginas sin cambios:        {stats.get('incremental/unchanged_pages', 0)} "
+          f"({stats.get('incremental/not_modified', 0)} con 304, "
+          f"{stats.get('findings_writer/findings_carried_forward', 0)} hallazgos copiados)")
+    print(f"Rastreo pasivo completo en: {passive_elapsed:.2f} s")
+    print(f"Requests de checks activos: {active} "
+          f"(SQLi {stats.get('active_checks/requests/sqli', 0)}, XSS {stats.get('active_checks/requests/xss', 0)})")
+    print(f"Requests totales:           {stats.get('downloader/request_count', 0)}")
+    print(f"Bytes descargados:          {stats.get('downloader/response_bytes', 0) / 1024:.0f} KB")
+    print(f"Hallazgos:                  {total_findings} ({total_findings / elapsed:.1f} hallazgos/s)")
+    if flushes:
+        print(f"Escritura en BD:            {flushes} volcados, media {flush_seconds / flushes * 1000:.2f} ms, "
+              f"máx {stats.get('findings_writer/flush_seconds_max', 0.0) * 1000:.2f} ms")
+    print(f"Respuestas 503:             {stats.get('downloader/response_status_count/503', 0)}")
+    print(f"Checks activos: backoffs    {stats.get('active_checks/backoffs', 0)}, "
+          f"cola máx {stats.get('active_checks/queue_max', 0)}")
+    print(f"Pico de memoria:            {peak_memory:.1f} MB")
+
+    print(f"\n{'Check':<20} {'Llamadas':>10} {'Tiempo (s)':>11} {'ms/llamada':>11} {'Hallazgos':>10}")
+    for timing in check_timings(stats):
+        print(f"{timing['name']:<20} {timing['calls']:>10} {timing['seconds']:>11.3f} "
+              f"{timing['ms_per_call']:>11.3f} {timing['findings']:>10}")
+
+    print(f"\n{'Tipo':<40} {'Esperados':>10} {'Obtenidos':>10}")
+    for vuln_type, expected in config.expected_findings().items():
+        found = by_type.get(vuln_type, 0)
+        marca = "" if found == expected else "  <-- difiere"
+        print(f"{vuln_type:<40} {expected:>10} {found:>10}{marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--forms", type=int, default=1, help="Formularios propios por página")
+    parser.add_argument("--vuln-every", type=int, default=10,
+                        help="Uno de cada N formularios es XSS y el siguiente SQLi")
+    parser.add_argument("--no-shared-form", action="store_true", help="Sin buscador común a todas las páginas")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia simulada del objetivo (s)")
+    parser.add_argument("--capacity", type=int, default=0,
+                        help="Requests simultáneos que atiende el objetivo; el resto recibe 503 (0 = sin límite)")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="Enlaces repetidos con parámetros de seguimiento y vistas de impresión")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Desactiva la URL canónica y el descarte de páginas casi duplicadas")
+    parser.add_argument("--rescan", action="store_true", help="Segundo escaneo incremental del mismo sitio")
+    parser.add_argument("--change-every", type=int, default=0,
+                        help="Con --rescan, una de cada N páginas cambia entre escaneos")
+    parser.add_argument("--no-validators", action="store_true",
+                        help="El sitio no envía ETag/Last-Modified (solo se compara el hash del cuerpo)")
+    parser.add_argument("--disable-check", action="append", default=[], metavar="NOMBRE",
+                        help="Desactiva un check (ver scanner_project/checks/); se puede repetir")
+    parser.add_argument("--concurrent-requests", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-scan-")
+    # La configuración de la BD se lee al importar database.database (también
+    # en los procesos de los rastreos, que heredan el entorno)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    from database.database import engine
+    from database.models import Base
+
+    Base.metadata.create_all(engine)
+
+    config = SiteConfig(pages=args.pages, fanout=args.fanout, forms=args.forms,
+                        vuln_every=args.vuln_every, shared_form=not args.no_shared_form,
+                        latency=args.latency, capacity=args.capacity, duplicates=args.duplicates,
+                        validators=not args.no_validators, change_every=args.change_every)
+    extra_settings = {
+        "CONCURRENT_REQUESTS": args.concurrent_requests,
+        "FINDINGS_BATCH_SIZE": args.batch_size,
+        "CHECKS_DISABLED": args.disable_check,
+    }
+    if args.no_dedup:
+        extra_settings.update({"URL_STRIP_PARAMS": [], "DEDUP_NEAR_DUPLICATES": False})
+
+    with MockTarget(config) as target:
+        print(f"Sitio sintético: {target.url} ({config.pages} páginas, fan-out {config.fanout}, "
+              f"{config.forms} formularios/página)")
+        port = target.port
+        result = run_crawl_in_subprocess(f"{target.url}page/0", extra_settings)
+    report(config, *result)
+
+    if args.rescan:
+        # Mismo host y puerto: las instantáneas del primer escaneo se buscan por host
+        config = replace(config, revision=1)
+        with MockTarget(config, port=port) as target:
+            print(f"\n--- Reescaneo de {target.url} ---")
+            result = run_crawl_in_subprocess(f"{target.url}page/0", extra_settings)
+        report(config, *result)
+
+if __name__ == "__main__":
+    main()
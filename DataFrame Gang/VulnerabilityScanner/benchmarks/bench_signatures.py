@@ -0,0 +1,67 @@
+"""
+Benchmark del motor de firmas frente al bucle original de `in`.
+
+Mide el tiempo por página al crecer el número de firmas: el bucle original
+decodifica y pasa a minúsculas el cuerpo y luego prueba cada firma; el
+SignatureEngine recorre los bytes una sola vez con una regex combinada.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_signatures.py --pages 200 --sizes 9 100 1000 5000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scanner"))
+
+from scanner_project.signatures import SignatureEngine  # noqa: E402
+
+
+def generar_firmas(n):
+    return [{"pattern": f"firma-de-prueba-{i:05d} v{i % 7}.{i % 13}", "label": f"Software {i}"} for i in range(n)]
+
+
+def generar_pagina(n):
+    relleno = "".join(f"<div><p>Contenido {i} de la página {n}</p></div>" for i in range(300))
+    return f"<html><body>{relleno}<footer>Powered by Nada</footer></body></html>".encode("utf-8")
+
+
+def bucle_original(patrones, paginas):
+    for body in paginas:
+        texto = body.decode("utf-8", errors="ignore").lower()
+        for patron in patrones:
+            if patron in texto:
+                break
+
+
+def motor(engine, paginas):
+    for body in paginas:
+        engine.search(body)
+
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    paginas = [generar_pagina(n) for n in range(args.pages)]
+    print(f"{'Firmas':>8} {'Original (ms/pág)':>20} {'Motor (ms/pág)':>16}")
+    for n in args.sizes:
+        firmas = generar_firmas(n)
+        patrones = [f["pattern"].lower() for f in firmas]
+        engine = SignatureEngine(firmas)
+        original = medir(bucle_original, patrones, paginas) / args.pages * 1000
+        compilado = medir(motor, engine, paginas) / args.pages * 1000
+        print(f"{n:>8} {original:>20.3f} {compilado:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
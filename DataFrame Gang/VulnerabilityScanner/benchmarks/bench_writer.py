@@ -0,0 +1,115 @@
+"""
+Benchmark de escritura de hallazgos bajo un rastreo sintético.
+
+Simula N páginas a las que les faltan las cuatro cabeceras de seguridad y
+compara el camino original (una sesión, un SELECT y un COMMIT por hallazgo)
+con FindingWriter (cola en memoria + INSERT ... ON CONFLICT DO NOTHING en lote).
+Cada página se "visita" dos veces para ejercitar la deduplicación.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_writer.py --pages 10000 --legacy-pages 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "scanner"))
+
+from database.models import Base, Finding  # noqa: E402
+from scanner_project.writer import FindingWriter  # noqa: E402
+
+CABECERAS = {
+    'X-Frame-Options': 'Baja',
+    'Content-Security-Policy': 'Media',
+    'Strict-Transport-Security': 'Baja',
+    'X-Content-Type-Options': 'Baja',
+}
+
+
+def hallazgos_sinteticos(pages):
+    for visita in range(2):
+        for n in range(pages):
+            url = f"http://objetivo.local/pagina/{n}"
+            for cabecera, severidad in CABECERAS.items():
+                yield (url, 200, 'Cabecera de Seguridad Faltante', severidad,
+                       f"La cabecera de seguridad '{cabecera}' no está presente.")
+
+
+def nuevo_engine(directorio, nombre):
+    engine = create_engine(f"sqlite:///{os.path.join(directorio, nombre)}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def escritura_original(engine, pages):
+    """Reproduce el save_finding original: SELECT + INSERT + COMMIT por hallazgo."""
+    Session = sessionmaker(bind=engine)
+    total = 0
+    for url, status, tipo, severidad, detalles in hallazgos_sinteticos(pages):
+        total += 1
+        session = Session()
+        try:
+            existe = session.query(Finding).filter_by(url=url, vulnerability_type=tipo).first()
+            if existe:
+                continue
+            session.add(Finding(url=url, http_status=status, vulnerability_type=tipo,
+                                severity=severidad, details=detalles))
+            session.commit()
+        finally:
+            session.close()
+    return total
+
+
+def escritura_en_lote(engine, pages, batch_size, flush_interval):
+    writer = FindingWriter(engine, batch_size=batch_size, flush_interval=flush_interval)
+    writer.start()
+    total = 0
+    for hallazgo in hallazgos_sinteticos(pages):
+        total += 1
+        writer.add(*hallazgo, scan_id=1)
+    writer.close()
+    return total, writer.stats
+
+
+def contar(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Finding.__table__)).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--legacy-pages", type=int, default=1000,
+                        help="Páginas para el camino original (es mucho más lento)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        engine = nuevo_engine(directorio, "original.db")
+        inicio = time.perf_counter()
+        total = escritura_original(engine, args.legacy_pages)
+        duracion = time.perf_counter() - inicio
+        print(f"Original: {args.legacy_pages} páginas, {total} hallazgos en {duracion:.2f}s "
+              f"-> {total / duracion:10.1f} hallazgos/s, {args.legacy_pages * 2 / duracion:8.1f} páginas/s")
+
+        engine = nuevo_engine(directorio, "lote.db")
+        inicio = time.perf_counter()
+        total, stats = escritura_en_lote(engine, args.pages, args.batch_size, args.flush_interval)
+        duracion = time.perf_counter() - inicio
+        print(f"En lote:  {args.pages} páginas, {total} hallazgos en {duracion:.2f}s "
+              f"-> {total / duracion:10.1f} hallazgos/s, {args.pages * 2 / duracion:8.1f} páginas/s")
+        print(f"          volcados: {stats['flushes']}, filas en BD: {contar(engine)}, "
+              f"latencia media por volcado: {stats['flush_seconds'] / max(stats['flushes'], 1) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
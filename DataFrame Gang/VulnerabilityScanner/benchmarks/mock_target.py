@@ -0,0 +1,256 @@
+"""
+Sitio web sintético para los benchmarks de extremo a extremo.
+
+Genera un árbol de `pages` páginas en el que cada página enlaza a `fanout`
+hijas y contiene `forms` formularios propios (más, opcionalmente, un
+buscador compartido por todas). Uno de cada `vuln_every` formularios refleja
+la entrada sin escapar (XSS) y el siguiente devuelve un error de MySQL si la
+entrada lleva comillas (SQLi); el resto escapa la entrada.
+
+Las páginas no envían cabeceras de seguridad y una de cada diez anuncia
+"Powered by WordPress", así que también disparan los checks pasivos.
+
+Con `duplicates` cada enlace aparece además con parámetros de seguimiento
+(`utm_source`, `sessionid`) y en una "vista de impresión" (`?view=print`)
+que devuelve la misma página, como en una tienda con filtros y facetas. Un
+escaneo que los deduplique bien obtiene los mismos hallazgos que sin ellos.
+
+Las páginas llevan ETag y Last-Modified y responden 304 a las peticiones
+condicionales (salvo con `validators=False`). Con `revision` y
+`change_every` se simula un sitio que cambia entre escaneos: una de cada
+`change_every` páginas incluye el número de revisión.
+
+Para simular un objetivo real se puede añadir latencia a cada respuesta
+(`latency`) y limitar los requests que atiende a la vez (`capacity`): los
+que sobran reciben un 503, como un servidor pequeño saturado.
+
+Uso independiente:
+    python benchmarks/mock_target.py --pages 500 --port 8765
+"""
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hashlib
+import html
+import multiprocessing
+import random
+import threading
+import time
+import urllib.parse
+
+FILLER_WORDS = (
+    "catálogo producto oferta envío cliente pedido tienda precio stock marca modelo color talla "
+    "garantía devolución categoría novedad descuento opinión valoración pago factura cuenta"
+).split()
+
+LAST_MODIFIED = "Mon, 05 Oct 2026 08:00:00 GMT"
+
+SQL_ERROR = "You have an error in your SQL syntax; check the manual that corresponds to your MySQL server version"
+
+
+@dataclass(frozen=True)
+class SiteConfig:
+    pages: int = 500
+    fanout: int = 4
+    forms: int = 1
+    vuln_every: int = 10
+    shared_form: bool = True
+    latency: float = 0.0
+    capacity: int = 0
+    duplicates: bool = False
+    validators: bool = True
+    revision: int = 0
+    change_every: int = 0
+
+    def form_kind(self, page, index):
+        """'xss', 'sqli' o 'safe' para el formulario `index` de la página `page`."""
+        form_id = page * self.forms + index
+        if form_id % self.vuln_every == 0:
+            return "xss"
+        if form_id % self.vuln_every == 1:
+            return "sqli"
+        return "safe"
+
+    def expected_findings(self, sqli_payloads=3):
+        """Hallazgos que debería registrar un escaneo completo del sitio."""
+        # El pipeline deduplica por (url, tipo): una cabecera faltante por página
+        expected = {
+            "Cabecera de Seguridad Faltante": self.pages,
+            "Fuga de Versión de Software": len(range(0, self.pages, 10)),
+            "Formulario sin Token CSRF": self.pages if (self.forms or self.shared_form) else 0,
+            "Cross-Site Scripting (XSS) Reflejado": 0,
+            "Inyección de SQL (SQLi)": 0,
+        }
+        for page in range(self.pages):
+            for index in range(self.forms):
+                kind = self.form_kind(page, index)
+                if kind == "xss":
+                    expected["Cross-Site Scripting (XSS) Reflejado"] += 1
+                elif kind == "sqli":
+                    # Cada payload produce una URL distinta
+                    expected["Inyección de SQL (SQLi)"] += sqli_payloads
+        return expected
+
+
+def render_page(config, page):
+    children = [child for child in range(page * config.fanout + 1, page * config.fanout + config.fanout + 1)
+                if child < config.pages]
+    links = [f'<a href="/page/{child}">Página {child}</a>' for child in children]
+    if config.duplicates:
+        links += [f'<a href="/page/{child}?utm_source=nav&sessionid={page}">Página {child}</a>' for child in children]
+        links += [f'<a href="/page/{child}?view=print&from={page}">Imprimir {child}</a>' for child in children]
+    links.append('<a href="/page/0">Inicio</a>')
+
+    forms = [
+        f'<form action="/form/{page}/{index}" method="get">'
+        f'<input type="text" name="q"><input type="hidden" name="page" value="{page}">'
+        f'<input type="submit" value="Enviar"></form>'
+        for index in range(config.forms)
+    ]
+    if config.shared_form:
+        forms.append('<form action="/search" method="get"><input type="search" name="q"></form>')
+
+    footer = "<footer>Powered by WordPress</footer>" if page % 10 == 0 else "<footer>Sitio de pruebas</footer>"
+    if config.change_every and page % config.change_every == 0:
+        footer += f"<p>Revisión {config.revision}</p>"
+    # Texto distinto en cada página (y estable entre ejecuciones)
+    rng = random.Random(page)
+    body = "".join(f"<p>{' '.join(rng.choices(FILLER_WORDS, k=12))}.</p>" for _ in range(20))
+    return (
+        f"<html><head><title>Página {page}</title></head><body>"
+        f"<nav>{' '.join(links)}</nav>{body}{''.join(forms)}{footer}</body></html>"
+    )
+
+
+def render_form_response(config, page, index, query):
+    value = query.get("q", [""])[0]
+    kind = config.form_kind(page, index)
+    if kind == "xss":
+        return f"<html><body>Resultados para: {value}</body></html>"
+    if kind == "sqli" and ("'" in value or '"' in value):
+        return f"<html><body>{SQL_ERROR}</body></html>"
+    return f"<html><body>Resultados para: {html.escape(value)}</body></html>"
+
+
+def make_handler(config):
+    slots = threading.BoundedSemaphore(config.capacity) if config.capacity else None
+
+    class MockTargetHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, text, validators=False):
+            data = text.encode("utf-8")
+            etag = f'"{hashlib.sha1(data).hexdigest()[:16]}"'
+            if validators and self.headers.get("If-None-Match") == etag:
+                self.server.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            if validators:
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", LAST_MODIFIED)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if slots is not None and not slots.acquire(blocking=False):
+                self.server.overloaded += 1
+                return self._send(503, "<html><body>Servidor saturado</body></html>")
+            try:
+                if config.latency:
+                    time.sleep(config.latency)
+                self._route()
+            finally:
+                if slots is not None:
+                    slots.release()
+
+        def _route(self):
+            parsed = urllib.parse.urlsplit(self.path)
+            parts = [p for p in parsed.path.split("/") if p]
+            query = urllib.parse.parse_qs(parsed.query)
+            try:
+                if not parts:
+                    return self._send(200, render_page(config, 0), config.validators)
+                if parts[0] == "page" and len(parts) == 2 and int(parts[1]) < config.pages:
+                    return self._send(200, render_page(config, int(parts[1])), config.validators)
+                if parts[0] == "form" and len(parts) == 3:
+                    return self._send(200, render_form_response(config, int(parts[1]), int(parts[2]), query))
+                if parts[0] == "search":
+                    value = html.escape(query.get("q", [""])[0])
+                    return self._send(200, f"<html><body>Sin resultados para {value}</body></html>")
+            except ValueError:
+                pass
+            self._send(404, "<html><body>No encontrado</body></html>")
+
+    return MockTargetHandler
+
+
+def serve(config, host="127.0.0.1", port=0, ready=None):
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    server.overloaded = 0
+    server.not_modified = 0
+    if ready is not None:
+        ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class MockTarget:
+    """
+    Arranca el sitio en un proceso aparte (para no competir por el GIL ni
+    contaminar la medida de memoria del escáner).
+    """
+
+    def __init__(self, config, host="127.0.0.1", port=0):
+        self.config = config
+        self.host = host
+        self.port = port
+        self._process = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def __enter__(self):
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=serve, args=(self.config, self.host, self.port, ready), daemon=True
+        )
+        self._process.start()
+        self.port = ready.get(timeout=10)
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--forms", type=int, default=1)
+    parser.add_argument("--vuln-every", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos de espera por respuesta")
+    parser.add_argument("--capacity", type=int, default=0, help="Requests simultáneos atendidos (0 = sin límite)")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="Enlaces repetidos con parámetros de seguimiento y vistas de impresión")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    config = SiteConfig(pages=args.pages, fanout=args.fanout, forms=args.forms, vuln_every=args.vuln_every,
+                        latency=args.latency, capacity=args.capacity, duplicates=args.duplicates)
+    print(f"Sitio de pruebas en http://127.0.0.1:{args.port}/ ({args.pages} páginas)")
+    serve(config, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
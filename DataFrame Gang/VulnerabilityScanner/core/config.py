@@ -9,6 +9,8 @@ class Settings(BaseSettings):
     Configuración de la aplicación leída desde .env
     """
     DATABASE_URL: str
+    # Directorio donde se guardan los hallazgos archivados desde el dashboard
+    ARCHIVE_DIR: str = "data/archive"
 
     model_config = SettingsConfigDict(env_file=env_path)
 
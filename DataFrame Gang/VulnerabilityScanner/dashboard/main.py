@@ -1,10 +1,24 @@
-from fastapi import FastAPI, Depends, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import BackgroundTasks, FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import models
-from database.database import get_db, engine
+from database.database import engine, get_async_db, get_async_engine, get_async_sessionmaker
+from database.export import DEFAULT_BATCH_SIZE, EXPORT_FORMATS, ExportEncoder, export_query
+from database.maintenance import ARCHIVE_WRITERS, archive_findings, delete_findings_chunked, delete_scan_chunked
+from dashboard.queries import (
+    check_timings, findings_page_query, findings_since_query, paginate, summary_stats, MAX_PAGE_SIZE,
+)
+from dashboard.schemas import CheckTiming, FindingOut, FindingPage, FindingStats, MaintenanceJob, ScanOut
+import asyncio
+import datetime
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 models.Base.metadata.create_all(bind=engine)
 
@@ -13,27 +27,239 @@ app = FastAPI(title="VulnScanner Dashboard")
 app.mount("/static", StaticFiles(directory="dashboard/static"), name="static")
 templates = Jinja2Templates(directory="dashboard/templates")
 
+# Feed en directo: cada conexión consulta la BD cada STREAM_POLL_SECONDS y,
+# si no hay hallazgos nuevos, envía un comentario cada STREAM_HEARTBEAT_SECONDS
+# para que los proxies no cierren la conexión
+STREAM_POLL_SECONDS = 1.0
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+# Tareas de mantenimiento en curso o terminadas (en memoria, por proceso)
+maintenance_jobs = {}
+_job_ids = itertools.count(1)
+
+def _new_job(action, scan_id):
+    job = MaintenanceJob(
+        id=next(_job_ids), action=action, scan_id=scan_id, status="running",
+        started_at=datetime.datetime.now(datetime.timezone.utc),
+    )
+    maintenance_jobs[job.id] = job
+    return job
+
+def _run_job(job, func, *args, **kwargs):
+    """Ejecuta una tarea de mantenimiento y guarda su resultado en el job."""
+    try:
+        result = func(*args, **kwargs)
+        if job.action == "archive":
+            job.path, job.archived, job.deleted = result
+        else:
+            job.deleted = result
+        job.status = "finished"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        logger.error(f"Error en la tarea de mantenimiento {job.id}: {e}", exc_info=True)
+    finally:
+        job.finished_at = datetime.datetime.now(datetime.timezone.utc)
+
 @app.get("/", response_class=HTMLResponse)
-def read_root(request: Request, db: Session = Depends(get_db)):
+def read_root(request: Request):
+    """
+    Ruta principal del dashboard. Los hallazgos se cargan por páginas
+    desde /api/findings.
+    """
+    return templates.TemplateResponse(request, "dashboard.html", {
+        "page_size": 50,
+    })
+
+@app.get("/api/findings", response_model=FindingPage)
+async def list_findings(
+    severity: str | None = None,
+    vulnerability_type: str | None = None,
+    url_prefix: str | None = None,
+    scan_id: int | None = None,
+    cursor: int | None = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Devuelve una página de hallazgos, del más reciente al más antiguo.
+    Para la siguiente página se pasa `cursor=next_cursor`.
     """
-    Ruta principal del dashboard con todos los hallazgos.
+    query = findings_page_query(severity, vulnerability_type, url_prefix, cursor, limit, scan_id=scan_id)
+    rows = (await db.scalars(query)).all()
+    items, next_cursor = paginate(rows, limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/api/findings/export")
+async def export_findings(
+    format: str = "csv",
+    gzip: bool = False,
+    severity: str | None = None,
+    vulnerability_type: str | None = None,
+    url_prefix: str | None = None,
+    scan_id: int | None = None,
+):
     """
-    findings = db.query(models.Finding).order_by(models.Finding.timestamp.desc()).all()
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request,
-        "findings": findings
+    Descarga en CSV, JSONL o SARIF (opcionalmente con gzip) los hallazgos que
+    cumplen los filtros. Se leen con un cursor de servidor y se envían lote a
+    lote, así que la memoria no crece con el tamaño de la tabla.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato no soportado: {format}")
+    encoder = ExportEncoder(format, compress=gzip)
+    query = export_query(scan_id, severity, vulnerability_type, url_prefix).execution_options(
+        yield_per=DEFAULT_BATCH_SIZE
+    )
+
+    async def chunks():
+        yield encoder.start()
+        async with get_async_engine().connect() as conn:
+            result = await conn.stream(query)
+            async for rows in result.mappings().partitions():
+                yield encoder.rows(rows)
+        yield encoder.end()
+
+    scope = f"scan{scan_id}" if scan_id is not None else "all"
+    filename = f"findings-{scope}{encoder.extension}"
+    return StreamingResponse(chunks(), media_type=encoder.media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
     })
 
+async def _new_findings(after_id, filters):
+    """Hallazgos posteriores al cursor, ya serializados."""
+    async with get_async_sessionmaker()() as db:
+        if after_id is None:
+            # Sin cursor el feed empieza en el hallazgo más reciente
+            return await db.scalar(select(func.max(models.Finding.id))) or 0, []
+        rows = (await db.scalars(findings_since_query(after_id, **filters))).all()
+        return after_id, [(row.id, FindingOut.model_validate(row).model_dump_json()) for row in rows]
+
+@app.get("/api/findings/stream")
+async def stream_findings(
+    request: Request,
+    after_id: int | None = None,
+    severity: str | None = None,
+    vulnerability_type: str | None = None,
+    url_prefix: str | None = None,
+    scan_id: int | None = None,
+):
+    """
+    Feed en directo (server-sent events) de los hallazgos que el escáner va
+    guardando, con los mismos filtros que /api/findings. Cada evento lleva
+    como id el del hallazgo: el cursor es `after_id` o, al reconectar, la
+    cabecera Last-Event-ID que envía el navegador.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        after_id = int(last_event_id)
+    filters = {"severity": severity, "vulnerability_type": vulnerability_type,
+               "url_prefix": url_prefix, "scan_id": scan_id}
+
+    async def events():
+        cursor = after_id
+        last_sent = time.monotonic()
+        yield f"retry: {int(STREAM_POLL_SECONDS * 1000)}\n\n"
+        while not await request.is_disconnected():
+            cursor, findings = await _new_findings(cursor, filters)
+            for finding_id, data in findings:
+                yield f"id: {finding_id}\nevent: finding\ndata: {data}\n\n"
+                cursor = finding_id
+            if findings:
+                last_sent = time.monotonic()
+                # Lote completo: puede haber más esperando, se sigue sin pausa
+                if len(findings) == MAX_PAGE_SIZE:
+                    continue
+            elif time.monotonic() - last_sent >= STREAM_HEARTBEAT_SECONDS:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+@app.get("/api/scans", response_model=list[ScanOut])
+async def list_scans(limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE), db: AsyncSession = Depends(get_async_db)):
+    """Escaneos registrados, del más reciente al más antiguo."""
+    return (await db.scalars(select(models.Scan).order_by(models.Scan.id.desc()).limit(limit))).all()
+
+@app.get("/api/scans/{scan_id}/checks", response_model=list[CheckTiming])
+async def list_scan_checks(scan_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Rendimiento de cada check en un escaneo, del más lento al más rápido.
+    Las estadísticas se guardan al terminar el escaneo.
+    """
+    scan = await db.get(models.Scan, scan_id)
+    if scan is None:
+        raise HTTPException(status_code=404, detail=f"No existe el escaneo #{scan_id}")
+    return check_timings(scan.stats, scan.settings)
+
+@app.get("/stats", response_model=FindingStats)
+async def read_stats(
+    scan_id: int | None = None,
+    host: str | None = None,
+    severity: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Contadores de hallazgos por severidad, tipo y host. Se leen de la tabla
+    de resumen, así que no dependen del tamaño de `findings`.
+    """
+    query = select(models.FindingSummary)
+    if scan_id is not None:
+        query = query.where(models.FindingSummary.scan_id == scan_id)
+    if host:
+        query = query.where(models.FindingSummary.host == host)
+    if severity:
+        query = query.where(models.FindingSummary.severity == severity)
+    return summary_stats((await db.scalars(query)).all())
+
 @app.post("/clear-findings", response_class=RedirectResponse)
-def clear_findings(db: Session = Depends(get_db)):
+def clear_findings(background_tasks: BackgroundTasks, scan_id: int | None = None):
     """
-    Elimina todos los hallazgos de la base de datos.
+    Elimina los hallazgos de un escaneo (y el escaneo) o, si no se indica
+    ninguno, todos los hallazgos de la base de datos. El borrado se hace por
+    lotes en segundo plano, así que el dashboard sigue respondiendo.
     """
-    try:
-        db.query(models.Finding).delete()
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        print(f"Error al borrar los hallazgos: {e}")
-    
+    job = _new_job("delete", scan_id)
+    if scan_id is not None:
+        background_tasks.add_task(_run_job, job, delete_scan_chunked, scan_id)
+    else:
+        background_tasks.add_task(_run_job, job, delete_findings_chunked)
+
     return RedirectResponse(url="/", status_code=303)
+
+@app.post("/archive-findings", response_model=MaintenanceJob, status_code=202)
+def archive(
+    background_tasks: BackgroundTasks,
+    scan_id: int | None = None,
+    older_than_days: int | None = Query(None, ge=0),
+    format: str = "jsonl",
+):
+    """
+    Archiva en un fichero comprimido (JSONL o Parquet) los hallazgos que
+    cumplen los filtros y después los borra, todo en segundo plano. El estado
+    se consulta en /api/maintenance/{id}.
+    """
+    if format not in ARCHIVE_WRITERS:
+        raise HTTPException(status_code=400, detail=f"Formato no soportado: {format}")
+    older_than = None
+    if older_than_days is not None:
+        older_than = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=older_than_days)
+
+    job = _new_job("archive", scan_id)
+    background_tasks.add_task(_run_job, job, archive_findings, scan_id=scan_id, older_than=older_than, fmt=format)
+    return job
+
+@app.get("/api/maintenance", response_model=list[MaintenanceJob])
+def list_maintenance_jobs():
+    """Tareas de borrado y archivado, de la más reciente a la más antigua."""
+    return sorted(maintenance_jobs.values(), key=lambda job: job.id, reverse=True)
+
+@app.get("/api/maintenance/{job_id}", response_model=MaintenanceJob)
+def read_maintenance_job(job_id: int):
+    job = maintenance_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+    return job
@@ -0,0 +1,90 @@
+from sqlalchemy import select
+from database import models
+from database.queries import filter_findings
+
+MAX_PAGE_SIZE = 500
+
+
+def findings_page_query(severity=None, vulnerability_type=None, url_prefix=None, cursor=None, limit=50,
+                        scan_id=None):
+    """
+    Consulta de una página de hallazgos con paginación por clave.
+
+    Se ordena por id descendente (orden de inserción, el más reciente
+    primero) y el cursor es el último id devuelto, de modo que cada página
+    cuesta lo mismo sin importar su profundidad. El prefijo de URL se
+    traduce a un rango para aprovechar el índice sobre `url`.
+    """
+    Finding = models.Finding
+    query = filter_findings(select(Finding), severity, vulnerability_type, url_prefix, scan_id)
+    if cursor is not None:
+        query = query.where(Finding.id < cursor)
+
+    # Se pide un registro extra para saber si existe una página siguiente
+    return query.order_by(Finding.id.desc()).limit(min(limit, MAX_PAGE_SIZE) + 1)
+
+
+def findings_since_query(after_id, severity=None, vulnerability_type=None, url_prefix=None, scan_id=None,
+                         limit=MAX_PAGE_SIZE):
+    """
+    Hallazgos posteriores a `after_id`, del más antiguo al más reciente. Es
+    la consulta del feed en directo: el cursor avanza por la clave primaria,
+    así que cada sondeo solo lee las filas nuevas.
+    """
+    Finding = models.Finding
+    query = filter_findings(select(Finding), severity, vulnerability_type, url_prefix, scan_id)
+    return query.where(Finding.id > after_id).order_by(Finding.id).limit(min(limit, MAX_PAGE_SIZE))
+
+
+def paginate(rows, limit):
+    """Separa el registro extra y calcula el cursor de la página siguiente."""
+    limit = min(limit, MAX_PAGE_SIZE)
+    items = rows[:limit]
+    next_cursor = items[-1].id if len(rows) > limit else None
+    return items, next_cursor
+
+
+def summary_stats(rows):
+    """Agrega las filas de finding_summary en los contadores del dashboard."""
+    stats = {"total": 0, "by_severity": {}, "by_type": {}, "by_host": {}, "groups": rows}
+    for row in rows:
+        stats["total"] += row.total
+        for key, value in (("by_severity", row.severity), ("by_type", row.vulnerability_type), ("by_host", row.host)):
+            stats[key][value] = stats[key].get(value, 0) + row.total
+    return stats
+
+
+def check_timings(stats, settings=None):
+    """
+    Rendimiento por check a partir de las estadísticas guardadas del escaneo
+    (claves `checks/<nombre>/<métrica>` y `active_checks/requests/<nombre>`).
+    """
+    checks = {}
+    for key, value in (stats or {}).items():
+        parts = key.split("/")
+        if len(parts) == 3 and parts[0] == "checks":
+            checks.setdefault(parts[1], {})[parts[2]] = value
+        elif len(parts) == 3 and key.startswith("active_checks/requests/"):
+            checks.setdefault(parts[2], {})["requests"] = value
+
+    disabled = (settings or {}).get("CHECKS_DISABLED") or []
+    if isinstance(disabled, str):
+        disabled = [name.strip() for name in disabled.split(",") if name.strip()]
+    for name in disabled:
+        checks.setdefault(name, {})["disabled"] = True
+
+    timings = []
+    for name, values in checks.items():
+        calls = values.get("calls", 0)
+        seconds = float(values.get("seconds", 0.0))
+        timings.append({
+            "name": name,
+            "calls": calls,
+            "seconds": seconds,
+            "ms_per_call": seconds * 1000 / calls if calls else 0.0,
+            "findings": values.get("findings", 0),
+            "errors": values.get("errors", 0),
+            "requests": values.get("requests", 0),
+            "disabled": values.get("disabled", False),
+        })
+    return sorted(timings, key=lambda timing: timing["seconds"], reverse=True)
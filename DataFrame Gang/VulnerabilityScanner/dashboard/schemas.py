@@ -0,0 +1,81 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+
+class ScanOut(BaseModel):
+    """Escaneo registrado por el spider o por run-scan.sh."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    target: str
+    status: str
+    started_at: datetime | None
+    finished_at: datetime | None
+    settings: dict | None
+    stats: dict | None
+
+
+class MaintenanceJob(BaseModel):
+    """Tarea de borrado o archivado lanzada desde el dashboard."""
+    id: int
+    action: str
+    scan_id: int | None
+    status: str
+    started_at: datetime
+    finished_at: datetime | None = None
+    archived: int = 0
+    deleted: int = 0
+    path: str | None = None
+    error: str | None = None
+
+
+class FindingOut(BaseModel):
+    """Hallazgo tal y como lo expone la API del dashboard."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    scan_id: int | None
+    url: str
+    http_status: int | None
+    vulnerability_type: str
+    severity: str
+    details: str
+    timestamp: datetime | None
+
+
+class FindingPage(BaseModel):
+    """Página de hallazgos. `next_cursor` es None cuando no hay más resultados."""
+    items: list[FindingOut]
+    next_cursor: int | None
+
+
+class SummaryGroup(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    scan_id: int
+    severity: str
+    vulnerability_type: str
+    host: str
+    total: int
+
+
+class FindingStats(BaseModel):
+    """Contadores del dashboard, calculados desde la tabla finding_summary."""
+    total: int
+    by_severity: dict[str, int]
+    by_type: dict[str, int]
+    by_host: dict[str, int]
+    groups: list[SummaryGroup]
+
+
+class CheckTiming(BaseModel):
+    """Tiempo, llamadas y hallazgos de un check en un escaneo."""
+    name: str
+    calls: int
+    seconds: float
+    ms_per_call: float
+    findings: int
+    errors: int
+    # Requests lanzados (solo checks activos)
+    requests: int
+    disabled: bool
@@ -0,0 +1,247 @@
+// Carga perezosa de hallazgos desde /api/findings (paginación por cursor) y
+// feed en directo de los nuevos desde /api/findings/stream (server-sent events).
+(function () {
+    const body = document.getElementById('findings-body');
+    const emptyRow = document.getElementById('findings-empty');
+    const loadMore = document.getElementById('load-more');
+    const filters = document.getElementById('filters');
+    const scanSelect = document.getElementById('scan-select');
+    const clearForm = document.getElementById('clear-form');
+    const archiveButton = document.getElementById('archive-findings');
+    const exportFormat = document.getElementById('export-format');
+    const exportButton = document.getElementById('export-findings');
+    const checkTimings = document.getElementById('check-timings');
+    const checkTimingsBody = document.getElementById('check-timings-body');
+
+    let nextCursor = null;
+    let loading = false;
+    // Hallazgo más reciente mostrado: cursor del feed en directo
+    let newestId = null;
+    let liveFeed = null;
+
+    function formatDate(value) {
+        if (!value) return '';
+        return value.replace('T', ' ').slice(0, 19);
+    }
+
+    function cell(text) {
+        const td = document.createElement('td');
+        td.textContent = text === null || text === undefined ? '' : text;
+        return td;
+    }
+
+    function renderRow(finding) {
+        const tr = document.createElement('tr');
+        tr.className = 'severity-' + finding.severity.toLowerCase();
+
+        const urlCell = document.createElement('td');
+        const link = document.createElement('a');
+        link.href = finding.url;
+        link.target = '_blank';
+        link.textContent = finding.url;
+        urlCell.appendChild(link);
+
+        const severityCell = document.createElement('td');
+        const badge = document.createElement('span');
+        badge.className = 'badge';
+        badge.textContent = finding.severity;
+        severityCell.appendChild(badge);
+
+        tr.append(
+            cell(formatDate(finding.timestamp)),
+            urlCell,
+            cell(finding.http_status),
+            cell(finding.vulnerability_type),
+            severityCell,
+            cell(finding.details)
+        );
+        return tr;
+    }
+
+    function currentParams() {
+        const params = new URLSearchParams();
+        for (const [key, value] of new FormData(filters)) {
+            if (value) params.set(key, value);
+        }
+        params.set('limit', window.FINDINGS_PAGE_SIZE || 50);
+        return params;
+    }
+
+    async function loadPage(reset) {
+        if (loading) return;
+        loading = true;
+
+        if (reset) {
+            stopLiveFeed();
+            nextCursor = null;
+            body.querySelectorAll('tr:not(#findings-empty)').forEach((tr) => tr.remove());
+        }
+
+        const params = currentParams();
+        if (nextCursor !== null) params.set('cursor', nextCursor);
+
+        try {
+            const response = await fetch('/api/findings?' + params.toString());
+            const page = await response.json();
+            page.items.forEach((finding) => body.appendChild(renderRow(finding)));
+            nextCursor = page.next_cursor;
+
+            emptyRow.hidden = body.querySelectorAll('tr:not(#findings-empty)').length > 0;
+            loadMore.hidden = nextCursor === null;
+            if (reset) {
+                newestId = page.items.length ? page.items[0].id : null;
+                startLiveFeed();
+            }
+        } finally {
+            loading = false;
+        }
+    }
+
+    // Los hallazgos nuevos llegan por SSE y se insertan arriba sin recargar la
+    // tabla. Si se corta la conexión, el navegador reconecta solo y el
+    // servidor sigue desde el último id recibido (Last-Event-ID).
+    function startLiveFeed() {
+        const params = currentParams();
+        params.delete('limit');
+        if (newestId !== null) params.set('after_id', newestId);
+        liveFeed = new EventSource('/api/findings/stream?' + params.toString());
+        liveFeed.addEventListener('finding', (event) => {
+            const finding = JSON.parse(event.data);
+            if (newestId !== null && finding.id <= newestId) return;
+            newestId = finding.id;
+            body.insertBefore(renderRow(finding), body.firstChild);
+            emptyRow.hidden = true;
+            countFinding(finding);
+        });
+    }
+
+    function stopLiveFeed() {
+        if (liveFeed !== null) {
+            liveFeed.close();
+            liveFeed = null;
+        }
+    }
+
+    // Los contadores son del escaneo seleccionado: con otros filtros activos
+    // el feed no trae todos sus hallazgos y se dejan como están
+    function countFinding(finding) {
+        const params = currentParams();
+        if (params.has('severity') || params.has('vulnerability_type') || params.has('url_prefix')) return;
+        const total = document.querySelector('[data-key="total"]');
+        total.textContent = (Number(total.textContent) || 0) + 1;
+        const severity = document.querySelector('[data-severity="' + finding.severity + '"]');
+        if (severity) severity.textContent = (Number(severity.textContent) || 0) + 1;
+    }
+
+    async function loadScans() {
+        const response = await fetch('/api/scans');
+        const scans = await response.json();
+        scans.forEach((scan) => {
+            const option = document.createElement('option');
+            option.value = scan.id;
+            option.textContent = '#' + scan.id + ' ' + scan.target + ' (' + scan.status + ')';
+            scanSelect.appendChild(option);
+        });
+    }
+
+    async function loadCounters() {
+        const params = new URLSearchParams();
+        if (scanSelect.value) params.set('scan_id', scanSelect.value);
+        const response = await fetch('/stats?' + params.toString());
+        const stats = await response.json();
+        document.querySelector('[data-key="total"]').textContent = stats.total;
+        document.querySelectorAll('[data-severity]').forEach((el) => {
+            el.textContent = stats.by_severity[el.dataset.severity] || 0;
+        });
+    }
+
+    // Tiempo y hallazgos de cada check, solo con un escaneo seleccionado
+    async function loadCheckTimings() {
+        checkTimingsBody.replaceChildren();
+        checkTimings.hidden = true;
+        if (!scanSelect.value) return;
+        const response = await fetch('/api/scans/' + scanSelect.value + '/checks');
+        if (!response.ok) return;
+        const timings = await response.json();
+        timings.forEach((timing) => {
+            const tr = document.createElement('tr');
+            if (timing.disabled) tr.className = 'check-disabled';
+            tr.append(
+                cell(timing.disabled ? timing.name + ' (desactivado)' : timing.name),
+                cell(timing.calls),
+                cell(timing.seconds.toFixed(3)),
+                cell(timing.ms_per_call.toFixed(2)),
+                cell(timing.requests),
+                cell(timing.findings),
+                cell(timing.errors)
+            );
+            checkTimingsBody.appendChild(tr);
+        });
+        checkTimings.hidden = timings.length === 0;
+    }
+
+    filters.addEventListener('submit', (event) => {
+        event.preventDefault();
+        loadCounters();
+        loadPage(true);
+    });
+    scanSelect.addEventListener('change', () => {
+        // "Limpiar Hallazgos" actúa sobre el escaneo seleccionado
+        clearForm.dataset.scanId = scanSelect.value;
+        clearForm.action = scanSelect.value ? '/clear-findings?scan_id=' + scanSelect.value : '/clear-findings';
+        loadCounters();
+        loadCheckTimings();
+        loadPage(true);
+    });
+    loadMore.addEventListener('click', () => loadPage(false));
+
+    // Archivado en segundo plano: se consulta el estado hasta que termina
+    async function watchJob(job) {
+        while (job.status === 'running') {
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            const response = await fetch('/api/maintenance/' + job.id);
+            job = await response.json();
+        }
+        if (job.status === 'failed') {
+            alert('Error al archivar: ' + job.error);
+        } else {
+            alert('Archivados ' + job.archived + ' hallazgos en ' + (job.path || '(nada que archivar)'));
+        }
+        loadCounters();
+        loadPage(true);
+    }
+
+    archiveButton.addEventListener('click', async () => {
+        const scope = scanSelect.value ? 'el escaneo seleccionado' : 'todos los hallazgos';
+        if (!confirm('¿Archivar ' + scope + '? Se guardarán comprimidos y se borrarán de la base de datos.')) return;
+        const params = new URLSearchParams();
+        if (scanSelect.value) params.set('scan_id', scanSelect.value);
+        archiveButton.disabled = true;
+        try {
+            const response = await fetch('/archive-findings?' + params.toString(), { method: 'POST' });
+            await watchJob(await response.json());
+        } finally {
+            archiveButton.disabled = false;
+        }
+    });
+
+    // Exportación con los filtros aplicados; el navegador descarga el fichero
+    // a medida que llega
+    exportButton.addEventListener('click', () => {
+        const params = currentParams();
+        params.delete('limit');
+        params.set('format', exportFormat.value);
+        window.location = '/api/findings/export?' + params.toString();
+    });
+
+    // Carga automática de la siguiente página al llegar al final de la tabla
+    new IntersectionObserver((entries) => {
+        if (entries.some((entry) => entry.isIntersecting) && nextCursor !== null) {
+            loadPage(false);
+        }
+    }).observe(loadMore);
+
+    loadScans();
+    loadCounters();
+    loadPage(true);
+})();
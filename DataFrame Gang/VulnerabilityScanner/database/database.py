@@ -1,11 +1,65 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
+import functools
+
+# Driver asíncrono para cada base de datos (ver get_async_engine)
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
 
 engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
 
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    Activa WAL en SQLite: los lectores (dashboard) no se bloquean mientras el
+    escáner o un borrado masivo escriben. busy_timeout evita errores
+    "database is locked" cuando coinciden dos escritores. SQLite no aplica
+    las claves foráneas (ni sus ON DELETE CASCADE) si no se activan en cada
+    conexión.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _configure_sqlite)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url):
+    """La misma URL de DATABASE_URL con el driver asíncrono (aiosqlite o asyncpg)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No hay driver asíncrono configurado para {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+@functools.cache
+def get_async_engine():
+    """
+    Motor asíncrono para el dashboard. Se crea al primer uso para que el
+    escáner, que solo usa el motor síncrono, no necesite aiosqlite/asyncpg.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_engine = create_async_engine(async_database_url(settings.DATABASE_URL))
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", _configure_sqlite)
+    return async_engine
+
+@functools.cache
+def get_async_sessionmaker():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    # Sin expirar al hacer commit: los objetos se serializan después de cerrar la sesión
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
 def get_db():
     """
     Función de dependencia para FastAPI que gestiona la sesión de la base de datos.
@@ -15,3 +69,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Dependencia de FastAPI con una sesión asíncrona: las consultas no ocupan
+    un hilo del pool mientras esperan a la base de datos.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
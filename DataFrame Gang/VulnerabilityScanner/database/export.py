@@ -0,0 +1,234 @@
+"""
+Exportación de hallazgos en CSV, JSONL o SARIF.
+
+Los hallazgos se leen con un cursor de servidor (`stream_results` +
+`yield_per`) y cada lote se convierte en texto y se escribe antes de leer el
+siguiente, así que la memoria no depende del tamaño de la tabla. La salida
+se puede comprimir con gzip sobre la marcha.
+
+El dashboard sirve lo mismo en /api/findings/export (ver dashboard/main.py).
+
+Uso desde la línea de comandos:
+    python -m database.export --format csv --scan-id 3 -o hallazgos.csv
+    python -m database.export --format sarif --gzip -o hallazgos.sarif.gz
+    python -m database.export --format jsonl --severity Alta > altas.jsonl
+    python -m database.export --format csv --url-prefix https://app.example/admin/
+"""
+from sqlalchemy import select
+from database.database import engine as default_engine
+from database.maintenance import ARCHIVE_COLUMNS
+from database.models import Finding
+from database.queries import filter_findings
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+import unicodedata
+import zlib
+
+DEFAULT_BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = ARCHIVE_COLUMNS
+
+# wbits para que zlib escriba cabecera y cola de gzip
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"Alta": "error", "Media": "warning", "Baja": "note"}
+
+
+def export_query(scan_id=None, severity=None, vulnerability_type=None, url_prefix=None):
+    """Columnas exportadas de los hallazgos que cumplen los filtros del dashboard, por id."""
+    columns = [getattr(Finding, name) for name in EXPORT_COLUMNS]
+    query = filter_findings(select(*columns), severity, vulnerability_type, url_prefix, scan_id)
+    return query.order_by(Finding.id)
+
+
+def iter_batches(query, engine=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Filas de la consulta en lotes de `batch_size`, sin cargar el resultado entero."""
+    engine = engine or default_engine
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        yield from result.mappings().partitions()
+
+
+class CsvFormat:
+    media_type = "text/csv"
+    extension = ".csv"
+
+    def start(self):
+        return self._write([EXPORT_COLUMNS])
+
+    def rows(self, rows):
+        return self._write([row[name] for name in EXPORT_COLUMNS] for row in rows)
+
+    def end(self):
+        return ""
+
+    def _write(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+
+class JsonlFormat:
+    media_type = "application/x-ndjson"
+    extension = ".jsonl"
+
+    def start(self):
+        return ""
+
+    def rows(self, rows):
+        return "".join(
+            json.dumps({name: row[name] for name in EXPORT_COLUMNS}, default=str, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    def end(self):
+        return ""
+
+
+class SarifFormat:
+    """
+    Un único run de SARIF 2.1.0 con un resultado por hallazgo y una regla por
+    tipo de vulnerabilidad. Las reglas se escriben al final (el orden de las
+    claves de un objeto JSON no importa), así que solo se guardan en memoria
+    los tipos vistos, no los hallazgos.
+    """
+    media_type = "application/sarif+json"
+    extension = ".sarif"
+
+    def __init__(self):
+        self.rules = {}
+        self.first = True
+
+    def start(self):
+        return f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [{{"results": ['
+
+    def rows(self, rows):
+        parts = []
+        for row in rows:
+            parts.append(("" if self.first else ",") + "\n" + json.dumps(self._result(row), default=str, ensure_ascii=False))
+            self.first = False
+        return "".join(parts)
+
+    def end(self):
+        rules = [
+            {"id": rule_id, "name": vulnerability_type, "shortDescription": {"text": vulnerability_type}}
+            for vulnerability_type, rule_id in self.rules.items()
+        ]
+        tool = {"driver": {"name": "VulnScanner", "rules": rules}}
+        return f'\n], "tool": {json.dumps(tool, ensure_ascii=False)}}}]}}\n'
+
+    def _result(self, row):
+        rule_id = self._rule_id(row["vulnerability_type"])
+        return {
+            "ruleId": rule_id,
+            "level": SARIF_LEVELS.get(row["severity"], "warning"),
+            "message": {"text": row["details"]},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": row["url"]}}}],
+            "properties": {
+                "findingId": row["id"],
+                "scanId": row["scan_id"],
+                "severity": row["severity"],
+                "httpStatus": row["http_status"],
+                "pageUrl": row["page_url"],
+                "timestamp": row["timestamp"],
+            },
+        }
+
+    def _rule_id(self, vulnerability_type):
+        """Id de regla estable por tipo: 'Inyección de SQL (SQLi)' -> 'inyeccion-de-sql-sqli'."""
+        if vulnerability_type not in self.rules:
+            ascii_name = unicodedata.normalize("NFKD", vulnerability_type).encode("ascii", "ignore").decode()
+            rule_id = re.sub(r"[^a-z0-9]+", "-", ascii_name.lower()).strip("-") or "hallazgo"
+            taken = set(self.rules.values())
+            while rule_id in taken:
+                rule_id += "-"
+            self.rules[vulnerability_type] = rule_id
+        return self.rules[vulnerability_type]
+
+
+EXPORT_FORMATS = {
+    "csv": CsvFormat,
+    "jsonl": JsonlFormat,
+    "sarif": SarifFormat,
+}
+
+
+class ExportEncoder:
+    """
+    Convierte los lotes de filas en bytes del formato elegido, comprimidos
+    con gzip si se pide. Sirve tanto para escribir un fichero como para una
+    respuesta HTTP en streaming.
+    """
+
+    def __init__(self, fmt, compress=False):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Formato de exportación no soportado: {fmt}")
+        self.format = EXPORT_FORMATS[fmt]()
+        self.compressor = zlib.compressobj(wbits=GZIP_WBITS) if compress else None
+
+    @property
+    def media_type(self):
+        return "application/gzip" if self.compressor else self.format.media_type
+
+    @property
+    def extension(self):
+        return self.format.extension + (".gz" if self.compressor else "")
+
+    def start(self):
+        return self._encode(self.format.start())
+
+    def rows(self, rows):
+        return self._encode(self.format.rows(rows))
+
+    def end(self):
+        data = self._encode(self.format.end())
+        if self.compressor:
+            data += self.compressor.flush()
+        return data
+
+    def _encode(self, text):
+        data = text.encode("utf-8")
+        return self.compressor.compress(data) if self.compressor else data
+
+
+def export_findings(out, fmt="csv", compress=False, engine=None, batch_size=DEFAULT_BATCH_SIZE, **filters):
+    """Escribe en `out` (binario) los hallazgos que cumplen los filtros. Devuelve cuántos."""
+    encoder = ExportEncoder(fmt, compress)
+    written = 0
+    out.write(encoder.start())
+    for rows in iter_batches(export_query(**filters), engine, batch_size):
+        out.write(encoder.rows(rows))
+        written += len(rows)
+    out.write(encoder.end())
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--scan-id", type=int)
+    parser.add_argument("--severity")
+    parser.add_argument("--vulnerability-type")
+    parser.add_argument("--url-prefix", help="Solo las URL que empiezan por este prefijo")
+    parser.add_argument("--gzip", action="store_true", help="Comprime la salida con gzip")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("-o", "--output", help="Fichero de salida (por defecto, la salida estándar)")
+    args = parser.parse_args()
+
+    filters = {"scan_id": args.scan_id, "severity": args.severity, "vulnerability_type": args.vulnerability_type,
+               "url_prefix": args.url_prefix}
+    if args.output:
+        with open(args.output, "wb") as out:
+            written = export_findings(out, args.format, args.gzip, batch_size=args.batch_size, **filters)
+        print(f"Exportados {written} hallazgos en {args.output}", file=sys.stderr)
+    else:
+        export_findings(sys.stdout.buffer, args.format, args.gzip, batch_size=args.batch_size, **filters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Borrado por lotes y archivado de hallazgos.
+
+Borrar una tabla grande con un único DELETE mantiene bloqueada la base de
+datos (en SQLite, el fichero entero) hasta que termina. Aquí se borra por
+lotes de ids, con una transacción corta por lote, para que el dashboard y el
+escáner puedan seguir leyendo y escribiendo entre medias.
+
+El archivado vuelca primero los hallazgos a un fichero comprimido (JSONL con
+gzip o Parquet) y solo cuando el fichero está cerrado borra las filas
+archivadas. Parquet necesita pyarrow, que se instala con el extra opcional
+`parquet` (`poetry install -E parquet` o `pip install ".[parquet]"`).
+
+Uso desde la línea de comandos:
+    python -m database.maintenance delete [--scan-id N] [--older-than-days D]
+    python -m database.maintenance archive [--scan-id N] [--older-than-days D] [--format parquet]
+"""
+from sqlalchemy import delete, func, select
+from database.database import engine as default_engine
+from database.models import Finding, PageSnapshot, Scan
+from core.config import settings
+import argparse
+import datetime
+import gzip
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+# Pausa entre lotes para dejar pasar a otros escritores
+DEFAULT_PAUSE = 0.01
+
+ARCHIVE_COLUMNS = [
+    "id", "scan_id", "url", "http_status", "vulnerability_type", "severity", "details", "timestamp", "page_url",
+]
+
+
+def _conditions(scan_id=None, older_than=None, max_id=None):
+    conditions = []
+    if scan_id is not None:
+        conditions.append(Finding.scan_id == scan_id)
+    if older_than is not None:
+        conditions.append(Finding.timestamp < older_than)
+    if max_id is not None:
+        conditions.append(Finding.id <= max_id)
+    return conditions
+
+
+def delete_findings_chunked(engine=None, scan_id=None, older_than=None, max_id=None,
+                            chunk_size=DEFAULT_CHUNK_SIZE, pause=DEFAULT_PAUSE):
+    """
+    Borra los hallazgos que cumplen los filtros en lotes de `chunk_size`,
+    confirmando cada lote por separado. Devuelve el número de filas borradas.
+    """
+    engine = engine or default_engine
+    conditions = _conditions(scan_id, older_than, max_id)
+    deleted = 0
+
+    while True:
+        with engine.begin() as conn:
+            ids = conn.scalars(
+                select(Finding.id).where(*conditions).order_by(Finding.id).limit(chunk_size)
+            ).all()
+            if not ids:
+                break
+            conn.execute(delete(Finding).where(Finding.id.in_(ids)))
+        deleted += len(ids)
+        logger.debug(f"Borrados {deleted} hallazgos")
+        if pause:
+            time.sleep(pause)
+
+    if deleted:
+        _invalidate_snapshots(engine, scan_id)
+    return deleted
+
+
+def _invalidate_snapshots(engine, scan_id=None):
+    """
+    Las instantáneas de página (database/pages.py) apuntan a los hallazgos de
+    su escaneo: si se borran, el próximo reescaneo debe analizar esas páginas
+    de nuevo. Sin escaneo concreto se descartan todas.
+    """
+    statement = delete(PageSnapshot)
+    if scan_id is not None:
+        statement = statement.where(PageSnapshot.scan_id == scan_id)
+    with engine.begin() as conn:
+        conn.execute(statement)
+
+
+def delete_scan_chunked(scan_id, engine=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Borra por lotes los hallazgos de un escaneo y después el escaneo."""
+    engine = engine or default_engine
+    deleted = delete_findings_chunked(engine, scan_id=scan_id, chunk_size=chunk_size)
+    with engine.begin() as conn:
+        conn.execute(delete(Scan).where(Scan.id == scan_id))
+    return deleted
+
+
+def _iter_chunks(engine, conditions, chunk_size):
+    """Recorre los hallazgos por clave (id ascendente), un lote por transacción."""
+    last_id = 0
+    columns = [getattr(Finding, name) for name in ARCHIVE_COLUMNS]
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(*columns).where(Finding.id > last_id, *conditions).order_by(Finding.id).limit(chunk_size)
+            ).mappings().all()
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        yield rows
+
+
+def _write_jsonl(path, chunks):
+    written = 0
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for rows in chunks:
+            for row in rows:
+                f.write(json.dumps(dict(row), default=str, ensure_ascii=False))
+                f.write("\n")
+            written += len(rows)
+    return written
+
+
+def _write_parquet(path, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("El archivado en Parquet necesita pyarrow (poetry install -E parquet)") from e
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("scan_id", pa.int64()),
+        ("url", pa.string()),
+        ("http_status", pa.int64()),
+        ("vulnerability_type", pa.string()),
+        ("severity", pa.string()),
+        ("details", pa.string()),
+        ("timestamp", pa.string()),
+        ("page_url", pa.string()),
+    ])
+    written = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for rows in chunks:
+            columns = {name: [row[name] for row in rows] for name in ARCHIVE_COLUMNS}
+            columns["timestamp"] = [str(t) if t is not None else None for t in columns["timestamp"]]
+            writer.write_table(pa.table(columns, schema=schema))
+            written += len(rows)
+    return written
+
+
+ARCHIVE_WRITERS = {
+    "jsonl": (".jsonl.gz", _write_jsonl),
+    "parquet": (".parquet", _write_parquet),
+}
+
+
+def archive_findings(engine=None, scan_id=None, older_than=None, fmt="jsonl", archive_dir=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, pause=DEFAULT_PAUSE):
+    """
+    Vuelca a un fichero los hallazgos que cumplen los filtros y después los
+    borra por lotes. Los hallazgos que llegan durante el archivado no se
+    tocan: solo se borra hasta el mayor id existente al empezar.
+
+    Devuelve (ruta_del_fichero, filas_archivadas, filas_borradas).
+    """
+    if fmt not in ARCHIVE_WRITERS:
+        raise ValueError(f"Formato de archivo no soportado: {fmt}")
+    engine = engine or default_engine
+    archive_dir = archive_dir or settings.ARCHIVE_DIR
+
+    with engine.connect() as conn:
+        max_id = conn.scalar(select(func.max(Finding.id)).where(*_conditions(scan_id, older_than)))
+    if max_id is None:
+        return None, 0, 0
+
+    conditions = _conditions(scan_id, older_than, max_id)
+    suffix, write = ARCHIVE_WRITERS[fmt]
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    scope = f"scan{scan_id}" if scan_id is not None else "all"
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"findings-{scope}-{stamp}{suffix}")
+
+    archived = write(path, _iter_chunks(engine, conditions, chunk_size))
+    logger.info(f"Archivados {archived} hallazgos en {path}")
+
+    deleted = delete_findings_chunked(engine, scan_id=scan_id, older_than=older_than, max_id=max_id,
+                                      chunk_size=chunk_size, pause=pause)
+    return path, archived, deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Borrado y archivado de hallazgos")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in ("delete", "archive"):
+        sub = subparsers.add_parser(name)
+        sub.add_argument("--scan-id", type=int)
+        sub.add_argument("--older-than-days", type=int)
+        sub.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        if name == "archive":
+            sub.add_argument("--format", choices=sorted(ARCHIVE_WRITERS), default="jsonl")
+            sub.add_argument("--archive-dir")
+
+    args = parser.parse_args()
+    older_than = None
+    if args.older_than_days is not None:
+        older_than = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=args.older_than_days)
+
+    if args.command == "delete":
+        deleted = delete_findings_chunked(scan_id=args.scan_id, older_than=older_than, chunk_size=args.chunk_size)
+        print(f"Borrados {deleted} hallazgos")
+    else:
+        path, archived, deleted = archive_findings(
+            scan_id=args.scan_id, older_than=older_than, fmt=args.format,
+            archive_dir=args.archive_dir, chunk_size=args.chunk_size,
+        )
+        print(f"Archivados {archived} hallazgos en {path}; borrados {deleted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,88 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, event, func, literal_column
 from sqlalchemy.orm import declarative_base
+from database.summary import install_summary_triggers
 import datetime
 
 Base = declarative_base()
 
+class Scan(Base):
+    """Ejecución de un escaneo sobre un objetivo."""
+    __tablename__ = "scans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    target = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False, default="running")
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    settings = Column(JSON, nullable=True)
+    stats = Column(JSON, nullable=True)
+
 class Finding(Base):
     __tablename__ = "findings"
+    __table_args__ = (
+        # Paginación por clave (id descendente) filtrando por escaneo, severidad o tipo
+        Index("ix_findings_scan_id_id", "scan_id", "id"),
+        Index("ix_findings_severity_id", "severity", "id"),
+        Index("ix_findings_type_id", "vulnerability_type", "id"),
+        # Copia de los hallazgos de las páginas sin cambios en un reescaneo
+        Index("ix_findings_scan_page_url", "scan_id", "page_url"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    # Nulo para los hallazgos anteriores a la introducción de los escaneos
+    scan_id = Column(Integer, ForeignKey("scans.id", ondelete="CASCADE"), nullable=True)
     url = Column(String, index=True, nullable=False)
     http_status = Column(Integer)
     vulnerability_type = Column(String, index=True, nullable=False)
     severity = Column(String, nullable=False)
     details = Column(String, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Página rastreada que originó el hallazgo (en los checks activos, la del formulario)
+    page_url = Column(String, nullable=True)
+
+
+# Un hallazgo por (escaneo, url, tipo). Los hallazgos sin escaneo cuentan como
+# scan_id = 0, igual que en FindingSummary: con NULL nunca habría conflicto y
+# se duplicarían. Sirve también de objetivo de los ON CONFLICT DO NOTHING.
+FINDING_UNIQUE_KEY = (func.coalesce(Finding.scan_id, literal_column("0")), Finding.url, Finding.vulnerability_type)
+Index("uq_findings_scan_url_type", *FINDING_UNIQUE_KEY, unique=True)
+
+
+class PageSnapshot(Base):
+    """
+    Última versión analizada de cada página: validadores HTTP, hash del
+    cuerpo y enlaces salientes. Permite reescanear solo lo que ha cambiado
+    (ver database/pages.py).
+    """
+    __tablename__ = "page_snapshots"
+
+    url = Column(String, primary_key=True)
+    host = Column(String, nullable=False, index=True)
+    # Escaneo cuyos hallazgos valen para esta versión de la página
+    scan_id = Column(Integer, ForeignKey("scans.id", ondelete="CASCADE"), nullable=False, index=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    body_hash = Column(String, nullable=True)
+    links = Column(JSON, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class FindingSummary(Base):
+    """
+    Conteo de hallazgos por (escaneo, severidad, tipo, host), mantenido por
+    triggers sobre `findings` (ver database/summary.py). Los hallazgos sin
+    escaneo se cuentan con scan_id = 0.
+    """
+    __tablename__ = "finding_summary"
+
+    scan_id = Column(Integer, primary_key=True)
+    severity = Column(String, primary_key=True)
+    vulnerability_type = Column(String, primary_key=True)
+    host = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_summary_triggers(target, connection, **kw):
+    # Cubre las bases creadas con create_all (dashboard, benchmarks) sin Alembic
+    install_summary_triggers(connection)
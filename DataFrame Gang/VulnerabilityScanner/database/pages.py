@@ -0,0 +1,97 @@
+"""
+Instantáneas de páginas para reescaneos incrementales.
+
+De cada página analizada se guarda su ETag, su Last-Modified, el hash del
+cuerpo y sus enlaces. Al reescanear el mismo sitio, el spider pide las
+páginas con cabeceras condicionales: si el servidor responde 304 o el cuerpo
+no ha cambiado, la página no se vuelve a analizar y sus hallazgos del
+escaneo anterior se copian al nuevo.
+
+Solo se usan instantáneas de escaneos terminados (status "finished"): uno
+interrumpido puede no haber completado los checks activos de sus páginas.
+Borrar o archivar hallazgos invalida las instantáneas afectadas (ver
+database/maintenance.py), porque ya no habría nada que copiar.
+"""
+from dataclasses import dataclass
+from sqlalchemy import literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from database.models import FINDING_UNIQUE_KEY, Finding, PageSnapshot, Scan
+import urllib.parse
+
+# Límite de parámetros por IN (...) en cada copia
+CARRY_CHUNK_SIZE = 500
+
+_INSERT_BY_DIALECT = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+FINDING_COPY_COLUMNS = ['url', 'http_status', 'vulnerability_type', 'severity', 'details', 'page_url']
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    url: str
+    scan_id: int
+    etag: str | None
+    last_modified: str | None
+    body_hash: str | None
+    links: tuple
+
+
+def page_host(url):
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+
+def load_snapshots(host, engine=None):
+    """Instantáneas válidas de las páginas de un host, por URL."""
+    if engine is None:
+        # Importación diferida: el escritor (y sus benchmarks, con su propio
+        # motor) usa este módulo sin necesitar DATABASE_URL
+        from database.database import engine
+    query = (
+        select(PageSnapshot.url, PageSnapshot.scan_id, PageSnapshot.etag, PageSnapshot.last_modified,
+               PageSnapshot.body_hash, PageSnapshot.links)
+        .join(Scan, Scan.id == PageSnapshot.scan_id)
+        .where(PageSnapshot.host == host, Scan.status == "finished")
+    )
+    with engine.connect() as conn:
+        return {
+            row.url: Snapshot(row.url, row.scan_id, row.etag, row.last_modified, row.body_hash,
+                              tuple(row.links or ()))
+            for row in conn.execute(query)
+        }
+
+
+def upsert_snapshots(conn, rows):
+    """Inserta o actualiza instantáneas (dicts con las columnas de PageSnapshot)."""
+    if not rows:
+        return
+    insert = _INSERT_BY_DIALECT[conn.dialect.name](PageSnapshot.__table__)
+    statement = insert.on_conflict_do_update(
+        index_elements=['url'],
+        set_={
+            column: insert.excluded[column]
+            for column in ('host', 'scan_id', 'etag', 'last_modified', 'body_hash', 'links')
+        } | {'updated_at': insert.excluded.updated_at},
+    )
+    conn.execute(statement, rows)
+
+
+def carry_forward_findings(conn, from_scan_id, to_scan_id, page_urls):
+    """
+    Copia al escaneo `to_scan_id` los hallazgos que el escaneo `from_scan_id`
+    encontró en esas páginas. Devuelve el número de hallazgos copiados.
+    """
+    insert = _INSERT_BY_DIALECT[conn.dialect.name]
+    page_urls = list(page_urls)
+    copied = 0
+    for start in range(0, len(page_urls), CARRY_CHUNK_SIZE):
+        chunk = page_urls[start:start + CARRY_CHUNK_SIZE]
+        source = select(
+            literal(to_scan_id), *[getattr(Finding, column) for column in FINDING_COPY_COLUMNS]
+        ).where(Finding.scan_id == from_scan_id, Finding.page_url.in_(chunk))
+        statement = insert(Finding.__table__).from_select(['scan_id', *FINDING_COPY_COLUMNS], source)
+        result = conn.execute(statement.on_conflict_do_nothing(index_elements=FINDING_UNIQUE_KEY))
+        copied += max(result.rowcount, 0)
+    return copied
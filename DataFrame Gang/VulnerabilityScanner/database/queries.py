@@ -0,0 +1,27 @@
+"""
+Filtros de hallazgos comunes al dashboard y a la exportación. No depende de
+FastAPI ni del motor, así que sirve igual para consultas síncronas y
+asíncronas.
+"""
+from database.models import Finding
+
+
+def prefix_upper_bound(prefix):
+    """Menor cadena mayor que todas las que empiezan por `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def filter_findings(query, severity=None, vulnerability_type=None, url_prefix=None, scan_id=None):
+    """
+    Aplica los filtros del dashboard a una consulta sobre `findings`. El
+    prefijo de URL se traduce a un rango para aprovechar el índice sobre `url`.
+    """
+    if scan_id is not None:
+        query = query.where(Finding.scan_id == scan_id)
+    if severity:
+        query = query.where(Finding.severity == severity)
+    if vulnerability_type:
+        query = query.where(Finding.vulnerability_type == vulnerability_type)
+    if url_prefix:
+        query = query.where(Finding.url >= url_prefix, Finding.url < prefix_upper_bound(url_prefix))
+    return query
@@ -0,0 +1,79 @@
+"""
+Registro de escaneos.
+
+Uso desde la línea de comandos (lo emplea run-scan.sh):
+    python -m database.scans start <url>              -> imprime el id del escaneo
+    python -m database.scans resume <id>              -> imprime la URL objetivo
+    python -m database.scans finish <id> [--status failed]
+"""
+from database.database import SessionLocal
+from database.models import Scan
+import argparse
+import datetime
+import json
+
+
+def start_scan(target, settings=None):
+    """Registra un escaneo en curso y devuelve su id."""
+    with SessionLocal() as db:
+        scan = Scan(target=target, status="running", settings=settings)
+        db.add(scan)
+        db.commit()
+        return scan.id
+
+
+def resume_scan(scan_id):
+    """Vuelve a marcar un escaneo como en curso y devuelve su objetivo (None si no existe)."""
+    with SessionLocal() as db:
+        scan = db.get(Scan, scan_id)
+        if scan is None:
+            return None
+        scan.status = "running"
+        scan.finished_at = None
+        db.commit()
+        return scan.target
+
+
+def finish_scan(scan_id, status="finished", stats=None):
+    """Marca un escaneo como terminado y guarda sus estadísticas."""
+    with SessionLocal() as db:
+        scan = db.get(Scan, scan_id)
+        if scan is None:
+            return False
+        scan.status = status
+        scan.finished_at = datetime.datetime.now(datetime.timezone.utc)
+        if stats is not None:
+            # Las estadísticas de Scrapy incluyen fechas: se serializan como texto
+            scan.stats = json.loads(json.dumps(stats, default=str))
+        db.commit()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro de escaneos")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    start = subparsers.add_parser("start", help="Registra un escaneo y muestra su id")
+    start.add_argument("target")
+
+    resume = subparsers.add_parser("resume", help="Reabre un escaneo y muestra su objetivo")
+    resume.add_argument("scan_id", type=int)
+
+    finish = subparsers.add_parser("finish", help="Cierra un escaneo")
+    finish.add_argument("scan_id", type=int)
+    finish.add_argument("--status", default="finished")
+
+    args = parser.parse_args()
+    if args.command == "start":
+        print(start_scan(args.target))
+    elif args.command == "resume":
+        target = resume_scan(args.scan_id)
+        if target is None:
+            raise SystemExit(f"No existe el escaneo #{args.scan_id}")
+        print(target)
+    else:
+        finish_scan(args.scan_id, status=args.status)
+
+
+if __name__ == "__main__":
+    main()
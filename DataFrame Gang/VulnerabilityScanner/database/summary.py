@@ -0,0 +1,78 @@
+from sqlalchemy import text
+
+# Host (con puerto) extraído de la URL del hallazgo
+_SQLITE_HOST = """
+    CASE WHEN instr(substr({url}, instr({url}, '://') + 3), '/') > 0
+         THEN substr(substr({url}, instr({url}, '://') + 3), 1,
+                     instr(substr({url}, instr({url}, '://') + 3), '/') - 1)
+         ELSE substr({url}, instr({url}, '://') + 3)
+    END
+"""
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_finding_summary_insert
+    AFTER INSERT ON findings
+    BEGIN
+        INSERT INTO finding_summary (scan_id, severity, vulnerability_type, host, total)
+        VALUES (COALESCE(NEW.scan_id, 0), NEW.severity, NEW.vulnerability_type,
+                {_SQLITE_HOST.format(url='NEW.url')}, 1)
+        ON CONFLICT (scan_id, severity, vulnerability_type, host) DO UPDATE SET total = total + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_finding_summary_delete
+    AFTER DELETE ON findings
+    BEGIN
+        UPDATE finding_summary SET total = total - 1
+        WHERE scan_id = COALESCE(OLD.scan_id, 0)
+          AND severity = OLD.severity
+          AND vulnerability_type = OLD.vulnerability_type
+          AND host = {_SQLITE_HOST.format(url='OLD.url')};
+        DELETE FROM finding_summary WHERE total <= 0;
+    END
+    """,
+]
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION finding_summary_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO finding_summary (scan_id, severity, vulnerability_type, host, total)
+            VALUES (COALESCE(NEW.scan_id, 0), NEW.severity, NEW.vulnerability_type,
+                    split_part(split_part(NEW.url, '://', 2), '/', 1), 1)
+            ON CONFLICT (scan_id, severity, vulnerability_type, host)
+            DO UPDATE SET total = finding_summary.total + 1;
+            RETURN NEW;
+        END IF;
+
+        UPDATE finding_summary SET total = total - 1
+        WHERE scan_id = COALESCE(OLD.scan_id, 0)
+          AND severity = OLD.severity
+          AND vulnerability_type = OLD.vulnerability_type
+          AND host = split_part(split_part(OLD.url, '://', 2), '/', 1);
+        DELETE FROM finding_summary WHERE total <= 0;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_finding_summary ON findings",
+    """
+    CREATE TRIGGER trg_finding_summary
+    AFTER INSERT OR DELETE ON findings
+    FOR EACH ROW EXECUTE FUNCTION finding_summary_sync()
+    """,
+]
+
+_TRIGGERS_BY_DIALECT = {
+    'sqlite': SQLITE_TRIGGERS,
+    'postgresql': POSTGRES_TRIGGERS,
+}
+
+
+def install_summary_triggers(connection):
+    """Crea (de forma idempotente) los triggers que mantienen finding_summary."""
+    for statement in _TRIGGERS_BY_DIALECT.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
@@ -1,18 +1,56 @@
 #!/bin/bash
 
-# Uso: ./run-scan.sh <URL_A_ESCANEAR>
+# Uso: ./run-scan.sh <URL_A_ESCANEAR> [opciones de scrapy]
+#      ./run-scan.sh --resume <ID_DEL_ESCANEO> [opciones de scrapy]
+# Las opciones extra se pasan a `scrapy crawl`, p. ej. -s CHECKS_DISABLED=sqli,xss
 
 if [ -z "$1" ]; then
   echo "❌ Error: Debes proporcionar una URL para escanear."
   echo "Ejemplo: ./run-scan.sh http://testphp.vulnweb.com/"
+  echo "Para reanudar un escaneo interrumpido: ./run-scan.sh --resume <ID>"
   exit 1
 fi
 
-URL_TO_SCAN=$1
+if [ "$1" == "--resume" ]; then
+  SCAN_ID=$2
+  RESUME=1
+  if [ -z "$SCAN_ID" ]; then
+    echo "❌ Error: Debes indicar el id del escaneo a reanudar."
+    exit 1
+  fi
+  URL_TO_SCAN=$(docker-compose exec -T app python -m database.scans resume "$SCAN_ID" | tr -d '\r')
+  if [ -z "$URL_TO_SCAN" ]; then
+    echo "❌ Error: No existe el escaneo #$SCAN_ID."
+    exit 1
+  fi
+  echo "🔁 Reanudando el escaneo #$SCAN_ID sobre: $URL_TO_SCAN"
+  shift 2
+else
+  URL_TO_SCAN=$1
+  shift
+  echo "🚀 Iniciando escaneo de vulnerabilidades para: $URL_TO_SCAN"
 
-echo "🚀 Iniciando escaneo de vulnerabilidades para: $URL_TO_SCAN"
+  # Se registra el escaneo para que sus hallazgos queden agrupados
+  SCAN_ID=$(docker-compose exec -T app python -m database.scans start "$URL_TO_SCAN" | tr -d '\r')
+  if [ -z "$SCAN_ID" ]; then
+    echo "❌ Error: No se pudo registrar el escaneo."
+    exit 1
+  fi
+  echo "🆔 Escaneo #$SCAN_ID"
+fi
+
+# El estado del rastreo se guarda en data/crawls/ para poder reanudarlo con --resume
+SPIDER_ARGS="-a start_url=$URL_TO_SCAN -a scan_id=$SCAN_ID"
+if [ -n "$RESUME" ]; then
+  SPIDER_ARGS="$SPIDER_ARGS -a resume=1"
+fi
+SPIDER_ARGS="$SPIDER_ARGS $*"
 
-docker-compose exec app bash -c "cd /app/scanner && scrapy crawl site_spider -a start_url=$URL_TO_SCAN"
+if ! docker-compose exec app bash -c "cd /app/scanner && scrapy crawl site_spider $SPIDER_ARGS"; then
+  docker-compose exec -T app python -m database.scans finish "$SCAN_ID" --status failed
+  echo "❌ El escaneo #$SCAN_ID ha fallado. Puedes reanudarlo con: ./run-scan.sh --resume $SCAN_ID"
+  exit 1
+fi
 
-echo "✅ ¡Escaneo finalizado!"
+echo "✅ ¡Escaneo #$SCAN_ID finalizado!"
 echo "👉 Navega a http://localhost:8000 para ver los resultados."
@@ -0,0 +1,77 @@
+import logging
+import os
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+class CapturePolicy:
+    """
+    Política de captura de respuestas del spider.
+
+    - Solo se analizan los content types permitidos (el resto se corta en
+      cuanto llegan las cabeceras).
+    - El cuerpo que viaja en el item se limita a `max_body_kb`.
+    - Opcionalmente, los cuerpos que superan el límite se vuelcan completos
+      a un fichero temporal, escribiendo desde un memoryview sin copiarlos.
+    """
+
+    def __init__(self, allowed_content_types, max_body_kb=512, spool_oversized=False, spool_dir=None):
+        self.allowed_content_types = tuple(t.lower() for t in allowed_content_types)
+        self.max_body_bytes = max_body_kb * 1024
+        self.spool_oversized = spool_oversized
+        self._spool_dir = spool_dir
+        self._owns_spool_dir = False
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            allowed_content_types=settings.getlist(
+                'CAPTURE_ALLOWED_CONTENT_TYPES', ['text/html', 'application/xhtml+xml']
+            ),
+            max_body_kb=settings.getint('CAPTURE_MAX_BODY_KB', 512),
+            spool_oversized=settings.getbool('CAPTURE_SPOOL_OVERSIZED', False),
+            spool_dir=settings.get('CAPTURE_SPOOL_DIR'),
+        )
+
+    def allows(self, content_type):
+        """Indica si el content type se analiza. Sin cabecera se asume HTML."""
+        if not content_type:
+            return True
+        if isinstance(content_type, bytes):
+            content_type = content_type.decode('latin-1')
+        mime = content_type.split(';', 1)[0].strip().lower()
+        return mime in self.allowed_content_types
+
+    def capture(self, body):
+        """
+        Devuelve (cuerpo_para_analisis, truncado, ruta_spool). Si el cuerpo no
+        supera el límite se devuelve el mismo objeto, sin copias.
+        """
+        if len(body) <= self.max_body_bytes:
+            return body, False, None
+
+        view = memoryview(body)
+        spool_path = self._spool(view) if self.spool_oversized else None
+        return view[:self.max_body_bytes].tobytes(), True, spool_path
+
+    def _spool(self, view):
+        if self._spool_dir is None:
+            self._spool_dir = tempfile.mkdtemp(prefix='scanner-spool-')
+            self._owns_spool_dir = True
+        os.makedirs(self._spool_dir, exist_ok=True)
+
+        fd, path = tempfile.mkstemp(dir=self._spool_dir, suffix='.body')
+        with os.fdopen(fd, 'wb') as f:
+            for start in range(0, len(view), SPOOL_CHUNK_SIZE):
+                f.write(view[start:start + SPOOL_CHUNK_SIZE])
+        return path
+
+    def cleanup(self):
+        """Elimina el directorio de spool si lo creó la propia política."""
+        if self._owns_spool_dir and self._spool_dir:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+            logger.debug(f"Directorio de spool eliminado: {self._spool_dir}")
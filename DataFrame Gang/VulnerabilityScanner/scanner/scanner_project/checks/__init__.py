@@ -0,0 +1,121 @@
+"""
+Registro de checks del pipeline.
+
+Cada check es una clase registrada con `@register` que declara:
+
+- `name`: identificador corto, usado en las estadísticas (`checks/<name>/...`)
+  y para desactivarlo (`-s CHECKS_DISABLED=xss,sqli`).
+- `kind`: "passive" (analiza la respuesta de una página) o "active" (lanza
+  requests con payloads contra los formularios).
+- `needs`: qué partes de la página usa ("headers", "body", "forms"). El HTML
+  solo se analiza si algún check activo en el escaneo necesita formularios.
+
+Los checks no escriben en la BD: devuelven `FindingResult` y el pipeline
+los guarda, cuenta y cronometra. Se pueden añadir checks propios en
+módulos que se importan con el ajuste CHECK_MODULES.
+"""
+from dataclasses import dataclass
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+PASSIVE = "passive"
+ACTIVE = "active"
+
+CHECK_REGISTRY = {}
+
+
+@dataclass
+class FindingResult:
+    url: str
+    http_status: int | None
+    vulnerability_type: str
+    severity: str
+    details: str
+    # Página que originó el hallazgo, si no es `url` (checks activos)
+    page_url: str | None = None
+
+
+@dataclass
+class PageContext:
+    """Lo que ve un check pasivo de una página rastreada."""
+    url: str
+    status: int
+    headers: object
+    body: bytes
+    # ParsedPage (parsing.py); None si ningún check necesita formularios
+    page: object = None
+
+    @classmethod
+    def from_item(cls, item, page=None):
+        return cls(
+            url=item['url'],
+            status=item['response_status'],
+            headers=item['response_headers'],
+            body=item['response_body'],
+            page=page,
+        )
+
+    @property
+    def forms(self):
+        return self.page.forms if self.page is not None else []
+
+
+class Check:
+    name = None
+    kind = PASSIVE
+    needs = frozenset()
+    description = ""
+
+    def __init__(self, signatures):
+        # Motores de firmas de signatures.json, por categoría
+        self.signatures = signatures
+
+    def run(self, context):
+        """Check pasivo: devuelve o genera FindingResult para la página."""
+        raise NotImplementedError
+
+
+class ActiveCheck(Check):
+    kind = ACTIVE
+    needs = frozenset({"forms"})
+
+    def requests(self, page_url, forms):
+        """
+        Genera (huella, request) para los formularios nuevos de la página.
+        Los requests van sin callback: el pipeline añade el suyo, que
+        cronometra `analyze` y lleva la cuenta de checks pendientes.
+        """
+        raise NotImplementedError
+
+    def analyze(self, response, original_url, form_link="", **kwargs):
+        """Analiza la respuesta a un request del check y devuelve FindingResult."""
+        raise NotImplementedError
+
+
+def register(cls):
+    """Decorador que añade un check al registro."""
+    if not cls.name:
+        raise ValueError(f"El check {cls.__name__} no tiene nombre")
+    CHECK_REGISTRY[cls.name] = cls
+    return cls
+
+
+def load_check_modules(modules):
+    """Importa los módulos de checks propios (ajuste CHECK_MODULES)."""
+    for module in modules:
+        importlib.import_module(module)
+
+
+def build_checks(signatures, disabled=()):
+    """Instancia los checks registrados, salvo los desactivados."""
+    disabled = set(disabled)
+    unknown = disabled - set(CHECK_REGISTRY)
+    if unknown:
+        logger.warning(f"Checks desconocidos en CHECKS_DISABLED: {', '.join(sorted(unknown))}")
+    return [cls(signatures) for name, cls in CHECK_REGISTRY.items() if name not in disabled]
+
+
+# Checks incluidos con el escáner
+from scanner_project.checks import active, passive  # noqa: E402,F401
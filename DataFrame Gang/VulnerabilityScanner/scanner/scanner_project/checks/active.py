@@ -0,0 +1,92 @@
+from scanner_project.checks import ActiveCheck, FindingResult, register
+from scanner_project.forms import resolve_action
+import scrapy
+import urllib.parse
+
+
+def form_request(form, page_url, data):
+    """Request que envía `data` al formulario, sin callback."""
+    action = resolve_action(form, page_url)
+    if form.method == 'POST':
+        return scrapy.FormRequest(action, formdata=data, dont_filter=True)
+    return scrapy.Request(f"{action}?{urllib.parse.urlencode(data)}", dont_filter=True)
+
+
+@register
+class SqlInjection(ActiveCheck):
+    """Inyecta payloads de SQLi y busca errores de base de datos en la respuesta."""
+    name = "sqli"
+    description = "Inyección de SQL basada en errores"
+
+    PAYLOADS = ["' OR 1=1 --", "' OR 'a'='a", '" OR "a"="a']
+
+    def requests(self, page_url, forms):
+        for fingerprint, form in forms:
+            # Extrae campos del formulario
+            if not form.inputs:
+                continue
+
+            for payload in self.PAYLOADS:
+                data = {}
+                for inp in form.inputs:
+                    if inp.name:
+                        # Inyecta payload en campos de texto
+                        if inp.type in ['text', 'search', 'email']:
+                            data[inp.name] = payload
+                        else:
+                            data[inp.name] = inp.value
+                if not data:
+                    continue
+
+                request = form_request(form, page_url, data)
+                request.cb_kwargs['payload'] = payload
+                yield fingerprint, request
+
+    def analyze(self, response, original_url, form_link="", payload=None):
+        # Reporta el primer error encontrado
+        match = self.signatures['sqli_error'].search(response.body)
+        if match:
+            yield FindingResult(
+                response.url,
+                response.status,
+                'Inyección de SQL (SQLi)',
+                'Alta',
+                f"Error SQL detectado: '{match.pattern}' "
+                f"al inyectar payload: '{payload}'. "
+                f"Formulario en: {original_url}"
+                f"{form_link}",
+                page_url=original_url,
+            )
+
+
+@register
+class ReflectedXss(ActiveCheck):
+    """Envía un script a los campos visibles y comprueba si vuelve sin escapar."""
+    name = "xss"
+    description = "XSS reflejado"
+
+    PAYLOAD = "<script>alert('XSS-VULN-TAG')</script>"
+
+    def requests(self, page_url, forms):
+        for fingerprint, form in forms:
+            # Solo inyecta en campos de entrada visibles
+            data = {}
+            for inp in form.inputs:
+                if inp.name and inp.type not in ['hidden', 'submit', 'button']:
+                    data[inp.name] = self.PAYLOAD
+            if not data:
+                continue
+            yield fingerprint, form_request(form, page_url, data)
+
+    def analyze(self, response, original_url, form_link=""):
+        if self.PAYLOAD in response.text:
+            yield FindingResult(
+                response.url,
+                response.status,
+                'Cross-Site Scripting (XSS) Reflejado',
+                'Alta',
+                f"Payload de script reflejado sin escapar. "
+                f"Formulario en: {original_url}"
+                f"{form_link}",
+                page_url=original_url,
+            )
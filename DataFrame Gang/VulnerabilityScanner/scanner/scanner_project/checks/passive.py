@@ -0,0 +1,78 @@
+from scanner_project.checks import Check, FindingResult, register
+
+
+@register
+class MissingSecurityHeaders(Check):
+    """Verifica la presencia de cabeceras de seguridad importantes."""
+    name = "security_headers"
+    needs = frozenset({"headers"})
+    description = "Cabeceras de seguridad ausentes"
+
+    HEADERS = {
+        'X-Frame-Options': 'Baja',
+        'Content-Security-Policy': 'Media',
+        'Strict-Transport-Security': 'Baja',
+        'X-Content-Type-Options': 'Baja',
+    }
+
+    def run(self, context):
+        for header, severity in self.HEADERS.items():
+            # Verifica tanto en bytes como en string
+            if not (context.headers.get(header.encode('utf-8')) or context.headers.get(header)):
+                yield FindingResult(
+                    context.url,
+                    context.status,
+                    'Cabecera de Seguridad Faltante',
+                    severity,
+                    f"La cabecera de seguridad '{header}' no está presente.",
+                )
+
+
+@register
+class SoftwareVersionLeak(Check):
+    """Detecta posibles fugas de versión de software."""
+    name = "version_leak"
+    needs = frozenset({"body"})
+    description = "Versiones de software expuestas en el HTML"
+
+    def run(self, context):
+        # Solo reporta la primera coincidencia
+        match = self.signatures['version_leak'].search(context.body)
+        if match:
+            yield FindingResult(
+                context.url,
+                context.status,
+                'Fuga de Versión de Software',
+                'Baja',
+                f"Se ha detectado una posible versión de {match.label} expuesta.",
+            )
+
+
+@register
+class FormWithoutCsrfToken(Check):
+    """Verifica si los formularios tienen protección CSRF."""
+    name = "csrf_token"
+    needs = frozenset({"forms"})
+    description = "Formularios sin token CSRF"
+
+    def run(self, context):
+        for form in context.forms:
+            # Busca tokens CSRF en inputs ocultos
+            has_csrf = False
+            for inp in form.inputs:
+                if inp.type != 'hidden':
+                    continue
+                name = inp.name.lower() if inp.name else ""
+                if 'csrf' in name or 'token' in name or '_token' in name:
+                    has_csrf = True
+                    break
+
+            if not has_csrf:
+                action = form.action if form.action is not None else 'N/A'
+                yield FindingResult(
+                    context.url,
+                    context.status,
+                    'Formulario sin Token CSRF',
+                    'Media',
+                    f"Formulario sin token CSRF visible. Acción: {action}",
+                )
@@ -0,0 +1,106 @@
+from sqlalchemy.engine import make_url
+from core.config import settings as app_settings
+import hashlib
+import logging
+import os
+import pickle
+
+logger = logging.getLogger(__name__)
+
+
+def url_key(url):
+    """Huella compacta (8 bytes) de una URL para el conjunto de URLs vistas."""
+    return hashlib.sha1(url.encode('utf-8')).digest()[:8]
+
+
+def default_state_dir():
+    """`crawls/` junto al fichero de la BD SQLite (data/crawls en Docker)."""
+    url = make_url(app_settings.DATABASE_URL)
+    if url.get_backend_name() == 'sqlite' and url.database:
+        return os.path.join(os.path.dirname(os.path.abspath(url.database)), 'crawls')
+    return os.path.abspath('crawls')
+
+
+class CrawlState:
+    """
+    Estado de un escaneo que permite reanudarlo si el proceso muere:
+
+    - frontier: URLs programadas y aún no analizadas, con su profundidad.
+    - seen: huellas de las URLs canónicas ya programadas (no se vuelven a pedir).
+    - content_index: SimHash de las páginas analizadas, para descartar las
+      casi duplicadas.
+    - form_cache: formularios atacados y checks activos pendientes.
+    - last_finding_id: último hallazgo volcado a la BD al guardar.
+
+    Se guarda con pickle en un fichero por escaneo, escribiendo primero a un
+    temporal y renombrando, para que un corte a medias no lo corrompa. Para
+    escribir desde otro hilo, dump() copia el estado en el hilo del reactor
+    (el que lo modifica) y write() lo guarda después.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.frontier = {}
+        self.seen = set()
+        self.form_cache = None
+        self.content_index = None
+        self.last_finding_id = None
+
+    @classmethod
+    def for_scan(cls, scan_id, state_dir=None):
+        return cls(os.path.join(state_dir or default_state_dir(), f"scan-{scan_id}.state"))
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        with open(self.path, 'rb') as f:
+            data = pickle.load(f)
+        if 'state' in data:
+            data.update(pickle.loads(data['state']))
+        self.frontier = data['frontier']
+        self.seen = data['seen']
+        self.form_cache = data['form_cache']
+        self.content_index = data.get('content_index')
+        self.last_finding_id = data['last_finding_id']
+        return self
+
+    def save(self):
+        self.write(self.dump(), self.last_finding_id)
+
+    def dump(self):
+        """Copia serializada del estado que cambia durante el rastreo."""
+        return pickle.dumps({
+            'frontier': self.frontier,
+            'seen': self.seen,
+            'form_cache': self.form_cache,
+            'content_index': self.content_index,
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def write(self, state, last_finding_id):
+        """Guarda un estado obtenido con dump(); no toca el estado en memoria."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {'state': state, 'last_finding_id': last_finding_id}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+
+    def schedule(self, url, depth, canonical_url=None):
+        """
+        Añade la URL a la frontera. Devuelve False si ya se había programado
+        (ella o cualquier otra con la misma forma canónica).
+        """
+        key = url_key(canonical_url or url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self.frontier[url] = depth
+        return True
+
+    def done(self, url):
+        self.frontier.pop(url, None)
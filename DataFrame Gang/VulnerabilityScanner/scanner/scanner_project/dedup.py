@@ -0,0 +1,136 @@
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from w3lib.url import canonicalize_url
+import hashlib
+import re
+import urllib.parse
+
+# Parámetros de seguimiento y de sesión que no cambian el contenido de la página
+DEFAULT_STRIP_PARAMS = [
+    'utm_*', 'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+    'sessionid', 'session_id', 'sid', 'phpsessid', 'jsessionid', 'aspsessionid*', 'cfid', 'cftoken',
+]
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Parámetros de sesión incrustados en la ruta: /tienda;jsessionid=ABC123
+PATH_SESSION_RE = re.compile(r';(?:jsessionid|phpsessid|sid)=[^/?#]*', re.IGNORECASE)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class UrlCanonicalizer:
+    """
+    Forma canónica de una URL para decidir si ya se ha rastreado:
+
+    - esquema y host en minúsculas, sin el puerto por defecto,
+    - sin fragmento ni ids de sesión incrustados en la ruta,
+    - sin los parámetros de `strip_params` (admiten comodines: `utm_*`),
+    - con los parámetros restantes ordenados y con escapes normalizados.
+
+    Solo se usa como clave de la frontera: el request se sigue haciendo a la
+    URL tal como aparece en el enlace.
+    """
+
+    def __init__(self, strip_params=None):
+        patterns = DEFAULT_STRIP_PARAMS if strip_params is None else strip_params
+        self.strip_params = [p.lower() for p in patterns]
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(strip_params=settings.getlist('URL_STRIP_PARAMS', DEFAULT_STRIP_PARAMS))
+
+    def _strip(self, name):
+        name = name.lower()
+        return any(fnmatchcase(name, pattern) for pattern in self.strip_params)
+
+    def canonicalize(self, url):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        if parts.port is not None and DEFAULT_PORTS.get(scheme) == parts.port:
+            netloc = netloc.rsplit(':', 1)[0]
+        path = PATH_SESSION_RE.sub('', parts.path)
+        query = [
+            (name, value)
+            for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+            if not self._strip(name)
+        ]
+        url = urllib.parse.urlunsplit((scheme, netloc, path or '/', urllib.parse.urlencode(query), ''))
+        return canonicalize_url(url)
+
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text, shingle_size=3):
+    """
+    SimHash de 64 bits del texto, calculado sobre shingles de `shingle_size`
+    palabras. Textos casi iguales dan huellas a poca distancia de Hamming.
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) > shingle_size:
+        features = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        features = [' '.join(tokens)]
+
+    # Cuenta de unos por posición de bit, recorriendo las columnas de las
+    # representaciones binarias en vez de desplazar bit a bit en Python
+    bits = [format(_token_hash(feature), '064b') for feature in set(features)]
+    threshold = len(bits) / 2
+    fingerprint = 0
+    for column in zip(*bits):
+        fingerprint = (fingerprint << 1) | (column.count('1') > threshold)
+    return fingerprint
+
+
+class SimHashIndex:
+    """
+    Índice de huellas SimHash para encontrar páginas casi duplicadas.
+
+    Divide la huella en `max_distance + 1` bloques: dos huellas a distancia
+    <= max_distance coinciden por fuerza en al menos un bloque, así que solo
+    se comparan las que comparten alguno en vez de todas contra todas.
+
+    Las huellas se agrupan además por `group` (p. ej. la estructura de los
+    formularios de la página): solo se comparan huellas del mismo grupo.
+    """
+
+    def __init__(self, max_distance=3, bits=64):
+        self.max_distance = max_distance
+        self.bits = bits
+        blocks = max_distance + 1
+        width = bits // blocks
+        self._blocks = [
+            (i * width, bits - i * width if i == blocks - 1 else width)
+            for i in range(blocks)
+        ]
+        self._tables = [defaultdict(list) for _ in self._blocks]
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _keys(self, fingerprint, group):
+        return [(group, (fingerprint >> shift) & ((1 << width) - 1)) for shift, width in self._blocks]
+
+    def find(self, fingerprint, group=None):
+        """Devuelve una huella del grupo a distancia <= max_distance, o None."""
+        for table, key in zip(self._tables, self._keys(fingerprint, group)):
+            for candidate in table.get(key, ()):
+                if (candidate ^ fingerprint).bit_count() <= self.max_distance:
+                    return candidate
+        return None
+
+    def add(self, fingerprint, group=None):
+        for table, key in zip(self._tables, self._keys(fingerprint, group)):
+            table[key].append(fingerprint)
+        self.size += 1
+
+    def check_and_add(self, fingerprint, group=None):
+        """Indexa la huella si es nueva. Devuelve True si era un casi duplicado."""
+        if self.find(fingerprint, group) is not None:
+            return True
+        self.add(fingerprint, group)
+        return False
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+import hashlib
+import urllib.parse
+
+
+def resolve_action(form, page_url):
+    """URL absoluta a la que envía el formulario."""
+    return urllib.parse.urljoin(page_url, form.action or '')
+
+
+def form_fingerprint(form, page_url):
+    """
+    Huella de un formulario: acción resuelta, método y los pares
+    (nombre, tipo) de sus inputs ordenados. Dos formularios con la misma
+    huella reciben exactamente los mismos payloads.
+    """
+    inputs = sorted((inp.name or '', inp.type) for inp in form.inputs)
+    canonical = repr((resolve_action(form, page_url), form.method, inputs))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class FormRecord:
+    original_url: str
+    sightings: int = 1
+    # Formulario pendiente de atacar; se descarta al completarse sus checks
+    form: object = None
+    pending_probes: int = 0
+    completed: bool = False
+
+
+class FormCache:
+    """
+    Caché por escaneo de formularios ya atacados. El primer avistamiento de
+    cada huella se ataca; los siguientes solo se enlazan a ese original.
+
+    Se guarda en el estado del escaneo (crawlstate.py), así que al reanudar un
+    escaneo se sabe qué formularios terminaron sus checks activos y cuáles
+    hay que volver a atacar.
+    """
+
+    def __init__(self):
+        self._records = {}
+        self.repeated = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._records
+
+    def get(self, fingerprint):
+        return self._records.get(fingerprint)
+
+    def register(self, fingerprint, page_url, form=None):
+        """Registra un avistamiento. Devuelve True si el formulario es nuevo."""
+        record = self._records.get(fingerprint)
+        if record is None:
+            self._records[fingerprint] = FormRecord(original_url=page_url, form=form)
+            return True
+        record.sightings += 1
+        self.repeated += 1
+        return False
+
+    def probe_scheduled(self, fingerprint):
+        self._records[fingerprint].pending_probes += 1
+
+    def probe_finished(self, fingerprint):
+        """Anota el fin de un check activo; el formulario se completa con el último."""
+        record = self._records.get(fingerprint)
+        if record is None or record.completed:
+            return
+        record.pending_probes = max(0, record.pending_probes - 1)
+        if record.pending_probes == 0:
+            self.mark_completed(fingerprint)
+
+    def mark_completed(self, fingerprint):
+        record = self._records[fingerprint]
+        record.completed = True
+        record.form = None
+
+    def incomplete(self):
+        """(huella, registro) de los formularios cuyos checks no terminaron."""
+        return [(fp, record) for fp, record in self._records.items()
+                if not record.completed and record.form is not None]
@@ -4,4 +4,21 @@ class ScannedItem(scrapy.Item):
     url = scrapy.Field()
     response_headers = scrapy.Field()
     response_body = scrapy.Field()
+    response_body_truncated = scrapy.Field()
+    response_body_path = scrapy.Field()
     response_status = scrapy.Field()
+    # Datos para la instantánea de la página (reescaneos incrementales)
+    etag = scrapy.Field()
+    last_modified = scrapy.Field()
+    body_hash = scrapy.Field()
+    links = scrapy.Field()
+
+
+class UnchangedPageItem(scrapy.Item):
+    """Página igual que en el escaneo anterior: no se analiza, se copian sus hallazgos."""
+    url = scrapy.Field()
+    previous_scan_id = scrapy.Field()
+    etag = scrapy.Field()
+    last_modified = scrapy.Field()
+    body_hash = scrapy.Field()
+    links = scrapy.Field()
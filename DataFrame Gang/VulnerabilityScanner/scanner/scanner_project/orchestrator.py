@@ -0,0 +1,226 @@
+"""
+Escaneo de varios objetivos en paralelo.
+
+Cada objetivo se rastrea en su propio proceso (el reactor de Twisted no se
+puede reiniciar, así que cada proceso ejecuta un único escaneo y termina) y
+hay como mucho `--workers` procesos a la vez. Todos escriben en la misma BD
+a través del pipeline y su escritor por lotes, y cada uno queda registrado
+como un escaneo normal en el dashboard.
+
+Uso (desde scanner/, igual que `scrapy crawl`):
+    python -m scanner_project.orchestrator objetivos.txt --workers 8
+    python -m scanner_project.orchestrator http://a.example/ http://b.example/ --log-dir logs/
+    cat objetivos.txt | python -m scanner_project.orchestrator -
+
+El fichero de objetivos tiene una URL por línea; las líneas vacías y las
+que empiezan por # se ignoran.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+
+@dataclass
+class TargetResult:
+    target: str
+    status: str = "failed"
+    scan_id: int | None = None
+    elapsed: float = 0.0
+    pages: int = 0
+    requests: int = 0
+    findings: int = 0
+    error: str | None = None
+
+
+def read_targets(sources):
+    """Lista de objetivos sin repetir a partir de URLs, ficheros o '-' (stdin)."""
+    targets = []
+    for source in sources:
+        if source == "-":
+            lines = sys.stdin.read().splitlines()
+        elif "://" in source:
+            lines = [source]
+        else:
+            with open(source, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        targets.extend(line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#"))
+    return list(dict.fromkeys(targets))
+
+
+def scan_target(target, settings_overrides=None, log_file=None):
+    """
+    Ejecuta el escaneo completo de un objetivo en el proceso actual. Se
+    llama dentro de un proceso del pool; devuelve un TargetResult.
+    """
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "scanner_project.settings")
+    settings = get_project_settings()
+    settings.setdict(settings_overrides or {}, priority="cmdline")
+    if log_file:
+        settings.set("LOG_FILE", log_file, priority="cmdline")
+
+    result = TargetResult(target=target)
+    start = time.perf_counter()
+    try:
+        process = CrawlerProcess(settings)
+        crawler = process.create_crawler("site_spider")
+        process.crawl(crawler, start_url=target)
+        process.start()
+    except Exception as e:
+        result.error = str(e)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    result.elapsed = time.perf_counter() - start
+    if crawler.spider is None:
+        # El spider no llegó a crearse (URL no válida, BD inaccesible...); el detalle está en el log
+        result.error = "no se pudo iniciar el escaneo"
+        return result
+    stats = crawler.stats.get_stats()
+    result.status = stats.get("finish_reason", "failed")
+    result.scan_id = getattr(crawler.spider, "scan_id", None)
+    result.pages = stats.get("item_scraped_count", 0)
+    result.requests = stats.get("downloader/request_count", 0)
+    result.findings = count_scan_findings(result.scan_id, stats)
+    if stats.get("log_count/ERROR"):
+        result.error = f"{stats['log_count/ERROR']} errores en el log"
+    return result
+
+
+def count_scan_findings(scan_id, stats):
+    """
+    Hallazgos del escaneo en la BD: incluye los copiados de páginas sin
+    cambios en un reescaneo incremental y no cuenta los duplicados que
+    descartó el ON CONFLICT. Sin escaneo registrado se estima con las
+    estadísticas del escritor.
+    """
+    if scan_id is not None:
+        from sqlalchemy import func, select
+        from database.database import engine
+        from database.models import Finding
+
+        with engine.connect() as conn:
+            return conn.scalar(select(func.count()).select_from(Finding).where(Finding.scan_id == scan_id))
+    return stats.get("findings_writer/rows_flushed", 0) + stats.get("findings_writer/findings_carried_forward", 0)
+
+
+def _scan_in_new_process(context, *args):
+    """Ejecuta scan_target en un proceso propio que termina al acabar el escaneo."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(scan_target, *args).result()
+
+
+def run_targets(targets, workers=None, settings_overrides=None, log_dir=None, on_result=None):
+    """
+    Escanea los objetivos con un pool de `workers` procesos (por defecto uno
+    por núcleo). Llama a `on_result(result, done, total)` según van
+    terminando y devuelve los resultados en el orden de finalización.
+    """
+    workers = workers or os.cpu_count() or 1
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    # spawn + un escaneo por proceso: cada escaneo arranca con un reactor nuevo
+    context = multiprocessing.get_context("spawn")
+    if sys.version_info >= (3, 11):
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, max_tasks_per_child=1)
+        task = scan_target
+    else:
+        # Sin max_tasks_per_child (Python 3.10): cada hilo lanza un proceso por escaneo
+        pool = ThreadPoolExecutor(max_workers=workers)
+        task = functools.partial(_scan_in_new_process, context)
+
+    results = []
+    with pool:
+        futures = {}
+        for index, target in enumerate(targets, 1):
+            log_file = os.path.join(log_dir, f"target-{index:04d}.log") if log_dir else None
+            futures[pool.submit(task, target, settings_overrides, log_file)] = target
+
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # El proceso murió sin devolver resultado (p. ej. sin memoria)
+                result = TargetResult(target=futures[future], error=f"{type(e).__name__}: {e}")
+            results.append(result)
+            if on_result is not None:
+                on_result(result, len(results), len(targets))
+    return results
+
+
+def print_progress(result, done, total):
+    scan = f"#{result.scan_id}" if result.scan_id else "sin registrar"
+    line = (f"[{done}/{total}] {result.target} ({scan}): {result.status} en {result.elapsed:.1f} s, "
+            f"{result.pages} páginas, {result.findings} hallazgos")
+    if result.error:
+        line += f" - {result.error}"
+    print(line, flush=True)
+
+
+def print_summary(results, wall_time, workers):
+    by_status = {}
+    for result in results:
+        by_status[result.status] = by_status.get(result.status, 0) + 1
+    cpu_time = sum(result.elapsed for result in results)
+
+    print(f"\nObjetivos:          {len(results)} ({', '.join(f'{k}: {v}' for k, v in sorted(by_status.items()))})")
+    print(f"Tiempo total:       {wall_time:.1f} s con {workers} procesos")
+    print(f"Suma por objetivo:  {cpu_time:.1f} s (aceleración x{cpu_time / wall_time if wall_time else 0:.1f})")
+    print(f"Páginas:            {sum(r.pages for r in results)}")
+    print(f"Requests:           {sum(r.requests for r in results)}")
+    print(f"Hallazgos:          {sum(r.findings for r in results)}")
+
+    slowest = sorted(results, key=lambda r: r.elapsed, reverse=True)[:5]
+    if slowest:
+        print("\nObjetivos más lentos:")
+        for result in slowest:
+            print(f"  {result.elapsed:8.1f} s  {result.target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+", help="URLs, ficheros con una URL por línea o '-' para stdin")
+    parser.add_argument("--workers", "-j", type=int, default=None,
+                        help="Escaneos simultáneos (por defecto, uno por núcleo)")
+    parser.add_argument("--log-dir", default=None,
+                        help="Guarda el log completo de cada objetivo en este directorio")
+    parser.add_argument("--report", default=None, help="Escribe los resultados por objetivo en JSON")
+    parser.add_argument("-s", "--set", action="append", default=[], metavar="NOMBRE=VALOR",
+                        help="Ajuste de Scrapy para todos los escaneos (como `scrapy crawl -s`)")
+    args = parser.parse_args()
+
+    targets = read_targets(args.sources)
+    if not targets:
+        raise SystemExit("No hay objetivos que escanear.")
+
+    overrides = dict(item.split("=", 1) for item in args.set)
+    # Sin fichero de log propio, los procesos solo muestran avisos para no mezclar salidas
+    if not args.log_dir:
+        overrides.setdefault("LOG_LEVEL", "WARNING")
+
+    workers = min(args.workers or os.cpu_count() or 1, len(targets))
+    print(f"Escaneando {len(targets)} objetivos con {workers} procesos", flush=True)
+    start = time.perf_counter()
+    results = run_targets(targets, workers=workers, settings_overrides=overrides,
+                          log_dir=args.log_dir, on_result=print_progress)
+    print_summary(results, time.perf_counter() - start, workers)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2, ensure_ascii=False)
+
+    if any(result.status != "finished" for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from bs4 import BeautifulSoup
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    HAS_LXML = True
+except ImportError:  # pragma: no cover - lxml llega con scrapy, pero por si acaso
+    HAS_LXML = False
+
+
+@dataclass
+class ParsedInput:
+    name: str | None
+    type: str
+    value: str
+
+
+@dataclass
+class ParsedForm:
+    action: str | None
+    method: str
+    inputs: list[ParsedInput] = field(default_factory=list)
+
+
+@dataclass
+class ParsedPage:
+    """Resultado de analizar el HTML de una página una sola vez."""
+    forms: list[ParsedForm] = field(default_factory=list)
+    meta: dict[str, str] = field(default_factory=dict)
+
+
+def _build_input(attrs):
+    inp_type_attr = attrs.get('type', 'text')
+    inp_type = str(inp_type_attr).lower() if inp_type_attr else "text"
+    name = attrs.get('name')
+    return ParsedInput(
+        name=str(name) if name else None,
+        type=inp_type,
+        value=attrs.get('value', '') or '',
+    )
+
+
+def _build_form(attrs, inputs):
+    action = attrs.get('action')
+    return ParsedForm(
+        action=str(action) if action is not None else None,
+        method=str(attrs.get('method', 'GET') or 'GET').upper(),
+        inputs=inputs,
+    )
+
+
+def _meta_key(attrs):
+    key = attrs.get('name') or attrs.get('http-equiv') or attrs.get('property')
+    return str(key).lower() if key else None
+
+
+def _parse_with_lxml(body):
+    parser = lxml_html.HTMLParser()
+    root = etree.fromstring(body, parser)
+    page = ParsedPage()
+    if root is None:
+        return page
+
+    for form in root.iter('form'):
+        inputs = [_build_input(inp.attrib) for inp in form.iter('input')]
+        page.forms.append(_build_form(form.attrib, inputs))
+
+    for meta in root.iter('meta'):
+        key = _meta_key(meta.attrib)
+        if key and key not in page.meta:
+            page.meta[key] = meta.get('content', '')
+    return page
+
+
+def _parse_with_bs4(body):
+    soup = BeautifulSoup(body, 'html.parser')
+    page = ParsedPage()
+
+    for form in soup.find_all('form'):
+        inputs = [_build_input(inp.attrs) for inp in form.find_all('input')]
+        page.forms.append(_build_form(form.attrs, inputs))
+
+    for meta in soup.find_all('meta'):
+        key = _meta_key(meta.attrs)
+        if key and key not in page.meta:
+            page.meta[key] = meta.get('content', '')
+    return page
+
+
+def parse_page(body):
+    """
+    Analiza el cuerpo de la respuesta una única vez y extrae formularios,
+    inputs y metadatos. Usa lxml si está disponible y, si no, BeautifulSoup.
+    """
+    if not body:
+        return ParsedPage()
+
+    if HAS_LXML:
+        try:
+            return _parse_with_lxml(body)
+        except (etree.ParserError, ValueError) as e:
+            logger.debug(f"lxml no pudo analizar la página, usando html.parser: {e}")
+
+    return _parse_with_bs4(body)
@@ -1,38 +1,121 @@
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import func, select
+from twisted.internet import task, threads
 from database.database import engine
 from database.models import Finding
-from bs4 import BeautifulSoup
-import scrapy
-import urllib.parse
+from database.pages import page_host
+from scanner_project.checks import ACTIVE, PageContext, build_checks, load_check_modules
+from scanner_project.forms import FormCache, form_fingerprint
+from scanner_project.items import UnchangedPageItem
+from scanner_project.parsing import parse_page
+from scanner_project.probes import ProbeScheduler
+from scanner_project.signatures import load_signature_engines
+from scanner_project.writer import FindingWriter
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 
 class VulnAnalysisPipeline:
-    
-    # --- Payloads y Firmas para Detección ---
-    SQLI_PAYLOADS = ["' OR 1=1 --", "' OR 'a'='a", '" OR "a"="a']
-    SQLI_ERROR_STRINGS = [
-        "you have an error in your sql syntax",
-        "warning: mysql",
-        "unclosed quotation mark",
-        "sql command not properly ended"
-    ]
-    XSS_PAYLOAD = "<script>alert('XSS-VULN-TAG')</script>"
-
-    def __init__(self):
-        self.Session = scoped_session(sessionmaker(bind=engine))
+
+    def __init__(self, batch_size=500, flush_interval=2.0, checkpoint_interval=60.0,
+                 disabled_checks=(), check_modules=(), flush_retries=3, retry_backoff=0.5):
+        # Checks registrados (ver checks/), con las firmas de signatures.json
+        load_check_modules(check_modules)
+        self.checks = build_checks(load_signature_engines(), disabled=disabled_checks)
+        self.passive_checks = [check for check in self.checks if check.kind != ACTIVE]
+        self.active_checks = [check for check in self.checks if check.kind == ACTIVE]
+        # El HTML solo se analiza si algún check usa los formularios
+        self.needs_forms = any('forms' in check.needs for check in self.checks)
+        self.writer = FindingWriter(engine, batch_size=batch_size, flush_interval=flush_interval,
+                                    max_retries=flush_retries, retry_backoff=retry_backoff)
+        # Claves (url, vulnerability_type) ya registradas en este escaneo, para
+        # descartar duplicados sin ir a la BD
+        self.scan_id = None
+        self.seen_findings = set()
+        self.duplicates_skipped = 0
+        # Formularios ya atacados en este escaneo (por huella)
+        self.form_cache = FormCache()
+        # Guardado periódico del estado del rastreo (ver crawlstate.py)
+        self.checkpoint_interval = checkpoint_interval
+        self.crawl_state = None
+        self._checkpoint_loop = None
+        # Serializa las escrituras del estado entre los checkpoints (en un
+        # hilo) y el guardado final del cierre
+        self._state_lock = threading.Lock()
+        self._closing = False
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            batch_size=crawler.settings.getint('FINDINGS_BATCH_SIZE', 500),
+            flush_interval=crawler.settings.getfloat('FINDINGS_FLUSH_INTERVAL', 2.0),
+            checkpoint_interval=crawler.settings.getfloat('CHECKPOINT_INTERVAL', 60.0),
+            disabled_checks=crawler.settings.getlist('CHECKS_DISABLED'),
+            check_modules=crawler.settings.getlist('CHECK_MODULES'),
+            flush_retries=crawler.settings.getint('FINDINGS_FLUSH_RETRIES', 3),
+            retry_backoff=crawler.settings.getfloat('FINDINGS_RETRY_BACKOFF', 0.5),
+        )
 
     def open_spider(self, spider):
         """Inicializa recursos al abrir el spider."""
         self.crawler = spider.crawler
+        # Los checks activos se lanzan con presupuesto por host (ver probes.py)
+        self.probes = ProbeScheduler.from_crawler(self.crawler)
+        self.scan_id = getattr(spider, 'scan_id', None)
+        self._load_seen_findings()
+        self.writer.start()
+        logger.info(f"Checks activos en el escaneo: {', '.join(check.name for check in self.checks)}")
+
+        self.crawl_state = getattr(spider, 'crawl_state', None)
+        if self.crawl_state is not None:
+            self._restore_form_cache()
+            if self.checkpoint_interval > 0:
+                self._checkpoint_loop = task.LoopingCall(self._checkpoint)
+                self._checkpoint_loop.start(self.checkpoint_interval, now=False)
         logger.info("VulnAnalysisPipeline iniciado")
 
+    def _restore_form_cache(self):
+        """
+        Enlaza la caché de formularios con el estado del escaneo y, si se está
+        reanudando, vuelve a atacar los formularios cuyos checks activos no
+        terminaron (esos requests solo vivían en memoria).
+        """
+        saved = self.crawl_state.form_cache
+        if saved is not None:
+            self.form_cache = saved
+            pending = self.form_cache.incomplete()
+            logger.info(
+                f"Reanudando escaneo #{self.scan_id}: {len(self.form_cache)} formularios conocidos, "
+                f"{len(pending)} con checks pendientes, último hallazgo guardado "
+                f"#{self.crawl_state.last_finding_id}"
+            )
+            for fingerprint, record in pending:
+                record.pending_probes = 0
+                self._attack_forms({'url': record.original_url}, [(fingerprint, record.form)])
+        self.crawl_state.form_cache = self.form_cache
+
     def close_spider(self, spider):
         """Limpia recursos al cerrar el spider."""
         try:
-            self.Session.remove()
+            if self._checkpoint_loop is not None and self._checkpoint_loop.running:
+                self._checkpoint_loop.stop()
+            with self._state_lock:
+                # Un checkpoint aún en curso ya no escribe: su copia es anterior al cierre
+                self._closing = True
+            self.writer.close()
+            # Último guardado, ya con todos los hallazgos en la BD
+            if self.crawl_state is not None:
+                with self._state_lock:
+                    self._save_crawl_state()
+            for key, value in self.writer.stats.items():
+                self.crawler.stats.set_value(f'findings_writer/{key}', value)
+            if self.writer.stats['findings_lost']:
+                logger.error(f"Se han perdido {self.writer.stats['findings_lost']} hallazgos al escribir en la BD")
+            self.crawler.stats.set_value('findings/duplicates_skipped', self.duplicates_skipped)
+            self.crawler.stats.set_value('forms/unique', len(self.form_cache))
+            self.crawler.stats.set_value('forms/repeated_skipped', self.form_cache.repeated)
             logger.info("VulnAnalysisPipeline cerrado correctamente")
         except Exception as e:
             logger.error(f"Error cerrando pipeline: {e}")
@@ -42,299 +125,236 @@ class VulnAnalysisPipeline:
         Procesa el item realizando checks pasivos.
         Los checks activos se programan como requests separados.
         """
+        if isinstance(item, UnchangedPageItem):
+            self.carry_forward(item)
+            return item
+
         try:
+            # El HTML se analiza una sola vez y se comparte entre todos los checks
+            page = parse_page(item['response_body']) if self.needs_forms else None
+
             # --- Checks pasivos (análisis de la respuesta original) ---
-            self.check_missing_security_headers(item)
-            self.check_software_version_leak(item)
-            self.check_form_without_csrf_token(item)
+            context = PageContext.from_item(item, page)
+            for check in self.passive_checks:
+                self._run_check(check, check.run, context)
 
             # --- Programar checks activos ---
             # Estos se ejecutan como requests adicionales del crawler
-            self._schedule_active_checks(item, spider)
-            
+            if page is not None and self.active_checks:
+                self._schedule_active_checks(item, page, spider)
+
+            self._save_snapshot(item)
         except Exception as e:
             logger.error(f"Error procesando item {item.get('url', 'unknown')}: {e}", exc_info=True)
         
         return item
 
-    def _schedule_active_checks(self, item, spider):
+    def carry_forward(self, item):
         """
-        Programa los checks activos como nuevos requests en el crawler.
+        Página sin cambios desde el último escaneo: no se analiza, se copian
+        sus hallazgos (pasivos y de los formularios atacados desde ella) y su
+        instantánea pasa a apuntar a este escaneo.
         """
-        try:
-            # Genera requests para SQLi
-            for request in self.check_sql_injection(item):
-                spider.crawler.engine.crawl(request)
-            
-            # Genera requests para XSS
-            for request in self.check_xss(item):
-                spider.crawler.engine.crawl(request)
-                
-        except Exception as e:
-            logger.error(f"Error programando checks activos para {item.get('url')}: {e}")
+        if self.scan_id is None:
+            return
+        self.writer.carry_forward(item['previous_scan_id'], self.scan_id, item['url'])
+        self._save_snapshot(item)
+        self.crawler.stats.inc_value('incremental/unchanged_pages')
 
-    def save_finding(self, url, http_status, vuln_type, severity, details):
-        """Guarda un hallazgo en la base de datos de forma thread-safe."""
-        session = self.Session()
-        try:
-            # Verifica si ya existe
-            exists = session.query(Finding).filter_by(
-                url=url, 
-                vulnerability_type=vuln_type
-            ).first()
-            
-            if exists:
-                logger.debug(f"Hallazgo duplicado ignorado: {vuln_type} en {url}")
-                return
+    def _save_snapshot(self, item):
+        if self.scan_id is None or item.get('body_hash') is None:
+            return
+        self.writer.save_snapshot(
+            item['url'], page_host(item['url']), self.scan_id,
+            etag=item.get('etag'), last_modified=item.get('last_modified'),
+            body_hash=item['body_hash'], links=item.get('links') or (),
+        )
 
-            finding = Finding(
-                url=url,
-                http_status=http_status,
-                vulnerability_type=vuln_type,
-                severity=severity,
-                details=details
-            )
-            session.add(finding)
-            session.commit()
-            logger.info(f"✅ Hallazgo guardado: {vuln_type} en {url}")
-            
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error guardando hallazgo: {e}", exc_info=True)
-        finally:
-            session.close()
-
-    # --- Métodos de Checks Pasivos ---
-    
-    def check_missing_security_headers(self, item):
-        """Verifica la presencia de cabeceras de seguridad importantes."""
-        headers_to_check = {
-            'X-Frame-Options': 'Baja',
-            'Content-Security-Policy': 'Media',
-            'Strict-Transport-Security': 'Baja',
-            'X-Content-Type-Options': 'Baja'
-        }
-        
+    def _schedule_active_checks(self, item, page, spider):
+        """
+        Programa los checks activos como nuevos requests en el crawler. Se
+        encolan en el ProbeScheduler, que los lanza según el presupuesto del host.
+        """
         try:
-            for header, severity in headers_to_check.items():
-                # Verifica tanto en bytes como en string
-                header_bytes = header.encode('utf-8')
-                if not (item['response_headers'].get(header_bytes) or 
-                       item['response_headers'].get(header)):
-                    details = f"La cabecera de seguridad '{header}' no está presente."
-                    self.save_finding(
-                        item['url'], 
-                        item['response_status'], 
-                        'Cabecera de Seguridad Faltante', 
-                        severity, 
-                        details
-                    )
+            # Solo se atacan los formularios que no se han visto antes en el escaneo
+            forms = self._new_forms(item, page)
+            if not forms:
+                return
+            self._attack_forms(item, forms)
         except Exception as e:
-            logger.error(f"Error en check_missing_security_headers: {e}")
+            logger.error(f"Error programando checks activos para {item.get('url')}: {e}")
 
-    def check_software_version_leak(self, item):
-        """Detecta posibles fugas de versión de software."""
-        try:
-            body = item['response_body'].decode('utf-8', errors='ignore').lower()
-            
-            # Expande la detección a más tecnologías
-            version_patterns = {
-                "powered by wordpress": "WordPress",
-                "x-powered-by: php": "PHP",
-                "server: apache": "Apache",
-                "drupal": "Drupal",
-                "joomla": "Joomla"
-            }
-            
-            for pattern, software in version_patterns.items():
-                if pattern in body:
-                    details = f"Se ha detectado una posible versión de {software} expuesta."
-                    self.save_finding(
-                        item['url'], 
-                        item['response_status'], 
-                        'Fuga de Versión de Software', 
-                        'Baja', 
-                        details
+    def _attack_forms(self, item, forms):
+        """Encola los checks activos de los formularios y lleva la cuenta por huella."""
+        for check in self.active_checks:
+            try:
+                for fingerprint, request in check.requests(item['url'], forms):
+                    request = request.replace(
+                        callback=self._active_response,
+                        errback=self.handle_request_error,
+                        cb_kwargs={**request.cb_kwargs, 'check': check, 'original_url': item['url'],
+                                   'form_fingerprint': fingerprint},
                     )
-                    break  # Solo reporta la primera coincidencia
-                    
-        except Exception as e:
-            logger.error(f"Error en check_software_version_leak: {e}")
+                    self.form_cache.probe_scheduled(fingerprint)
+                    self.probes.schedule(request)
+                    self.crawler.stats.inc_value(f'active_checks/requests/{check.name}')
+            except Exception as e:
+                self.crawler.stats.inc_value(f'checks/{check.name}/errors')
+                logger.error(f"Error generando requests del check {check.name}: {e}")
 
-    def check_form_without_csrf_token(self, item):
-        """Verifica si los formularios tienen protección CSRF."""
-        try:
-            soup = BeautifulSoup(item['response_body'], 'html.parser')
-            
-            for form in soup.find_all('form'):
-                # Busca tokens CSRF en inputs ocultos
-                has_csrf = False
-                for inp in form.find_all('input', {'type': 'hidden'}):
-                    name_attr = inp.get('name')
-                    name = str(name_attr).lower() if name_attr else ""
-                    if 'csrf' in name or 'token' in name or '_token' in name:
-                        has_csrf = True
-                        break
-                
-                if not has_csrf:
-                    action = form.get('action', 'N/A')
-                    details = f"Formulario sin token CSRF visible. Acción: {action}"
-                    self.save_finding(
-                        item['url'], 
-                        item['response_status'], 
-                        'Formulario sin Token CSRF', 
-                        'Media', 
-                        details
-                    )
-        except Exception as e:
-            logger.error(f"Error en check_form_without_csrf_token: {e}")
+        # Formularios sin campos que atacar: no esperan ningún check
+        for fingerprint, _ in forms:
+            if self.form_cache.get(fingerprint).pending_probes == 0:
+                self.form_cache.mark_completed(fingerprint)
 
-    # --- Checks Activos ---
-    
-    def check_sql_injection(self, item):
+    def _new_forms(self, item, page):
         """
-        Genera requests con payloads de SQLi para detectar vulnerabilidades.
-        Retorna generador de scrapy.Request.
+        Devuelve (huella, formulario) para los formularios de la página que
+        aún no se han atacado. Los repetidos se enlazan al primer avistamiento.
+        """
+        forms = []
+        for form in page.forms:
+            fingerprint = form_fingerprint(form, item['url'])
+            if self.form_cache.register(fingerprint, item['url'], form=form):
+                forms.append((fingerprint, form))
+            else:
+                original = self.form_cache.get(fingerprint).original_url
+                logger.debug(f"Formulario {fingerprint} en {item['url']} ya atacado desde {original}")
+        return forms
+
+    def _form_link(self, fingerprint):
+        """Texto que enlaza un hallazgo con todas las páginas que comparten el formulario."""
+        record = self.form_cache.get(fingerprint)
+        if record is None:
+            return ""
+        if record.sightings > 1:
+            return f" Huella del formulario: {fingerprint} (presente en {record.sightings} páginas)."
+        return f" Huella del formulario: {fingerprint}."
+
+    def _checkpoint(self):
+        """
+        Guarda el estado del rastreo sin esperar al cierre del spider, para
+        no perderlo todo si el proceso muere. El estado se copia aquí, en el
+        hilo del reactor; esperar al volcado y escribir el fichero se hace en
+        otro hilo para no parar el rastreo. LoopingCall no lanza el siguiente
+        checkpoint hasta que termina el Deferred.
         """
         try:
-            soup = BeautifulSoup(item['response_body'], 'html.parser')
-            
-            for form in soup.find_all('form'):
-                action = urllib.parse.urljoin(item['url'], str(form.get('action', '')))
-                method = str(form.get('method', 'GET')).upper()
-                
-                # Extrae campos del formulario
-                inputs = form.find_all('input')
-                if not inputs:
-                    continue
-                
-                for payload in self.SQLI_PAYLOADS:
-                    data = {}
-                    for inp in inputs:
-                        name = inp.get('name')
-                        if name:
-                            # Inyecta payload en campos de texto
-                            inp_type_attr = inp.get('type', 'text')
-                            inp_type = str(inp_type_attr).lower() if inp_type_attr else "text"
-                            if inp_type in ['text', 'search', 'email']:
-                                data[str(name)] = payload
-                            else:
-                                data[str(name)] = inp.get('value', '')
-                    
-                    if not data:
-                        continue
-                    
-                    # Crea el request apropiado
-                    if method == 'POST':
-                        yield scrapy.FormRequest(
-                            action, 
-                            formdata=data, 
-                            callback=self.parse_sqli_response,
-                            cb_kwargs={'payload': payload, 'original_url': item['url']},
-                            errback=self.handle_request_error,
-                            dont_filter=True
-                        )
-                    else:
-                        url = f"{action}?{urllib.parse.urlencode(data)}"
-                        yield scrapy.Request(
-                            url, 
-                            callback=self.parse_sqli_response,
-                            cb_kwargs={'payload': payload, 'original_url': item['url']},
-                            errback=self.handle_request_error,
-                            dont_filter=True
-                        )
+            state = self.crawl_state.dump()
         except Exception as e:
-            logger.error(f"Error en check_sql_injection: {e}")
+            logger.error(f"Error copiando el estado del rastreo: {e}", exc_info=True)
+            return None
+
+        d = threads.deferToThread(self._write_checkpoint, state)
+        d.addCallbacks(self._checkpoint_done, self._checkpoint_failed)
+        return d
+
+    def _write_checkpoint(self, state):
+        # Primero se vuelcan los hallazgos encolados hasta la copia: el estado
+        # nunca va por delante de la BD
+        if not self.writer.flush(timeout=30):
+            raise RuntimeError("el volcado de hallazgos no terminó en 30 s")
+        last_finding_id = self._last_finding_id()
+        with self._state_lock:
+            if self._closing:
+                return False
+            self.crawl_state.write(state, last_finding_id)
+        return True
+
+    def _checkpoint_done(self, saved):
+        if saved:
+            self.crawler.stats.inc_value('checkpoint/saved')
+            logger.debug(f"Estado del rastreo guardado en {self.crawl_state.path}")
+
+    def _checkpoint_failed(self, failure):
+        logger.error(
+            f"Error guardando el estado del rastreo: {failure.value}",
+            exc_info=(failure.type, failure.value, failure.getTracebackObject()),
+        )
+
+    def _save_crawl_state(self):
+        self.crawl_state.last_finding_id = self._last_finding_id()
+        self.crawl_state.save()
+        logger.debug(f"Estado del rastreo guardado en {self.crawl_state.path}")
 
-    def parse_sqli_response(self, response, payload, original_url):
-        """Analiza la respuesta de un intento de SQLi."""
+    def _last_finding_id(self):
+        query = select(func.max(Finding.id))
+        if self.scan_id is not None:
+            query = query.where(Finding.scan_id == self.scan_id)
+        with engine.connect() as conn:
+            return conn.scalar(query)
+
+    def _load_seen_findings(self):
+        """Precarga en memoria las claves de los hallazgos ya guardados en el escaneo."""
         try:
-            body = response.text.lower()
-            
-            for error in self.SQLI_ERROR_STRINGS:
-                if error in body:
-                    details = (
-                        f"Error SQL detectado: '{error}' "
-                        f"al inyectar payload: '{payload}'. "
-                        f"Formulario en: {original_url}"
-                    )
-                    self.save_finding(
-                        response.url, 
-                        response.status, 
-                        'Inyección de SQL (SQLi)', 
-                        'Alta', 
-                        details
-                    )
-                    break  # Reporta el primer error encontrado
-                    
+            query = select(Finding.url, Finding.vulnerability_type)
+            if self.scan_id is None:
+                query = query.where(Finding.scan_id.is_(None))
+            else:
+                query = query.where(Finding.scan_id == self.scan_id)
+            with engine.connect() as conn:
+                rows = conn.execute(query)
+                self.seen_findings.update((url, vuln_type) for url, vuln_type in rows)
+            logger.info(f"Índice de duplicados precargado con {len(self.seen_findings)} hallazgos")
         except Exception as e:
-            logger.error(f"Error en parse_sqli_response: {e}")
+            logger.error(f"Error precargando el índice de duplicados: {e}")
 
-    def check_xss(self, item):
+    def save_finding(self, url, http_status, vuln_type, severity, details, page_url=None):
         """
-        Genera requests con payloads de XSS para detectar vulnerabilidades.
-        Retorna generador de scrapy.Request.
+        Encola un hallazgo para el escritor en lote. Los duplicados se
+        descartan con el índice en memoria; la restricción UNIQUE de la BD
+        queda como respaldo (ON CONFLICT DO NOTHING). Devuelve True si el
+        hallazgo es nuevo.
         """
+        key = (url, vuln_type)
+        if key in self.seen_findings:
+            self.duplicates_skipped += 1
+            logger.debug(f"Hallazgo duplicado ignorado: {vuln_type} en {url}")
+            return False
+        self.seen_findings.add(key)
+
         try:
-            soup = BeautifulSoup(item['response_body'], 'html.parser')
-            
-            for form in soup.find_all('form'):
-                action = urllib.parse.urljoin(item['url'], str(form.get('action', '')))
-                method = str(form.get('method', 'GET')).upper()
-                
-                # Solo inyecta en campos de entrada visibles
-                data = {}
-                for inp in form.find_all('input'):
-                    name = inp.get('name')
-                    inp_type_attr = inp.get('type', 'text')
-                    inp_type = str(inp_type_attr).lower() if inp_type_attr else "text"
-
-                    if name and inp_type not in ['hidden', 'submit', 'button']:
-                        data[str(name)] = self.XSS_PAYLOAD
-                
-                if not data:
-                    continue
-
-                # Crea el request apropiado
-                if method == 'POST':
-                    yield scrapy.FormRequest(
-                        action, 
-                        formdata=data, 
-                        callback=self.parse_xss_response,
-                        cb_kwargs={'original_url': item['url']},
-                        errback=self.handle_request_error,
-                        dont_filter=True
-                    )
-                else:
-                    url = f"{action}?{urllib.parse.urlencode(data)}"
-                    yield scrapy.Request(
-                        url, 
-                        callback=self.parse_xss_response,
-                        cb_kwargs={'original_url': item['url']},
-                        errback=self.handle_request_error,
-                        dont_filter=True
-                    )
+            self.writer.add(url, http_status, vuln_type, severity, details, scan_id=self.scan_id, page_url=page_url)
+            logger.info(f"✅ Hallazgo encolado: {vuln_type} en {url}")
+            return True
         except Exception as e:
-            logger.error(f"Error en check_xss: {e}")
+            logger.error(f"Error encolando hallazgo: {e}", exc_info=True)
+            return False
 
-    def parse_xss_response(self, response, original_url):
-        """Analiza si el payload de XSS se reflejó en la respuesta."""
+    def _run_check(self, check, method, *args, **kwargs):
+        """
+        Ejecuta un método de un check, guarda sus hallazgos y anota en las
+        estadísticas del crawler el tiempo, las llamadas y los hallazgos
+        nuevos (`checks/<nombre>/...`). Un check que falla no para al resto.
+        """
+        stats = self.crawler.stats
+        found = 0
+        start = time.perf_counter()
         try:
-            if self.XSS_PAYLOAD in response.text:
-                details = (
-                    f"Payload de script reflejado sin escapar. "
-                    f"Formulario en: {original_url}"
-                )
-                self.save_finding(
-                    response.url, 
-                    response.status, 
-                    'Cross-Site Scripting (XSS) Reflejado', 
-                    'Alta', 
-                    details
-                )
+            for result in method(*args, **kwargs) or ():
+                if self.save_finding(result.url, result.http_status, result.vulnerability_type,
+                                     result.severity, result.details, page_url=result.page_url):
+                    found += 1
         except Exception as e:
-            logger.error(f"Error en parse_xss_response: {e}")
+            stats.inc_value(f'checks/{check.name}/errors')
+            logger.error(f"Error en el check {check.name}: {e}")
+        finally:
+            stats.inc_value(f'checks/{check.name}/seconds', time.perf_counter() - start, start=0.0)
+            stats.inc_value(f'checks/{check.name}/calls')
+            if found:
+                stats.inc_value(f'checks/{check.name}/findings', found)
+
+    # --- Checks activos ---
+
+    def _active_response(self, response, check, original_url, form_fingerprint=None, **kwargs):
+        """Callback de los requests de un check activo."""
+        self.form_cache.probe_finished(form_fingerprint)
+        self._run_check(check, check.analyze, response, original_url,
+                        self._form_link(form_fingerprint), **kwargs)
 
     def handle_request_error(self, failure):
         """Maneja errores en requests de checks activos."""
+        # Libera el hueco de los requests descartados antes de descargarse (p. ej. offsite)
+        self.probes.completed(failure.request)
+        self.form_cache.probe_finished(failure.request.cb_kwargs.get('form_fingerprint'))
         logger.error(f"Error en request de check activo: {failure}")
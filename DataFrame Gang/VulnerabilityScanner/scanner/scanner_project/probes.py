@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+from collections import deque
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+import itertools
+import logging
+import urllib.parse
+
+logger = logging.getLogger(__name__)
+
+# Respuestas que indican que el objetivo está saturado
+BACKOFF_STATUSES = {429, 503}
+
+
+@dataclass
+class HostBudget:
+    """Estado de los checks activos contra un host."""
+    concurrency: float
+    in_flight: set = field(default_factory=set)
+    pending: deque = field(default_factory=deque)
+
+
+class ProbeScheduler:
+    """
+    Planificador de los requests de checks activos (payloads de SQLi/XSS).
+
+    - Cada host tiene su propio presupuesto de requests activos en vuelo, que
+      se ajusta con AIMD: sube poco a poco mientras la latencia de descarga
+      está por debajo de `target_latency` y se reduce a la mitad si la supera,
+      si la descarga falla o si el host responde 429/503.
+    - Comparten el slot de descarga del host con el rastreo, así que el host
+      nunca recibe más de CONCURRENT_REQUESTS_PER_DOMAIN requests a la vez;
+      el presupuesto decide cuántos de esos huecos pueden ocupar los payloads.
+    - Los requests se lanzan con prioridad baja, así el scheduler de Scrapy
+      atiende antes el rastreo pasivo y los payloads ocupan la capacidad libre.
+
+    El hueco de un request se libera cuando sale del downloader (señal
+    `request_left_downloader`); el errback de los checks activos debe llamar a
+    `completed` para los que se descartan antes de descargarse.
+    """
+
+    def __init__(self, crawler, initial_concurrency=2, max_concurrency=8, min_concurrency=1,
+                 target_latency=1.0, priority=-10):
+        self.crawler = crawler
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.target_latency = target_latency
+        self.priority = priority
+        self._hosts = {}
+        self._tokens = itertools.count()
+        crawler.signals.connect(self.request_left_downloader, signal=signals.request_left_downloader)
+        crawler.signals.connect(self.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(self.spider_idle, signal=signals.spider_idle)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            crawler,
+            initial_concurrency=settings.getint('PROBES_INITIAL_CONCURRENCY', 2),
+            max_concurrency=settings.getint('PROBES_MAX_CONCURRENCY_PER_HOST', 8),
+            min_concurrency=settings.getint('PROBES_MIN_CONCURRENCY_PER_HOST', 1),
+            target_latency=settings.getfloat('PROBES_TARGET_LATENCY', 1.0),
+            priority=settings.getint('PROBES_PRIORITY', -10),
+        )
+
+    @property
+    def pending(self):
+        return sum(len(state.pending) for state in self._hosts.values())
+
+    def budget(self, host):
+        return self._hosts[host].concurrency if host in self._hosts else None
+
+    def schedule(self, request):
+        """Encola un request activo; se lanza en cuanto su host tenga hueco."""
+        host = urllib.parse.urlsplit(request.url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostBudget(concurrency=float(self.initial_concurrency))
+
+        request = request.replace(priority=self.priority)
+        request.meta['probe_host'] = host
+        request.meta['probe_token'] = next(self._tokens)
+        state.pending.append(request)
+        self.crawler.stats.max_value('active_checks/queue_max', len(state.pending))
+        self._release(host)
+
+    def completed(self, request):
+        """Libera el hueco de un request activo (idempotente)."""
+        state = self._state_for(request)
+        if state is not None and self._free(state, request):
+            self._release(request.meta['probe_host'])
+
+    def request_left_downloader(self, request, spider):
+        state = self._state_for(request)
+        if state is None or not self._free(state, request):
+            return
+
+        host = request.meta['probe_host']
+        # Sin latencia la descarga no llegó a recibir cabeceras (timeout, conexión rechazada...)
+        latency = request.meta.get('download_latency')
+        if latency is None or latency > self.target_latency or request.meta.get('probe_overloaded'):
+            self._backoff(host, state)
+        else:
+            # Incremento aditivo: +1 por cada "ronda" completa de requests
+            state.concurrency = min(float(self.max_concurrency), state.concurrency + 1 / state.concurrency)
+        self._release(host)
+
+    def response_downloaded(self, response, request, spider):
+        # Se mira aquí y no en response_received: RetryMiddleware se queda con los 503
+        if request.meta.get('probe_host') is not None and response.status in BACKOFF_STATUSES:
+            request.meta['probe_overloaded'] = True
+
+    def spider_idle(self, spider):
+        """Evita que el spider se cierre mientras queden checks activos por lanzar."""
+        if self.pending:
+            # Con el motor ocioso no hay nada en vuelo: si un request se perdió
+            # sin liberar su hueco, no debe bloquear la cola
+            for host, state in self._hosts.items():
+                state.in_flight.clear()
+                self._release(host)
+            raise DontCloseSpider
+
+    def _state_for(self, request):
+        host = request.meta.get('probe_host')
+        return self._hosts.get(host) if host is not None else None
+
+    def _free(self, state, request):
+        token = request.meta.get('probe_token')
+        if token in state.in_flight:
+            state.in_flight.discard(token)
+            return True
+        return False
+
+    def _backoff(self, host, state):
+        state.concurrency = max(float(self.min_concurrency), state.concurrency / 2)
+        self.crawler.stats.inc_value('active_checks/backoffs')
+        logger.debug(f"Checks activos contra {host} reducidos a {int(state.concurrency)} en vuelo")
+
+    def _release(self, host):
+        state = self._hosts[host]
+        while state.pending and len(state.in_flight) < int(state.concurrency):
+            request = state.pending.popleft()
+            state.in_flight.add(request.meta['probe_token'])
+            self.crawler.engine.crawl(request)
@@ -12,3 +12,62 @@ ITEM_PIPELINES = {
 
 # Limite de profundidad del rastreo
 DEPTH_LIMIT = 2
+
+# Escritura de hallazgos en lote
+FINDINGS_BATCH_SIZE = 500
+FINDINGS_FLUSH_INTERVAL = 2.0
+# Reintentos de un lote fallido (espera inicial en segundos, se dobla en cada
+# intento) antes de guardarlo hallazgo a hallazgo
+FINDINGS_FLUSH_RETRIES = 3
+FINDINGS_RETRY_BACKOFF = 0.5
+
+# Captura de respuestas: solo HTML, cuerpo limitado para el análisis
+CAPTURE_ALLOWED_CONTENT_TYPES = ["text/html", "application/xhtml+xml"]
+CAPTURE_MAX_BODY_KB = 512
+# Vuelca a disco los cuerpos que superan el límite (directorio temporal si no se indica)
+CAPTURE_SPOOL_OVERSIZED = False
+CAPTURE_SPOOL_DIR = None
+# Límite duro de descarga por respuesta
+DOWNLOAD_MAXSIZE = 10 * 1024 * 1024
+
+# Concurrencia global del rastreo (valores por defecto de Scrapy, explícitos)
+CONCURRENT_REQUESTS = 16
+CONCURRENT_REQUESTS_PER_DOMAIN = 8
+
+# Checks activos: presupuesto por host ajustado según la latencia (ver probes.py).
+# Se lanzan con prioridad baja para que el rastreo pasivo vaya primero.
+PROBES_INITIAL_CONCURRENCY = 2
+# Cuenta también los requests a la espera en el scheduler; el host nunca recibe
+# más de CONCURRENT_REQUESTS_PER_DOMAIN a la vez
+PROBES_MAX_CONCURRENCY_PER_HOST = 16
+PROBES_MIN_CONCURRENCY_PER_HOST = 1
+# Latencia (s) a partir de la cual se reduce el presupuesto del host
+PROBES_TARGET_LATENCY = 1.0
+PROBES_PRIORITY = -10
+
+# Escaneos reanudables (run-scan.sh --resume): la frontera, las URLs vistas y
+# los formularios atacados se guardan cada CHECKPOINT_INTERVAL segundos
+# (0 = solo al cerrar) en CRAWL_STATE_DIR, por defecto crawls/ junto a la BD
+CHECKPOINT_INTERVAL = 60
+CRAWL_STATE_DIR = None
+
+# Deduplicación del rastreo (ver dedup.py): parámetros que se ignoran al
+# comparar URLs (admiten comodines) y descarte de páginas casi idénticas por
+# SimHash, con la distancia de Hamming máxima para considerarlas iguales
+URL_STRIP_PARAMS = [
+    "utm_*", "gclid", "fbclid", "msclkid", "dclid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "sessionid", "session_id", "sid", "phpsessid", "jsessionid", "aspsessionid*", "cfid", "cftoken",
+]
+DEDUP_NEAR_DUPLICATES = True
+DEDUP_MAX_DISTANCE = 3
+
+# Reescaneos incrementales (ver database/pages.py): las páginas se piden con
+# If-None-Match / If-Modified-Since y las que no han cambiado desde el último
+# escaneo terminado no se analizan; se copian sus hallazgos
+INCREMENTAL_RESCANS = True
+
+# Checks del pipeline (ver checks/): nombres de los que no se ejecutan en el
+# escaneo (p. ej. -s CHECKS_DISABLED=sqli,xss) y módulos con checks propios
+# que se importan al arrancar para que se registren
+CHECKS_DISABLED = []
+CHECK_MODULES = []
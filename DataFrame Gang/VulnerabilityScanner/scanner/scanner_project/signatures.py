@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import re
+
+DEFAULT_SIGNATURES_PATH = Path(__file__).with_name('signatures.json')
+
+
+@dataclass
+class SignatureMatch:
+    pattern: str
+    label: str
+    offset: int
+
+
+class SignatureEngine:
+    """
+    Motor de firmas literales.
+
+    Todas las firmas se compilan en una única expresión regular sobre bytes,
+    de modo que el cuerpo se recorre una sola vez, sin decodificarlo ni crear
+    una copia en minúsculas, independientemente del número de firmas.
+    La comparación ignora mayúsculas en el rango ASCII.
+
+    scan() devuelve todas las coincidencias, también las solapadas: la
+    expresión va dentro de un lookahead, así que se prueba en cada posición
+    y da la firma más larga que empieza ahí; las demás firmas que empiezan
+    en la misma posición son prefijos suyos y se añaden desde `_prefixes`.
+    """
+
+    def __init__(self, signatures):
+        # Clave: patrón en minúsculas (bytes) -> (patrón, etiqueta)
+        self._by_pattern = {}
+        for signature in signatures:
+            pattern = signature['pattern']
+            self._by_pattern[pattern.lower().encode('utf-8')] = (pattern, signature.get('label', pattern))
+
+        # Firmas que son prefijo de otra: coinciden en la misma posición que ella
+        self._prefixes = {
+            key: sorted((other for other in self._by_pattern if other != key and key.startswith(other)),
+                        key=len, reverse=True)
+            for key in self._by_pattern
+        }
+
+        if self._by_pattern:
+            # Los patrones más largos primero para que ganen ante prefijos comunes
+            alternatives = b'|'.join(re.escape(p) for p in sorted(self._by_pattern, key=len, reverse=True))
+            self._regex = re.compile(alternatives, re.IGNORECASE)
+            self._overlapping = re.compile(b'(?=(' + alternatives + b'))', re.IGNORECASE)
+        else:
+            self._regex = None
+            self._overlapping = None
+
+    def __len__(self):
+        return len(self._by_pattern)
+
+    def _to_match(self, m):
+        pattern, label = self._by_pattern[m.group().lower()]
+        return SignatureMatch(pattern=pattern, label=label, offset=m.start())
+
+    def scan(self, data):
+        """Devuelve todas las coincidencias, incluidas las solapadas, por posición."""
+        if self._overlapping is None or not data:
+            return []
+        matches = []
+        for m in self._overlapping.finditer(data):
+            key = m.group(1).lower()
+            for found in (key, *self._prefixes[key]):
+                pattern, label = self._by_pattern[found]
+                matches.append(SignatureMatch(pattern=pattern, label=label, offset=m.start()))
+        return matches
+
+    def search(self, data):
+        """Devuelve la primera coincidencia o None."""
+        if self._regex is None or not data:
+            return None
+        m = self._regex.search(data)
+        return self._to_match(m) if m else None
+
+
+def load_signature_engines(path=DEFAULT_SIGNATURES_PATH):
+    """Carga el fichero de firmas y compila un motor por categoría."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return {category: SignatureEngine(signatures) for category, signatures in data.items()}
@@ -1,26 +1,214 @@
 import scrapy
+from scrapy import signals
+from scrapy.exceptions import StopDownload
+from scrapy.http import TextResponse
 from scrapy.linkextractors import LinkExtractor
-from scanner_project.items import ScannedItem
+from database.pages import load_snapshots, page_host
+from database.scans import finish_scan, start_scan
+from scanner_project.capture import CapturePolicy
+from scanner_project.crawlstate import CrawlState, url_key
+from scanner_project.dedup import SimHashIndex, UrlCanonicalizer, simhash
+from scanner_project.items import ScannedItem, UnchangedPageItem
+import hashlib
 
 class SiteSpider(scrapy.Spider):
     name = 'site_spider'
 
-    def __init__(self, start_url=None, *args, **kwargs):
+    # Ajustes que se guardan junto al escaneo
+    RECORDED_SETTINGS = [
+        'DEPTH_LIMIT', 'ROBOTSTXT_OBEY', 'CAPTURE_ALLOWED_CONTENT_TYPES',
+        'CAPTURE_MAX_BODY_KB', 'FINDINGS_BATCH_SIZE', 'FINDINGS_FLUSH_INTERVAL', 'CHECKS_DISABLED',
+    ]
+
+    def __init__(self, start_url=None, scan_id=None, resume=None, *args, **kwargs):
         super(SiteSpider, self).__init__(*args, **kwargs)
+        # Escaneo ya registrado (p. ej. por run-scan.sh); si no, se registra al arrancar
+        self.scan_id = int(scan_id) if scan_id else None
+        # Con resume se continúa desde el último estado guardado del escaneo
+        self.resume = bool(resume)
+        if self.resume and self.scan_id is None:
+            raise ValueError("Para reanudar un escaneo se necesita su `scan_id`.")
         if start_url:
             self.start_urls = [start_url]
-            self.allowed_domains = [start_url.split('/')[2].split(':')[0]]
+            netloc = start_url.split('/')[2]
+            self.allowed_domains = [netloc.split(':')[0]]
+            # LinkExtractor compara el netloc completo: con un puerto explícito
+            # (http://localhost:8765/) hay que permitir también "host:puerto"
+            self.link_extractor = LinkExtractor(allow_domains=sorted({self.allowed_domains[0], netloc}))
         else:
             raise ValueError("Se necesita un `start_url` para iniciar el escaneo.")
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(SiteSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.capture = CapturePolicy.from_settings(crawler.settings)
+        if spider.scan_id is None:
+            settings = {key: crawler.settings.get(key) for key in cls.RECORDED_SETTINGS}
+            spider.scan_id = start_scan(spider.start_urls[0], settings=settings)
+        spider.logger.info(f"Escaneo #{spider.scan_id} sobre {spider.start_urls[0]}")
+
+        spider.crawl_state = CrawlState.for_scan(spider.scan_id, crawler.settings.get('CRAWL_STATE_DIR'))
+        if spider.resume and spider.crawl_state.exists():
+            spider.crawl_state.load()
+            spider.logger.info(
+                f"Estado recuperado de {spider.crawl_state.path}: {len(spider.crawl_state.frontier)} URLs "
+                f"pendientes, {len(spider.crawl_state.seen)} vistas"
+            )
+        elif spider.resume:
+            spider.logger.warning(f"No hay estado guardado en {spider.crawl_state.path}; se empieza desde cero")
+        spider.depth_limit = crawler.settings.getint('DEPTH_LIMIT')
+        spider.canonicalizer = UrlCanonicalizer.from_settings(crawler.settings)
+        # Al reanudar se conserva el índice de contenido guardado
+        if not crawler.settings.getbool('DEDUP_NEAR_DUPLICATES', True):
+            spider.crawl_state.content_index = None
+        elif spider.crawl_state.content_index is None:
+            spider.crawl_state.content_index = SimHashIndex(
+                max_distance=crawler.settings.getint('DEDUP_MAX_DISTANCE', 3)
+            )
+        # Reescaneo incremental: instantáneas del último escaneo terminado de este host
+        spider.snapshots = {}
+        if crawler.settings.getbool('INCREMENTAL_RESCANS', True):
+            spider.snapshots = load_snapshots(page_host(spider.start_urls[0]))
+            if spider.snapshots:
+                spider.logger.info(f"{len(spider.snapshots)} páginas con instantánea previa: se piden condicionalmente")
+        crawler.signals.connect(spider.on_headers_received, signal=signals.headers_received)
+        return spider
+
+    def on_headers_received(self, headers, body_length, request, spider):
+        """Corta la descarga de páginas rastreadas cuyo content type no se analiza."""
+        # Las respuestas de los checks activos se descargan siempre completas
+        if request.callback not in (None, self.parse):
+            return
+        if not self.capture.allows(headers.get('Content-Type')):
+            self.crawler.stats.inc_value('capture/skipped_content_type')
+            raise StopDownload(fail=False)
+
+    async def start(self):
+        """
+        Arranca desde la frontera guardada o, en un escaneo nuevo, desde
+        start_url. Si al reanudar la frontera está vacía solo quedan checks
+        activos, que el pipeline vuelve a lanzar.
+        """
+        if not self.crawl_state.seen:
+            for url in self.start_urls:
+                self.crawl_state.schedule(url, 0, self.canonicalizer.canonicalize(url))
+        for url, depth in list(self.crawl_state.frontier.items()):
+            yield self._page_request(url, depth, dont_filter=True)
+
+    def _page_request(self, url, depth, dont_filter=False):
+        meta = {'depth': depth, 'frontier_url': url}
+        headers = {}
+        snapshot = self.snapshots.get(url)
+        if snapshot is not None:
+            if snapshot.etag:
+                headers['If-None-Match'] = snapshot.etag
+            if snapshot.last_modified:
+                headers['If-Modified-Since'] = snapshot.last_modified
+            if headers:
+                meta['handle_httpstatus_list'] = [304]
+        return scrapy.Request(
+            url, callback=self.parse, errback=self.page_failed, dont_filter=dont_filter,
+            headers=headers, meta=meta,
+        )
+
+    def page_failed(self, failure):
+        # Una página que falla no se vuelve a pedir al reanudar
+        self.crawl_state.done(failure.request.meta.get('frontier_url', failure.request.url))
+
+    def is_near_duplicate(self, response):
+        """
+        Compara el SimHash del texto de la página con el de las ya analizadas.
+        Solo se comparan páginas con los mismos formularios (acción y nombres
+        de inputs): dos páginas de plantilla con formularios distintos nunca
+        se consideran duplicadas, porque los checks activos dependen de ellos.
+        """
+        index = self.crawl_state.content_index
+        if index is None:
+            return False
+        forms = sorted(
+            (form.attrib.get('action', ''), tuple(form.xpath('.//input/@name').getall()))
+            for form in response.xpath('//form')
+        )
+        text = ' '.join(response.xpath('//body//text()').getall())
+        return index.check_and_add(simhash(text), group=url_key(repr(forms)))
+
     def parse(self, response):
+        url = response.meta.get('frontier_url', response.url)
+        self.crawl_state.done(url)
+        snapshot = self.snapshots.get(url)
+
+        # 304: la página no ha cambiado y sus enlaces se toman de la instantánea
+        if response.status == 304 and snapshot is not None:
+            self.crawler.stats.inc_value('incremental/not_modified')
+            yield self._unchanged_item(url, snapshot, response)
+            yield from self._follow(snapshot.links, response)
+            return
+
+        if not isinstance(response, TextResponse) or not self.capture.allows(response.headers.get('Content-Type')):
+            return
+
+        links = [link.url for link in self.link_extractor.extract_links(response)]
+        body_hash = hashlib.sha1(response.body).hexdigest()
+        if snapshot is not None and snapshot.body_hash == body_hash:
+            # Servidor sin validadores (o que los ignora) pero con el mismo contenido
+            self.crawler.stats.inc_value('incremental/same_body')
+            yield self._unchanged_item(url, snapshot, response)
+        # Una página casi idéntica a otra ya analizada no pasa por el pipeline,
+        # pero sus enlaces se siguen
+        elif self.is_near_duplicate(response):
+            self.crawler.stats.inc_value('dedup/near_duplicate_pages')
+        else:
+            item = self._build_item(response)
+            item['body_hash'] = body_hash
+            item['links'] = links
+            yield item
+
+        yield from self._follow(links, response)
+
+    def _follow(self, links, response):
+        depth = response.meta.get('depth', 0) + 1
+        if self.depth_limit and depth > self.depth_limit:
+            return
+        for link in links:
+            # La frontera persistente hace de filtro de duplicados entre ejecuciones;
+            # las URLs que solo difieren en parámetros de seguimiento u orden comparten clave
+            if self.crawl_state.schedule(link, depth, self.canonicalizer.canonicalize(link)):
+                yield self._page_request(link, depth)
+
+    def _unchanged_item(self, url, snapshot, response):
+        item = UnchangedPageItem()
+        item['url'] = url
+        item['previous_scan_id'] = snapshot.scan_id
+        item['etag'] = self._header(response, 'ETag') or snapshot.etag
+        item['last_modified'] = self._header(response, 'Last-Modified') or snapshot.last_modified
+        item['body_hash'] = snapshot.body_hash
+        item['links'] = list(snapshot.links)
+        return item
+
+    @staticmethod
+    def _header(response, name):
+        value = response.headers.get(name)
+        return value.decode('latin-1') if value else None
+
+    def _build_item(self, response):
+        body, truncated, spool_path = self.capture.capture(response.body)
+        if truncated:
+            self.crawler.stats.inc_value('capture/truncated_bodies')
+
         item = ScannedItem()
         item['url'] = response.url
         item['response_headers'] = response.headers
-        item['response_body'] = response.body
+        item['response_body'] = body
+        item['response_body_truncated'] = truncated
+        item['response_body_path'] = spool_path
         item['response_status'] = response.status
-        yield item
+        item['etag'] = self._header(response, 'ETag')
+        item['last_modified'] = self._header(response, 'Last-Modified')
+        return item
 
-        link_extractor = LinkExtractor(allow_domains=self.allowed_domains)
-        for link in link_extractor.extract_links(response):
-            yield scrapy.Request(link.url, callback=self.parse)
+    def closed(self, reason):
+        self.capture.cleanup()
+        # Un escaneo terminado ya no se puede reanudar: su estado sobra
+        if reason == 'finished':
+            self.crawl_state.remove()
+        finish_scan(self.scan_id, status=reason, stats=self.crawler.stats.get_stats())
@@ -0,0 +1,277 @@
+from collections import defaultdict
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DataError, IntegrityError
+from database.models import FINDING_UNIQUE_KEY, Finding
+from database.pages import carry_forward_findings, upsert_snapshots
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """Marca en la cola para forzar un volcado y avisar cuando termina."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _Batch:
+    """Escrituras pendientes que se vuelcan juntas en una transacción."""
+
+    def __init__(self):
+        self.findings = []
+        # Una instantánea por URL: la última gana
+        self.snapshots = {}
+        # (escaneo origen, escaneo destino) -> páginas cuyos hallazgos se copian
+        self.carry = defaultdict(set)
+        self.size = 0
+
+    def add(self, kind, entry):
+        if kind == 'finding':
+            self.findings.append(entry)
+        elif kind == 'snapshot':
+            self.snapshots[entry['url']] = entry
+        else:
+            from_scan_id, to_scan_id, page_url = entry
+            self.carry[(from_scan_id, to_scan_id)].add(page_url)
+        self.size += 1
+
+# Constructores de INSERT que soportan ON CONFLICT DO NOTHING
+_INSERT_BY_DIALECT = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+class FindingWriter:
+    """
+    Escritor de hallazgos en lote.
+
+    Los hallazgos se encolan en memoria y un hilo en segundo plano los vuelca
+    en una sola transacción cuando se alcanza `batch_size` o pasan
+    `flush_interval` segundos. Los duplicados los descarta la base de datos
+    mediante el índice único (COALESCE(scan_id, 0), url, vulnerability_type).
+
+    Si el volcado falla (p. ej. base de datos bloqueada) se reintenta el lote
+    `max_retries` veces esperando `retry_backoff` segundos (el doble en cada
+    intento). Si sigue fallando, o el error es de datos, se escribe entrada a
+    entrada para que una fila problemática no haga perder el resto; lo que no
+    se guarda queda contado en `stats` (*_lost).
+    """
+
+    def __init__(self, engine, batch_size=500, flush_interval=2.0, max_retries=3, retry_backoff=0.5):
+        dialect = engine.dialect.name
+        if dialect not in _INSERT_BY_DIALECT:
+            raise ValueError(f"Dialecto no soportado por FindingWriter: {dialect}")
+
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._statement = _INSERT_BY_DIALECT[dialect](Finding.__table__).on_conflict_do_nothing(
+            index_elements=FINDING_UNIQUE_KEY
+        )
+        self._queue = queue.Queue()
+        self._thread = None
+        self.stats = {
+            'queued': 0,
+            'flushes': 0,
+            'rows_flushed': 0,
+            'snapshots_saved': 0,
+            'pages_carried_forward': 0,
+            'findings_carried_forward': 0,
+            'flush_seconds': 0.0,
+            'flush_seconds_max': 0.0,
+            'errors': 0,
+            'retries': 0,
+            'findings_lost': 0,
+            'carried_pages_lost': 0,
+            'snapshots_lost': 0,
+        }
+
+    def start(self):
+        """Arranca el hilo que vuelca los hallazgos."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="FindingWriter", daemon=True)
+        self._thread.start()
+
+    def add(self, url, http_status, vuln_type, severity, details, scan_id=None, page_url=None):
+        """Encola un hallazgo sin bloquear al llamador."""
+        self._queue.put(('finding', {
+            'scan_id': scan_id,
+            'url': url,
+            'http_status': http_status,
+            'vulnerability_type': vuln_type,
+            'severity': severity,
+            'details': details,
+            'page_url': page_url or url,
+        }))
+        self.stats['queued'] += 1
+
+    def save_snapshot(self, url, host, scan_id, etag=None, last_modified=None, body_hash=None, links=()):
+        """Encola la instantánea de una página analizada."""
+        self._queue.put(('snapshot', {
+            'url': url,
+            'host': host,
+            'scan_id': scan_id,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'links': list(links),
+        }))
+
+    def carry_forward(self, from_scan_id, to_scan_id, page_url):
+        """Encola la copia de los hallazgos de una página sin cambios."""
+        self._queue.put(('carry', (from_scan_id, to_scan_id, page_url)))
+
+    def flush(self, timeout=None):
+        """Vuelca lo encolado hasta ahora y espera a que termine."""
+        if self._thread is None:
+            return True
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def close(self):
+        """Vuelca lo pendiente y detiene el hilo."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        batch = _Batch()
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+
+            if entry is _STOP:
+                self._flush(batch)
+                return
+            if isinstance(entry, _FlushRequest):
+                self._flush(batch)
+                batch = _Batch()
+                deadline = time.monotonic() + self.flush_interval
+                entry.done.set()
+                continue
+            if entry is not None:
+                batch.add(*entry)
+
+            if batch.size >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = _Batch()
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        if not batch.size:
+            return
+
+        start = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._write_batch(batch)
+                    return
+                except Exception as e:
+                    # Un dato inválido falla igual en cada intento: directo a uno a uno
+                    if attempt == self.max_retries or isinstance(e, (DataError, IntegrityError)):
+                        self.stats['errors'] += 1
+                        logger.error(
+                            f"Error volcando {len(batch.findings)} hallazgos tras {attempt + 1} intentos, "
+                            f"se guardan uno a uno: {e}",
+                            exc_info=True,
+                        )
+                        break
+                    delay = self.retry_backoff * 2 ** attempt
+                    self.stats['retries'] += 1
+                    logger.warning(f"Error volcando {len(batch.findings)} hallazgos, reintento en {delay:.1f}s: {e}")
+                    time.sleep(delay)
+            self._write_one_by_one(batch)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats['flush_seconds'] += elapsed
+            self.stats['flush_seconds_max'] = max(self.stats['flush_seconds_max'], elapsed)
+
+    def _write_batch(self, batch):
+        """Todo el lote en una transacción."""
+        carried = 0
+        with self.engine.begin() as conn:
+            if batch.findings:
+                conn.execute(self._statement, batch.findings)
+            for (from_scan_id, to_scan_id), page_urls in batch.carry.items():
+                carried += carry_forward_findings(conn, from_scan_id, to_scan_id, page_urls)
+            upsert_snapshots(conn, list(batch.snapshots.values()))
+        self.stats['flushes'] += 1
+        self.stats['rows_flushed'] += len(batch.findings)
+        self.stats['snapshots_saved'] += len(batch.snapshots)
+        self.stats['pages_carried_forward'] += sum(len(urls) for urls in batch.carry.values())
+        self.stats['findings_carried_forward'] += carried
+        logger.debug(f"Volcados {len(batch.findings)} hallazgos a la base de datos")
+
+    def _write_one(self, write):
+        """Ejecuta write(conn) en su propia transacción. Devuelve (ok, resultado o excepción)."""
+        try:
+            with self.engine.begin() as conn:
+                return True, write(conn)
+        except Exception as e:
+            return False, e
+
+    def _write_one_by_one(self, batch):
+        """Último recurso tras fallar el lote: una transacción por entrada."""
+        errors = []
+        # Páginas con escrituras perdidas: sin instantánea, el próximo
+        # reescaneo las vuelve a analizar en vez de dar sus hallazgos por buenos
+        failed_pages = set()
+
+        for finding in batch.findings:
+            ok, result = self._write_one(lambda conn: conn.execute(self._statement, finding))
+            if ok:
+                self.stats['rows_flushed'] += 1
+            else:
+                self.stats['findings_lost'] += 1
+                failed_pages.add(finding['page_url'])
+                errors.append(f"hallazgo {finding['vulnerability_type']} en {finding['url']}: {result}")
+
+        for (from_scan_id, to_scan_id), page_urls in batch.carry.items():
+            ok, result = self._write_one(
+                lambda conn: carry_forward_findings(conn, from_scan_id, to_scan_id, page_urls)
+            )
+            if ok:
+                self.stats['pages_carried_forward'] += len(page_urls)
+                self.stats['findings_carried_forward'] += result
+            else:
+                self.stats['carried_pages_lost'] += len(page_urls)
+                failed_pages.update(page_urls)
+                errors.append(f"copia de {len(page_urls)} páginas del escaneo #{from_scan_id}: {result}")
+
+        for url, snapshot in batch.snapshots.items():
+            if url in failed_pages:
+                self.stats['snapshots_lost'] += 1
+                continue
+            ok, result = self._write_one(lambda conn: upsert_snapshots(conn, [snapshot]))
+            if ok:
+                self.stats['snapshots_saved'] += 1
+            else:
+                self.stats['snapshots_lost'] += 1
+                errors.append(f"instantánea de {url}: {result}")
+
+        self.stats['flushes'] += 1
+        if errors:
+            for error in errors:
+                logger.debug(f"No se pudo guardar {error}")
+            logger.error(f"Volcado uno a uno: {len(errors)} escrituras perdidas, la primera: {errors[0]}")
+        else:
+            logger.info(f"Volcado uno a uno completado sin pérdidas ({len(batch.findings)} hallazgos)")